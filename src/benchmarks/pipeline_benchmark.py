@@ -0,0 +1,393 @@
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# src 디렉토리를 Python 경로에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)
+sys.path.append(src_dir)
+
+STAGES = ['focus', 'tick', 'tree', 'paint', 'persist']
+DEFAULT_SIZES = [10, 1000, 100000]
+WINDOWS_PER_APP = 10
+USAGE_STORE_ADDS = 20000  # 사용 데이터 비교에서 더할 구간 수
+
+
+def synthetic_trace(size, duration, seed=0):
+    """size개 (앱, 창) 행을 오가는 전환 기록을 만듭니다.
+
+    항목은 [경과 초, 앱 이름, 번들 ID, pid, 창 제목]이고, 같은 앱의 다른 창으로
+    옮기는 항목은 창 제목만 바뀝니다. 전환의 대부분은 자주 쓰는 몇 개 앱 사이에서
+    일어나고, 가끔 전체 앱 중 하나나 기록에 없던 창으로 옮깁니다.
+    """
+    rng = random.Random(seed)
+    apps = max(1, size // WINDOWS_PER_APP)
+    hot_apps = min(apps, 20)
+    trace = []
+    offset = 0.0
+    app_index = 0
+    while offset < duration:
+        if not trace or rng.random() < 0.3:
+            app_index = rng.randrange(hot_apps) if rng.random() < 0.8 else rng.randrange(apps)
+        window_index = rng.randrange(WINDOWS_PER_APP + WINDOWS_PER_APP // 2)
+        trace.append([offset, f"App {app_index}", f"com.example.app{app_index}", 1000 + app_index,
+                      f"문서 {window_index}"])
+        offset += rng.expovariate(1 / 20.0) + 1
+    return trace
+
+
+def load_trace(path):
+    """ReplayFocusSource 형식([경과 초, 앱 이름, 번들 ID, pid], 창 제목은 선택)의 파일을 읽습니다."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_trace(path, trace):
+    with open(path, 'w', encoding='utf-8') as f:
+        for entry in trace:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def percentiles(samples):
+    """샘플(초)의 p50/p90/p99/최대를 ms로 반환합니다."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        'count': len(ordered),
+        'p50': ordered[last * 50 // 100] * 1000,
+        'p90': ordered[last * 90 // 100] * 1000,
+        'p99': ordered[last * 99 // 100] * 1000,
+        'max': ordered[last] * 1000,
+    }
+
+
+def process_write_bytes():
+    """이 프로세스가 write 계열 호출로 쓴 바이트 수를 반환합니다. /proc이 없으면 None입니다."""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                if line.startswith('wchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class FakeTitleResolver:
+    """osascript 도우미 대신 기록에 적힌 창 제목을 바로 돌려주는 조회기입니다."""
+
+    def __init__(self):
+        self.titles = {}  # pid -> 창 제목
+        self.requests = 0
+
+    def request(self, pid, app_name, callback=None):
+        self.requests += 1
+        if callback is not None:
+            callback(pid, self.titles.get(pid) or app_name)
+        return True
+
+    async def resolve(self, pid, app_name, timeout=None):
+        self.requests += 1
+        return self.titles.get(pid) or app_name
+
+    def stop(self):
+        pass
+
+
+class BenchmarkTrackerClient:
+    """추적 데몬 대신 같은 프로세스의 UsageTracker에 명령을 보내는 클라이언트입니다.
+
+    추적기가 보낸 메시지는 모아 두었다가 deliver()에서 화면에 전달하므로
+    틱 처리와 트리 갱신을 따로 잴 수 있습니다. 명령의 답은 바로 전달합니다.
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self._listeners = []
+        self._queued = []
+        tracker.subscribe(self._queued.append)
+
+    def subscribe(self, listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+        return listener
+
+    def send(self, cmd, **fields):
+        from core.tracker_ipc import dispatch_command
+        reply = dispatch_command(self.tracker, dict(fields, cmd=cmd))
+        if reply is not None:
+            self._publish(reply)
+
+    def deliver(self):
+        """모아 둔 추적 메시지를 화면에 전달합니다."""
+        queued, self._queued[:] = list(self._queued), []
+        for message in queued:
+            self._publish(message)
+
+    def _publish(self, message):
+        for listener in list(self._listeners):
+            listener(message)
+
+    def close(self):
+        pass
+
+
+def seed_history(size, now):
+    """size개 (앱, 창) 행의 지난 기록을 저장소에 넣고 닫습니다."""
+    from core.data_manager import DataManager
+
+    start = now - 30 * 86400
+    for row in range(size):
+        app_index, window_index = divmod(row, WINDOWS_PER_APP)
+        DataManager.record_interval(f"App {app_index}", f"문서 {window_index}",
+                                    start + row * 10, start + row * 10 + 5)
+    DataManager.close()
+
+
+def compare_usage_stores(size, trace):
+    """같은 사용 데이터를 일반 딕셔너리와 CompactUsage에 담아 메모리와 집계 시간을 비교합니다.
+
+    memory는 JSON에서 새로 읽은 size개 행을 담은 뒤 남은 할당량, add는 전환
+    기록의 (앱, 창)에 구간 하나를 더하는 평균 시간, scan은 모든 앱의 합계와
+    창별 시간을 읽기 뷰로 한 번 훑는 시간입니다.
+    """
+    from core.compact_usage import CompactUsage
+    from core.data_manager import apply_interval
+
+    text = json.dumps({
+        f"App {app_index}": {'total_time': WINDOWS_PER_APP * 5.0, 'last_update': 0.0,
+                             'windows': {f"문서 {window_index}": 5.0 for window_index in range(WINDOWS_PER_APP)}}
+        for app_index in range(max(1, size // WINDOWS_PER_APP))}, ensure_ascii=False)
+    steps = [(entry[1], entry[4] if len(entry) > 4 else None) for entry in trace] or [("App 0", None)]
+
+    results = {}
+    for kind, build, add in (
+            ('dict', json.loads, apply_interval),
+            ('compact', lambda data: CompactUsage.from_usage(json.loads(data)),
+             lambda usage, *interval: usage.add_interval(*interval))):
+        gc.collect()
+        tracemalloc.start()
+        usage = build(text)
+        gc.collect()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        for step in range(USAGE_STORE_ADDS):
+            app_name, window_title = steps[step % len(steps)]
+            add(usage, app_name, window_title, float(step), step + 1.0)
+        add_s = (time.perf_counter() - started) / USAGE_STORE_ADDS
+
+        started = time.perf_counter()
+        total = 0.0
+        for app_name in usage:
+            app_data = usage[app_name]
+            total += app_data['total_time']
+            for _, seconds in app_data['windows'].items():
+                total += seconds
+        scan_s = time.perf_counter() - started
+
+        results[kind] = {'memory_kib': memory / 1024, 'add_us': add_s * 1e6, 'scan_ms': scan_s * 1000}
+        del usage
+    return results
+
+
+def run_child(size, ticks, alloc_ticks, trace_path=None):
+    """한 크기의 벤치마크를 실행하고 보고를 딕셔너리로 반환합니다. HOME은 빈 임시 디렉토리여야 합니다."""
+    import core.focus_source as focus_source
+    import core.tick_scheduler as tick_scheduler
+    import core.title_resolver as title_resolver
+    import core.tracker_ipc as tracker_ipc
+    from core.async_loop import get_async_loop
+    from core.config import DATA_DIR
+    from core.data_manager import DataManager
+    from core.title_cache import get_title_cache
+    from core.tracker import UsageTracker
+
+    now = time.time()
+    duration = ticks + alloc_ticks
+    trace = load_trace(trace_path) if trace_path else synthetic_trace(size, duration)
+
+    report = {'size': size, 'ticks': ticks, 'trace_entries': len(trace), 'stages': {}}
+    report['usage_stores'] = compare_usage_stores(size, trace)
+    started = time.perf_counter()
+    seed_history(size, now)
+    report['seed_s'] = time.perf_counter() - started
+
+    # NSWorkspace와 osascript 대신 기록을 재생하는 대역을 앱 전체의 공유 객체로 둡니다
+    origin = now - duration
+    clock = [origin]
+    focus = focus_source.ScriptedFocusSource()
+    resolver = FakeTitleResolver()
+    scheduler = tick_scheduler.TickScheduler(focus_source=focus, clock=lambda: clock[0])
+    focus_source._focus_source = focus
+    title_resolver._title_resolver = resolver
+    tick_scheduler._tick_scheduler = scheduler
+    get_title_cache().ttl = 0  # 1초 틱마다 제목을 다시 조회하는 것과 같게 합니다
+
+    started = time.perf_counter()
+    tracker = UsageTracker(focus, scheduler)
+    tracker.start()
+    client = BenchmarkTrackerClient(tracker)
+    tracker_ipc._tracker_client = client
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    from ui.widgets.app_tracking import Home_app_tracking
+    home = Home_app_tracking()
+    home.resize(1024, 768)
+    home.show()
+    app.processEvents()
+    report['startup_s'] = time.perf_counter() - started
+
+    samples = {stage: [] for stage in STAGES}
+    allocations = {stage: [] for stage in STAGES}
+    position = [0]
+
+    def measure(stage, call, trace_alloc):
+        if trace_alloc:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            call()
+            allocations[stage].append(tracemalloc.get_traced_memory()[1] - before)
+        else:
+            began = time.perf_counter()
+            call()
+            samples[stage].append(time.perf_counter() - began)
+
+    def run_ticks(count, trace_alloc):
+        for _ in range(count):
+            timestamp = clock[0] = clock[0] + 1.0
+            elapsed = timestamp - origin
+            while position[0] < len(trace) and trace[position[0]][0] <= elapsed:
+                entry = trace[position[0]]
+                position[0] += 1
+                app_name, bundle_id, pid = entry[1], entry[2], entry[3]
+                if len(entry) > 4:
+                    resolver.titles[pid] = entry[4]
+                current = focus.current()
+                if current is None or current.pid != pid or current.app_name != app_name:
+                    measure('focus', lambda: focus.push(app_name, bundle_id, pid, '', timestamp),
+                            trace_alloc)
+            measure('tick', lambda: scheduler.tick(timestamp), trace_alloc)
+            measure('tree', client.deliver, trace_alloc)
+            measure('paint', home.time_graph.repaint, trace_alloc)
+            measure('persist', DataManager.flush, trace_alloc)
+
+    write_before = process_write_bytes()
+    size_before = directory_size(DATA_DIR)
+    run_ticks(ticks, False)
+    tracker.flush()
+    DataManager.flush()
+    write_after = process_write_bytes()
+    report['bytes_written'] = (write_after - write_before) if write_before is not None else None
+    report['data_growth'] = directory_size(DATA_DIR) - size_before
+
+    # 할당은 시간 측정을 흐리지 않도록 이어지는 틱에서 따로 잽니다
+    tracemalloc.start()
+    run_ticks(alloc_ticks, True)
+    tracemalloc.stop()
+
+    for stage in STAGES:
+        result = percentiles(samples[stage])
+        if allocations[stage]:
+            result['alloc_kib'] = sum(allocations[stage]) / len(allocations[stage]) / 1024
+        report['stages'][stage] = result
+    report['title_requests'] = resolver.requests
+
+    tracker.stop()
+    home.hide()
+    get_async_loop().stop()
+    DataManager.close()
+    return report
+
+
+def run_size(size, args):
+    """빈 HOME을 가진 자식 프로세스에서 한 크기를 실행하고 보고를 반환합니다."""
+    with tempfile.TemporaryDirectory(prefix='mactimeja-bench-') as home:
+        env = dict(os.environ)
+        env['HOME'] = home
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        command = [sys.executable, os.path.abspath(__file__), '--child', str(size),
+                   '--ticks', str(args.ticks), '--alloc-ticks', str(args.alloc_ticks)]
+        if args.trace:
+            command += ['--trace', os.path.abspath(args.trace)]
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"벤치마크 보고를 찾지 못했습니다:\n{result.stdout}\n{result.stderr}")
+
+
+def print_report(report):
+    print(f"크기 {report['size']} (틱 {report['ticks']}회, 전환 기록 {report['trace_entries']}개, "
+          f"기록 준비 {report['seed_s']:.1f}s, 시작 {report['startup_s'] * 1000:.0f}ms)")
+    print(f"{'단계':<10}{'횟수':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'최대':>10}{'할당 KiB':>12}")
+    for stage in STAGES:
+        result = report['stages'].get(stage) or {}
+        if not result.get('count'):
+            continue
+        print(f"{stage:<10}{result['count']:>8}{result['p50']:>10.3f}{result['p90']:>10.3f}"
+              f"{result['p99']:>10.3f}{result['max']:>10.3f}{result.get('alloc_kib', 0):>12.1f}")
+    print(f"{'사용 데이터':<10}{'메모리 KiB':>12}{'구간 추가 us':>14}{'훑기 ms':>10}")
+    for kind, result in report['usage_stores'].items():
+        print(f"{kind:<10}{result['memory_kib']:>12.1f}{result['add_us']:>14.2f}{result['scan_ms']:>10.2f}")
+    written = report['bytes_written']
+    print(f"기록한 바이트: {written if written is not None else '알 수 없음'}, "
+          f"데이터 디렉토리 증가: {report['data_growth']}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='전환 기록을 추적 파이프라인에 재생해 틱, 트리, 그래프, 저장 단계의 지연 시간을 잽니다.')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='기록에 미리 넣을 (앱, 창) 행 수 (쉼표로 구분)')
+    parser.add_argument('--ticks', type=int, default=1000, help='시간을 잴 틱 수 (1틱 = 가상 1초)')
+    parser.add_argument('--alloc-ticks', type=int, default=200, help='할당을 잴 틱 수')
+    parser.add_argument('--trace', help='재생할 전환 기록 파일 (없으면 합성 기록)')
+    parser.add_argument('--save-trace', help='합성한 전환 기록을 이 파일에 저장')
+    parser.add_argument('--json', action='store_true', help='보고를 JSON으로 출력')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_child(args.child, args.ticks, args.alloc_ticks, args.trace)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    if args.save_trace:
+        save_trace(args.save_trace, synthetic_trace(max(sizes), args.ticks + args.alloc_ticks))
+
+    reports = [run_size(size, args) for size in sizes]
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+        return
+    print("단계별 지연 시간 (ms)")
+    print()
+    for report in reports:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# src 디렉토리를 Python 경로에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)
+sys.path.append(src_dir)
+
+from main import STARTUP_BENCHMARK_ENV
+
+MAIN_SCRIPT = os.path.join(src_dir, 'main.py')
+STAGES = ['imports', 'qapplication', 'status_bar', 'first_status_bar_paint', 'home']
+
+
+def run_once(env):
+    """main.py를 한 번 실행해 단계별 시각(ms)과 프로세스 시작부터의 전체 시간을 반환합니다."""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, MAIN_SCRIPT], env=env, capture_output=True,
+                            text=True, timeout=120)
+    wall_ms = (time.perf_counter() - started) * 1000
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith('{'):
+            report = json.loads(line)
+            report['wall'] = wall_ms
+            return report
+    raise RuntimeError(f"시작 보고를 찾지 못했습니다:\n{result.stdout}\n{result.stderr}")
+
+
+def import_times(module, top):
+    """python -X importtime으로 module을 import할 때 누적 시간이 큰 모듈을 반환합니다."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=src_dir, capture_output=True, text=True, timeout=120)
+    pattern = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+    entries = []
+    for line in result.stderr.splitlines():
+        match = pattern.match(line)
+        if match:
+            entries.append((int(match.group(2)) / 1000, match.group(4)))
+    entries.sort(reverse=True)
+    return entries[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='시작 단계별 시간과 첫 상태바 표시까지의 시간을 잽니다.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--imports', type=int, default=15, help='누적 import 시간 상위 모듈 수')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env[STARTUP_BENCHMARK_ENV] = '1'
+
+    reports = [run_once(env) for _ in range(args.runs)]
+    print(f"시작 시간 ({args.runs}회, ms)")
+    print(f"{'단계':<26}{'중앙값':>10}{'최소':>10}{'최대':>10}")
+    for stage in STAGES + ['wall']:
+        values = [report[stage] for report in reports if stage in report]
+        if values:
+            print(f"{stage:<26}{statistics.median(values):>10.1f}{min(values):>10.1f}{max(values):>10.1f}")
+
+    print()
+    print("ui.timer_king import 시간 상위 모듈 (누적 ms)")
+    for cumulative_ms, module in import_times('ui.timer_king', args.imports):
+        print(f"{cumulative_ms:>10.1f}  {module}")
+
+
+if __name__ == '__main__':
+    main()
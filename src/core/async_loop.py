@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from core.config import ASYNC_TASK_TIMEOUT, ASYNC_SHUTDOWN_TIMEOUT
+from core.log import get_logger
+
+log = get_logger('async_loop')
+
+
+class AsyncLoop:
+    """별도 스레드에서 asyncio 이벤트 루프를 돌립니다.
+
+    submit()은 어느 스레드에서든 코루틴을 루프에 넘기고 바로 돌아오며,
+    concurrent.futures.Future를 반환합니다. 그 Future의 cancel()은 루프의
+    작업을 취소하고, timeout을 넘긴 작업은 asyncio.TimeoutError로 끝납니다.
+    저장소 읽기처럼 막히는 함수는 코루틴 안에서 run_blocking()으로 부르면
+    루프의 스레드 풀에서 실행되어 루프를 막지 않습니다. 루프는 처음 submit할
+    때 시작합니다.
+    """
+
+    def __init__(self, name='AsyncLoop'):
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """루프 스레드를 시작하고 루프가 준비될 때까지 기다립니다."""
+        with self._lock:
+            if self._thread is not None:
+                return self._loop
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name=self.name, daemon=True)
+            self._thread.start()
+        ready.wait()
+        return self._loop
+
+    def _run(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            # 남은 작업을 취소하고 끝날 기회를 준 뒤 닫습니다
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def submit(self, coro, timeout=ASYNC_TASK_TIMEOUT):
+        """coro를 루프에서 실행하도록 넘기고 Future를 반환합니다. timeout이 None이면 제한이 없습니다."""
+        loop = self.start()
+        if timeout is not None:
+            coro = asyncio.wait_for(coro, timeout)
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def stop(self, timeout=ASYNC_SHUTDOWN_TIMEOUT):
+        """진행 중인 작업을 취소하고 루프 스레드를 멈춥니다."""
+        with self._lock:
+            thread, loop = self._thread, self._loop
+            self._thread = self._loop = None
+        if thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                log.warning("비동기 루프가 %.1f초 안에 멈추지 않았습니다", timeout)
+
+
+async def run_blocking(function, *args):
+    """막히는 function(*args)을 루프의 스레드 풀에서 실행하고 결과를 기다립니다.
+
+    기다리던 코루틴이 취소되거나 시간을 넘겨도 이미 시작된 함수는 끝까지
+    실행됩니다. 결과만 버려집니다.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+
+_async_loop = None
+
+
+def get_async_loop():
+    """앱 전체에서 공유하는 AsyncLoop를 반환합니다."""
+    global _async_loop
+    if _async_loop is None:
+        _async_loop = AsyncLoop()
+    return _async_loop
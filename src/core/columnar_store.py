@@ -0,0 +1,803 @@
+import mmap
+import os
+import shutil
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from operator import itemgetter
+from core.compact_usage import StringTable
+from core.config import USAGE_COLUMNAR_DIR, USAGE_DB_BATCH_SIZE
+from core.data_manager import atomic_write
+from core.time_ranges import day_start_of, hour_start_of, next_day_start, range_bounds
+
+# 창이 없는 구간(또는 어느 창에도 속하지 않는 앱 시간)의 창 ID
+NO_WINDOW = 0xFFFFFFFF
+
+STRINGS_MAGIC = b'MTJSTR01'
+SUMMARY_MAGIC = b'MTJSUM02'
+
+_LENGTH = struct.Struct('<I')
+_SUMMARY_HEADER = struct.Struct('<8sdQ')  # 매직, 기준 시각, 항목 수
+
+# 날짜 파티션 디렉토리 이름 형식
+DAY_FORMAT = '%Y-%m-%d'
+
+COLUMNS = (('app', 'I'), ('window', 'I'), ('start', 'd'), ('end', 'd'))
+
+# 닫힌 날을 모아 두는 범위 요약 단위. 시간과 날 단위는 그 날의 파티션에서 바로 구합니다
+ROLLUP_GRANULARITIES = ('week', 'month')
+
+
+class _Column:
+    """고정 폭 값 하나를 행마다 이어 붙이는 열 파일입니다. 읽기는 mmap으로 합니다."""
+    __slots__ = ('path', 'typecode', 'itemsize', '_map', '_view')
+
+    def __init__(self, path, typecode):
+        self.path = path
+        self.typecode = typecode
+        self.itemsize = array(typecode).itemsize
+        self._map = None
+        self._view = None
+
+    def length(self):
+        """파일에 온전히 기록된 값의 수를 반환합니다."""
+        try:
+            return os.path.getsize(self.path) // self.itemsize
+        except FileNotFoundError:
+            return 0
+
+    def truncate(self, rows):
+        """비정상 종료로 다른 열보다 길어졌거나 잘린 꼬리를 rows개 값에 맞춰 잘라냅니다."""
+        self.release()
+        with open(self.path, 'ab') as f:
+            if f.tell() != rows * self.itemsize:
+                f.truncate(rows * self.itemsize)
+
+    def append(self, values):
+        with open(self.path, 'ab') as f:
+            f.write(values.tobytes())
+
+    def view(self, rows):
+        """앞쪽 rows개 값을 담은 memoryview를 반환합니다. 파일이 커졌으면 다시 매핑합니다.
+
+        매핑만 하고 읽지는 않으므로 슬라이스한 범위의 페이지만 디스크에서 읽힙니다.
+        """
+        if self._view is None or len(self._view) < rows:
+            self.release()
+            if rows == 0:
+                return memoryview(array(self.typecode))
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # 값 하나가 못 되는 꼬리는 빼고 매핑합니다
+            size = len(self._map) // self.itemsize * self.itemsize
+            self._view = memoryview(self._map)[:size].cast(self.typecode)
+        return self._view
+
+    def release(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class _Summary:
+    """(앱 ID, 창 ID)로 정렬한 누적 합계 파일입니다.
+
+    헤더 뒤에 앱 ID, 창 ID, 초, 마지막 사용 시각 열이 차례로 들어 있어
+    한 앱의 범위는 앱 ID 열의 이진 탐색으로 찾습니다.
+    """
+    __slots__ = ('path', 'stamp', 'count', '_map')
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, self.stamp, self.count = _SUMMARY_HEADER.unpack(f.read(_SUMMARY_HEADER.size))
+        if magic != SUMMARY_MAGIC:
+            raise ValueError(f"요약 파일 형식이 아닙니다: {path}")
+        self._map = None
+
+    @staticmethod
+    def write(path, totals, stamp):
+        """totals((앱 ID << 32 | 창 ID) -> [초, 마지막 사용 시각])를 원자적으로 기록합니다."""
+        keys = sorted(totals)
+        header = _SUMMARY_HEADER.pack(SUMMARY_MAGIC, stamp, len(keys))
+        columns = (array('I', [key >> 32 for key in keys]),
+                   array('I', [key & NO_WINDOW for key in keys]),
+                   array('d', [totals[key][0] for key in keys]),
+                   array('d', [totals[key][1] for key in keys]))
+
+        def write(f):
+            f.write(header)
+            for column in columns:
+                f.write(column.tobytes())
+
+        atomic_write(path, write, binary=True)
+
+    def columns(self):
+        """(앱 ID, 창 ID, 초, 마지막 사용 시각) 열을 memoryview로 반환합니다."""
+        count = self.count
+        if count == 0:
+            return [], [], [], []
+        if self._map is None:
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        offset = _SUMMARY_HEADER.size
+        return (view[offset:offset + 4 * count].cast('I'),
+                view[offset + 4 * count:offset + 8 * count].cast('I'),
+                view[offset + 8 * count:offset + 16 * count].cast('d'),
+                view[offset + 16 * count:offset + 24 * count].cast('d'))
+
+    def totals(self):
+        """합계를 (앱 ID << 32 | 창 ID) -> [초, 마지막 사용 시각] 딕셔너리로 반환합니다."""
+        if self.count == 0:
+            return {}
+        apps, windows, seconds, lasts = [column.tolist() for column in self.columns()]
+        return {app_id << 32 | window_id: [total, last_update]
+                for app_id, window_id, total, last_update in zip(apps, windows, seconds, lasts)}
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def _fold_rows(totals, rows, app_id=None):
+    """행들의 사용 시간을 totals에 더합니다. app_id가 있으면 그 앱의 행만 더합니다."""
+    for row_app, window_id, start_time, end_time in zip(*rows):
+        if app_id is not None and row_app != app_id:
+            continue
+        key = row_app << 32 | window_id
+        entry = totals.get(key)
+        if entry is None:
+            totals[key] = [end_time - start_time, end_time]
+        else:
+            entry[0] += end_time - start_time
+            if end_time > entry[1]:
+                entry[1] = end_time
+    return totals
+
+
+def _fold_hours(hours, rows):
+    """행들의 사용 시간을 시간 단위로 나눠 hours(시간 시작 시각 -> 합계)에 더합니다."""
+    for row_app, window_id, start_time, end_time in zip(*rows):
+        key = row_app << 32 | window_id
+        while start_time < end_time:
+            hour_start = hour_start_of(start_time)
+            piece_end = min(end_time, hour_start + 3600)
+            totals = hours.get(hour_start)
+            if totals is None:
+                totals = hours[hour_start] = {}
+            entry = totals.get(key)
+            if entry is None:
+                totals[key] = [piece_end - start_time, piece_end]
+            else:
+                entry[0] += piece_end - start_time
+                if piece_end > entry[1]:
+                    entry[1] = piece_end
+            start_time = piece_end
+    return hours
+
+
+def _merge_totals(totals, other):
+    """other의 합계를 totals에 더합니다."""
+    for key, (seconds, last_update) in other.items():
+        entry = totals.get(key)
+        if entry is None:
+            totals[key] = [seconds, last_update]
+        else:
+            entry[0] += seconds
+            if last_update > entry[1]:
+                entry[1] = last_update
+    return totals
+
+
+class _DayPartition:
+    """하루치 구간을 담는 열 파일 묶음입니다.
+
+    날이 닫히면 그 날의 (앱, 창)별 합계를 summary.bin으로 남깁니다. 이후에는
+    늦게 온 구간만 행으로 덧붙이고 요약에 더합니다.
+    """
+    __slots__ = ('day_start', 'day_end', 'directory', 'summary_file', 'columns', 'rows')
+
+    def __init__(self, directory, day_start):
+        self.day_start = day_start
+        self.day_end = next_day_start(day_start)
+        self.directory = directory
+        self.summary_file = os.path.join(directory, ColumnarUsageStore.SUMMARY_NAME)
+        self.columns = {name: _Column(os.path.join(directory, f"{name}.col"), typecode)
+                        for name, typecode in COLUMNS}
+        self.rows = None  # 처음 읽을 때 파일 크기로 정합니다
+
+    @property
+    def sealed(self):
+        return os.path.exists(self.summary_file)
+
+    def open(self):
+        """행 수를 정하고 열 파일을 그 행 수에 맞춰 자릅니다.
+
+        비정상 종료로 모든 열에 값 하나가 못 되는 꼬리가 남으면 행 수는 같아도
+        파일 크기가 값 크기의 배수가 아니므로, 길이가 다를 때만이 아니라 항상 자릅니다.
+        닫힌 날에도 늦게 온 구간을 덧붙이므로 같이 자릅니다.
+        """
+        if self.rows is None:
+            self.rows = min(column.length() for column in self.columns.values())
+            for column in self.columns.values():
+                column.truncate(self.rows)
+        return self
+
+    def append(self, values):
+        self.open()
+        for name, column in self.columns.items():
+            column.append(values[name])
+        self.rows += len(values['app'])
+
+    def read(self):
+        """모든 행의 네 열을 리스트로 반환합니다."""
+        rows = self.open().rows
+        if rows == 0:
+            return [], [], [], []
+        return [self.columns[name].view(rows)[:rows].tolist() for name, _ in COLUMNS]
+
+    def totals(self):
+        """이 날의 합계를 반환합니다. 닫힌 날은 요약에서 읽습니다."""
+        if self.sealed:
+            summary = _Summary(self.summary_file)
+            try:
+                return summary.totals()
+            finally:
+                summary.close()
+        return _fold_rows({}, self.read())
+
+    def add_to_summary(self, totals):
+        """닫힌 날의 요약에 늦게 온 구간의 합계를 더합니다."""
+        _Summary.write(self.summary_file, _merge_totals(self.totals(), totals), self.day_start)
+
+    def release(self):
+        for column in self.columns.values():
+            column.release()
+
+
+class ColumnarUsageStore:
+    """앱 사용 구간을 날짜별 열 파일에 덧붙여 저장하는 저장소입니다.
+
+    구간 하나는 days/<날짜>/의 app.col(앱 ID), window.col(창 ID), start.col,
+    end.col에 고정 폭 값으로 한 행씩 들어가고, 앱과 창 이름은 strings.bin의
+    문자열 표에 한 번만 기록됩니다. 자정을 넘는 구간은 날짜마다 나눠
+    기록하므로 하루나 한 주 조회는 그 날들의 파일만 mmap으로 읽습니다.
+
+    날이 바뀌면(roll_over) 지난 날의 합계를 그 날의 summary.bin에 남기고
+    totals.bin(닫힌 날 전체의 누적 합계)과 그 날이 속한 주, 달의 요약
+    (rollups/week-<월요일>.bin, rollups/month-<1일>.bin)에 더합니다. 닫힌 날에
+    늦게 온 구간은 그 날의 행과 요약, 누적 합계, 주와 달 요약에 함께 더하므로
+    어느 단위로 조회해도 같은 값이 나옵니다. load/load_windows는 totals.bin과
+    아직 열린 날(보통 오늘)의 행만 읽고, 지난 날은 load_day나 query_intervals로
+    필요할 때만 읽습니다. 열린 날의 날별, 시간별 합계는 메모리에 두고 기록할 때마다
+    더하므로 range_summary는 범위의 구간을 다시 훑지 않습니다.
+    열 파일은 이 기기의 바이트 순서를 그대로 쓰고, 다른 곳으로 옮길 때는
+    JSON으로 내보냅니다.
+    """
+
+    STRINGS_NAME = 'strings.bin'
+    TOTALS_NAME = 'totals.bin'
+    SUMMARY_NAME = 'summary.bin'
+    DAYS_DIR = 'days'
+    ROLLUPS_DIR = 'rollups'
+
+    def __init__(self, directory=USAGE_COLUMNAR_DIR, batch_size=USAGE_DB_BATCH_SIZE, legacy_loader=None):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.strings_file = os.path.join(directory, self.STRINGS_NAME)
+        self.totals_file = os.path.join(directory, self.TOTALS_NAME)
+        self.days_dir = os.path.join(directory, self.DAYS_DIR)
+        self.rollups_dir = os.path.join(directory, self.ROLLUPS_DIR)
+
+        self._lock = threading.RLock()
+        self._pending = []
+        self._strings = StringTable()
+        self._string_count = 0  # strings.bin에 기록된 문자열 수
+        self._partitions = {}  # 날짜 시작 시각 -> _DayPartition
+        self._totals = None  # totals.bin의 _Summary
+        self._through = 0.0  # totals.bin에 반영된 마지막 날의 끝 시각
+        self._open_days = None  # 열린 날의 시작 시각 -> 합계. 처음 조회할 때 만듭니다
+        self._open_hours = None  # 열린 날의 시간 시작 시각 -> 합계
+
+        os.makedirs(self.days_dir, exist_ok=True)
+        rollups_missing = not os.path.isdir(self.rollups_dir)
+        os.makedirs(self.rollups_dir, exist_ok=True)
+        is_new = not os.path.exists(self.strings_file)
+        self._load_strings()
+        self._load_partitions()
+        if os.path.exists(self.totals_file):
+            self._totals = _Summary(self.totals_file)
+            self._through = self._totals.stamp
+
+        if is_new and legacy_loader is not None:
+            usage, intervals = legacy_loader()
+            self.import_history(usage, intervals)
+        elif rollups_missing:
+            self.rebuild_rollups()
+        self.roll_over(day_start_of())
+
+    # 열기
+
+    def _load_strings(self):
+        """strings.bin을 읽어 문자열 표를 만듭니다. 잘린 마지막 항목은 잘라냅니다."""
+        if not os.path.exists(self.strings_file):
+            with open(self.strings_file, 'wb') as f:
+                f.write(STRINGS_MAGIC)
+            return
+        with open(self.strings_file, 'rb') as f:
+            data = f.read()
+        if data[:len(STRINGS_MAGIC)] != STRINGS_MAGIC:
+            raise ValueError(f"문자열 표 형식이 아닙니다: {self.strings_file}")
+        position = len(STRINGS_MAGIC)
+        while position + _LENGTH.size <= len(data):
+            (size,) = _LENGTH.unpack_from(data, position)
+            end = position + _LENGTH.size + size
+            if end > len(data):
+                break
+            self._strings.intern(data[position + _LENGTH.size:end].decode('utf-8'))
+            position = end
+        self._string_count = len(self._strings)
+        if position < len(data):
+            with open(self.strings_file, 'ab') as f:
+                f.truncate(position)
+
+    def _load_partitions(self):
+        """days/ 아래의 날짜 디렉토리를 찾습니다. 열 파일은 처음 읽을 때 엽니다."""
+        for name in os.listdir(self.days_dir):
+            try:
+                day_start = datetime.strptime(name, DAY_FORMAT).timestamp()
+            except ValueError:
+                continue
+            self._partitions[day_start] = _DayPartition(os.path.join(self.days_dir, name), day_start)
+
+    def _partition(self, day_start):
+        partition = self._partitions.get(day_start)
+        if partition is None:
+            directory = os.path.join(self.days_dir, datetime.fromtimestamp(day_start).strftime(DAY_FORMAT))
+            os.makedirs(directory, exist_ok=True)
+            partition = self._partitions[day_start] = _DayPartition(directory, day_start)
+        return partition
+
+    def _open_partitions(self):
+        """누적 합계에 아직 반영되지 않은 날을 오래된 순으로 반환합니다."""
+        return [self._partitions[day_start] for day_start in sorted(self._partitions)
+                if day_start >= self._through]
+
+    def _ensure_open_rollups(self):
+        """열린 날의 날별, 시간별 합계를 아직 만들지 않았으면 그 날들의 행으로 만듭니다."""
+        if self._open_days is not None:
+            return
+        self._open_days, self._open_hours = {}, {}
+        for partition in self._open_partitions():
+            rows = partition.read()
+            self._open_days[partition.day_start] = _fold_rows({}, rows)
+            _fold_hours(self._open_hours, rows)
+
+    def _rollup_file(self, granularity, range_start):
+        name = datetime.fromtimestamp(range_start).strftime(DAY_FORMAT)
+        return os.path.join(self.rollups_dir, f"{granularity}-{name}.bin")
+
+    # 기록
+
+    def append(self, app_name, window_title, start_time, end_time):
+        """구간을 배치에 추가하고, 배치가 차면 기록합니다."""
+        if not app_name or end_time <= start_time:
+            return
+        with self._lock:
+            self._pending.append((app_name, window_title or None, start_time, end_time))
+            if len(self._pending) >= self.batch_size:
+                self._commit_pending()
+
+    def flush(self):
+        """배치에 남은 구간을 모두 기록합니다."""
+        with self._lock:
+            self._commit_pending()
+
+    def _intern(self, text, new_strings):
+        string_id = self._strings.intern(text)
+        if string_id == self._string_count:
+            new_strings.append(text)
+            self._string_count += 1
+        return string_id
+
+    def _write_strings(self, new_strings):
+        """새로 추가된 문자열을 strings.bin 끝에 기록합니다."""
+        if not new_strings:
+            return
+        with open(self.strings_file, 'ab') as f:
+            for text in new_strings:
+                data = text.encode('utf-8')
+                f.write(_LENGTH.pack(len(data)) + data)
+
+    def _commit_pending(self):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        new_strings = []
+        by_day = {}
+        day_start = day_end = 0.0
+        for app_name, window_title, start_time, end_time in rows:
+            app_id = self._intern(app_name, new_strings)
+            window_id = self._intern(window_title, new_strings) if window_title else NO_WINDOW
+            # 자정을 넘는 구간은 날마다 나눠 각 날의 파티션에 넣습니다
+            while start_time < end_time:
+                if not day_start <= start_time < day_end:
+                    day_start = day_start_of(start_time)
+                    day_end = next_day_start(day_start)
+                piece_end = min(end_time, day_end)
+                values = by_day.get(day_start)
+                if values is None:
+                    values = by_day[day_start] = {name: array(typecode) for name, typecode in COLUMNS}
+                values['app'].append(app_id)
+                values['window'].append(window_id)
+                values['start'].append(start_time)
+                values['end'].append(piece_end)
+                start_time = piece_end
+
+        # 문자열을 먼저 기록해 열이 가리키는 ID가 항상 파일에 있게 합니다
+        self._write_strings(new_strings)
+        late = {}  # 닫힌 날의 시작 시각 -> 늦게 온 구간의 합계
+        for day_start, values in by_day.items():
+            self._partition(day_start).append(values)
+            rows = [values[name] for name, _ in COLUMNS]
+            if day_start < self._through:
+                late[day_start] = _fold_rows({}, rows)
+            elif self._open_days is not None:
+                _fold_rows(self._open_days.setdefault(day_start, {}), rows)
+                _fold_hours(self._open_hours, rows)
+        if late:
+            # 닫힌 날의 요약, 누적 합계, 주와 달 요약에 같은 합계를 더합니다.
+            # 요약이 아직 없는 날은 다음 roll_over가 행에서 요약을 만듭니다
+            totals = self._totals.totals() if self._totals is not None else {}
+            for day_start, day_totals in late.items():
+                partition = self._partitions[day_start]
+                if partition.sealed:
+                    partition.add_to_summary(day_totals)
+                partition.release()
+                _merge_totals(totals, day_totals)
+                self._add_to_rollups(day_start, day_totals)
+            self._write_totals(totals, self._through)
+
+    def _write_totals(self, totals, through):
+        if self._totals is not None:
+            self._totals.close()
+        _Summary.write(self.totals_file, totals, through)
+        self._totals = _Summary(self.totals_file)
+        self._through = through
+
+    def _add_to_rollups(self, day_start, totals, through=None):
+        """하루의 합계를 그 날이 속한 주와 달의 요약에 더합니다.
+
+        through(그 날의 끝 시각)를 주면 이미 그 날까지 반영한 요약은 건너뛰고
+        기준 시각을 through로 옮깁니다. 주지 않으면 늦게 온 구간으로 보고
+        기준 시각은 그대로 둡니다.
+        """
+        for granularity in ROLLUP_GRANULARITIES:
+            range_start, _ = range_bounds(granularity, day_start)
+            path = self._rollup_file(granularity, range_start)
+            stamp, merged = range_start, {}
+            if os.path.exists(path):
+                summary = _Summary(path)
+                try:
+                    stamp, merged = summary.stamp, summary.totals()
+                finally:
+                    summary.close()
+            if through is not None:
+                if stamp >= through:
+                    continue
+                stamp = through
+            _Summary.write(path, _merge_totals(merged, totals), stamp)
+
+    def roll_over(self, day_start):
+        """day_start 이전의 열린 날을 닫습니다.
+
+        닫을 날의 합계를 누적 합계(totals.bin)에 먼저 더하고, 주와 달 요약에
+        더한 뒤 그 날의 summary.bin을 남깁니다. 기록 사이에 종료되었더라도
+        다음에 열 때 요약이 없는 날만 다시 쓰고, 주와 달 요약은 기준 시각으로
+        이미 더한 날을 건너뜁니다.
+        """
+        self.flush()
+        with self._lock:
+            closing = [partition for partition in self._open_partitions()
+                       if partition.day_end <= day_start]
+            day_totals = {}
+            if closing:
+                totals = self._totals.totals() if self._totals is not None else {}
+                for partition in closing:
+                    day_totals[partition.day_start] = _fold_rows({}, partition.read())
+                    _merge_totals(totals, day_totals[partition.day_start])
+                self._write_totals(totals, closing[-1].day_end)
+
+            for day in sorted(self._partitions):
+                partition = self._partitions[day]
+                if day >= self._through:
+                    break
+                if not partition.sealed:
+                    totals = day_totals.get(day)
+                    if totals is None:
+                        totals = _fold_rows({}, partition.read())
+                    self._add_to_rollups(day, totals, partition.day_end)
+                    _Summary.write(partition.summary_file, totals, day)
+                partition.release()
+
+            # 닫은 날은 메모리의 열린 날 합계에서 뺍니다
+            if self._open_days is not None:
+                for day in [day for day in self._open_days if day < self._through]:
+                    del self._open_days[day]
+                for hour in [hour for hour in self._open_hours if hour < self._through]:
+                    del self._open_hours[hour]
+
+    def rebuild_rollups(self):
+        """닫힌 날의 행으로 주와 달 요약을 모두 다시 만듭니다."""
+        self.flush()
+        with self._lock:
+            rollups = {}  # (단위, 범위 시작 시각) -> [합계, 기준 시각]
+            for day in sorted(self._partitions):
+                if day >= self._through:
+                    break
+                partition = self._partitions[day]
+                totals = _fold_rows({}, partition.read())
+                partition.release()
+                for granularity in ROLLUP_GRANULARITIES:
+                    range_start, _ = range_bounds(granularity, day)
+                    rollup = rollups.setdefault((granularity, range_start), [{}, range_start])
+                    _merge_totals(rollup[0], totals)
+                    rollup[1] = partition.day_end
+
+            shutil.rmtree(self.rollups_dir, ignore_errors=True)
+            os.makedirs(self.rollups_dir, exist_ok=True)
+            for (granularity, range_start), (totals, stamp) in rollups.items():
+                _Summary.write(self._rollup_file(granularity, range_start), totals, stamp)
+
+    # 조회
+
+    def _aggregate(self, app_id=None):
+        """누적 합계와 열린 날의 행을 합쳐 (앱 ID << 32 | 창 ID) -> [초, 마지막 사용 시각]을 반환합니다."""
+        totals = self._totals.totals() if self._totals is not None else {}
+        for partition in self._open_partitions():
+            _fold_rows(totals, partition.read(), app_id)
+        return totals
+
+    def _usage_from_totals(self, totals):
+        """합계 딕셔너리를 app_usage 형식으로 바꿉니다."""
+        usage = {}
+        get = self._strings.get
+        app_names = {}
+        for key, (seconds, last_update) in totals.items():
+            app_id, window_id = key >> 32, key & NO_WINDOW
+            app_name = app_names.get(app_id)
+            if app_name is None:
+                app_name = app_names[app_id] = get(app_id)
+                usage[app_name] = {'total_time': 0, 'windows': {}}
+            app_data = usage[app_name]
+            app_data['total_time'] += seconds
+            if last_update > app_data.get('last_update', 0):
+                app_data['last_update'] = last_update
+            if window_id != NO_WINDOW:
+                app_data['windows'][get(window_id)] = seconds
+        return usage
+
+    def query_intervals(self, start_ts, end_ts, app_name=None):
+        """[start_ts, end_ts)와 겹치는 구간을 (앱, 창, 시작, 끝) 리스트로 반환합니다.
+
+        범위에 걸친 날의 파일만 읽고, 닫힌 날의 매핑은 읽은 뒤 바로 풉니다.
+        """
+        self.flush()
+        found = []
+        with self._lock:
+            app_id = None
+            if app_name is not None:
+                app_id = self._strings.find(app_name)
+                if app_id == -1:
+                    return found
+            names = {NO_WINDOW: None}
+            get = self._strings.get
+            for day_start in sorted(self._partitions):
+                partition = self._partitions[day_start]
+                if day_start >= end_ts or partition.day_end <= start_ts:
+                    continue
+                for row_app, row_window, start_time, end_time in zip(*partition.read()):
+                    if start_time < end_ts and end_time > start_ts and (app_id is None or row_app == app_id):
+                        if row_app not in names:
+                            names[row_app] = get(row_app)
+                        if row_window not in names:
+                            names[row_window] = get(row_window)
+                        found.append((names[row_app], names[row_window], start_time, end_time))
+                if day_start < self._through:
+                    partition.release()
+        found.sort(key=itemgetter(2))
+        return found
+
+    def range_summary(self, granularity, timestamp=None):
+        """timestamp가 속한 시간/날/주/달의 사용 데이터를 app_usage 형식으로 반환합니다.
+
+        열린 날은 메모리의 날별, 시간별 합계를 쓰고, 닫힌 날은 그 날의 요약이나
+        주, 달 요약을 읽습니다. 닫힌 날의 한 시간은 그 날의 행만 다시 나눕니다.
+        """
+        start, end = range_bounds(granularity, timestamp)
+        self.flush()
+        with self._lock:
+            self._ensure_open_rollups()
+            totals = {}
+            if granularity == 'hour':
+                day = day_start_of(start)
+                if day >= self._through:
+                    _merge_totals(totals, self._open_hours.get(start, {}))
+                elif day in self._partitions:
+                    partition = self._partitions[day]
+                    _merge_totals(totals, _fold_hours({}, partition.read()).get(start, {}))
+                    partition.release()
+            elif granularity == 'day':
+                if start >= self._through:
+                    _merge_totals(totals, self._open_days.get(start, {}))
+                elif start in self._partitions:
+                    totals = self._partitions[start].totals()
+            else:
+                path = self._rollup_file(granularity, start)
+                if os.path.exists(path):
+                    summary = _Summary(path)
+                    try:
+                        totals = summary.totals()
+                    finally:
+                        summary.close()
+                for day, day_totals in self._open_days.items():
+                    if start <= day < end:
+                        _merge_totals(totals, day_totals)
+            return self._usage_from_totals(totals)
+
+    def load(self, with_windows=True):
+        """누적 사용 데이터를 기존 app_usage 형식으로 반환합니다.
+
+        with_windows가 False이면 앱별 합계와 창 수(window_count)만 집계하고
+        windows는 None으로 둡니다.
+        """
+        if not with_windows:
+            return self._load_totals()
+        self.flush()
+        with self._lock:
+            return self._usage_from_totals(self._aggregate())
+
+    def _load_totals(self):
+        """앱별 합계, 마지막 사용 시각과 창 수를 누적 합계 열에서 바로 집계합니다."""
+        self.flush()
+        totals = {}  # 앱 ID -> [초, 마지막 사용 시각, 창 수]
+        with self._lock:
+            apps, window_ids = [], []
+            if self._totals is not None and self._totals.count:
+                columns = self._totals.columns()
+                apps, window_ids = columns[0].tolist(), columns[1].tolist()
+                for app_id, window_id, seconds, last_update in zip(
+                        apps, window_ids, columns[2].tolist(), columns[3].tolist()):
+                    entry = totals.get(app_id)
+                    if entry is None:
+                        entry = totals[app_id] = [0.0, 0.0, 0]
+                    entry[0] += seconds
+                    if last_update > entry[1]:
+                        entry[1] = last_update
+                    if window_id != NO_WINDOW:
+                        entry[2] += 1
+
+            # 열린 날의 행은 누적 합계에 없던 창만 창 수에 더합니다
+            seen = set()
+            for partition in self._open_partitions():
+                for app_id, window_id, start_time, end_time in zip(*partition.read()):
+                    entry = totals.get(app_id)
+                    if entry is None:
+                        entry = totals[app_id] = [0.0, 0.0, 0]
+                    entry[0] += end_time - start_time
+                    if end_time > entry[1]:
+                        entry[1] = end_time
+                    key = app_id << 32 | window_id
+                    if window_id != NO_WINDOW and key not in seen:
+                        seen.add(key)
+                        first, last = bisect_left(apps, app_id), bisect_right(apps, app_id)
+                        position = bisect_left(window_ids, window_id, first, last)
+                        if position == last or window_ids[position] != window_id:
+                            entry[2] += 1
+
+            get = self._strings.get
+            return {get(app_id): {'total_time': seconds, 'last_update': last_update,
+                                  'windows': None, 'window_count': window_count}
+                    for app_id, (seconds, last_update, window_count) in totals.items()}
+
+    def load_windows(self, app_name):
+        """한 앱의 창별 누적 시간을 반환합니다. 누적 합계에서는 그 앱의 범위만 읽습니다."""
+        self.flush()
+        windows = {}
+        with self._lock:
+            app_id = self._strings.find(app_name)
+            if app_id == -1:
+                return windows
+            totals = {}
+            if self._totals is not None:
+                apps, window_ids, seconds, lasts = self._totals.columns()
+                first, last = bisect_left(apps, app_id), bisect_right(apps, app_id)
+                for window_id, window_seconds, last_update in zip(
+                        window_ids[first:last], seconds[first:last], lasts[first:last]):
+                    totals[app_id << 32 | window_id] = [window_seconds, last_update]
+            for partition in self._open_partitions():
+                _fold_rows(totals, partition.read(), app_id)
+            get = self._strings.get
+            for key, (window_seconds, _) in totals.items():
+                if key & NO_WINDOW != NO_WINDOW:
+                    windows[get(key & NO_WINDOW)] = window_seconds
+        return windows
+
+    def load_day(self, day_start):
+        """하루의 사용 데이터를 app_usage 형식으로 반환합니다. 닫힌 날은 그 날의 요약만 읽습니다."""
+        self.flush()
+        with self._lock:
+            partition = self._partitions.get(day_start)
+            if partition is None:
+                return {}
+            return self._usage_from_totals(partition.totals())
+
+    def days(self):
+        """기록이 있는 날의 시작 시각을 오름차순으로 반환합니다."""
+        self.flush()
+        with self._lock:
+            return sorted(self._partitions)
+
+    def replace(self, usage):
+        """누적 데이터가 usage와 같아지도록 누적 합계를 다시 씁니다. 날짜별 기록은 그대로 둡니다.
+
+        창 목록을 읽지 않은(windows가 None인) 앱은 저장된 창별 합계를 그대로 두고
+        앱 합계만 맞춥니다.
+        """
+        self.flush()
+        with self._lock:
+            new_strings = []
+            totals = {}
+            deferred = set()  # 창 목록을 읽지 않은 앱의 ID
+            for app_name, app_data in usage.items():
+                app_id = self._intern(app_name, new_strings)
+                windows = app_data.get('windows')
+                if windows is None:
+                    deferred.add(app_id)
+                    windows = {}
+                windows = {window_title: seconds for window_title, seconds in windows.items() if window_title}
+                for window_title, seconds in windows.items():
+                    totals[app_id << 32 | self._intern(window_title, new_strings)] = [
+                        seconds, app_data.get('last_update', 0)]
+                # 어느 창에도 속하지 않는 시간과 마지막 사용 시각은 창 없는 항목에 둡니다
+                totals[app_id << 32 | NO_WINDOW] = [app_data.get('total_time', 0) - sum(windows.values()),
+                                                    app_data.get('last_update', 0)]
+            self._write_strings(new_strings)
+
+            if deferred and self._totals is not None:
+                for key, entry in self._totals.totals().items():
+                    if key >> 32 in deferred and key & NO_WINDOW != NO_WINDOW:
+                        totals[key] = entry
+                        totals[key | NO_WINDOW][0] -= entry[0]
+
+            # 열린 날의 행은 불러올 때 다시 더해지므로 미리 빼 둡니다. 창별 합계를
+            # 그대로 둔 앱은 그 창의 시간을 창 없는 항목에서 뺍니다
+            for partition in self._open_partitions():
+                for key, (seconds, _) in _fold_rows({}, partition.read()).items():
+                    if key >> 32 in deferred:
+                        key |= NO_WINDOW
+                    totals.setdefault(key, [0.0, 0.0])[0] -= seconds
+            self._write_totals(totals, self._through)
+
+    def import_history(self, usage, intervals):
+        """구간 목록을 날짜별로 기록하고 지난 날을 닫은 뒤 누적 데이터를 usage로 맞춥니다."""
+        for app_name, window_title, start_time, end_time in sorted(intervals, key=itemgetter(2)):
+            self.append(app_name, window_title, start_time, end_time)
+        self.roll_over(day_start_of())
+        self.replace(usage)
+
+    def close(self):
+        """남은 배치를 기록하고 매핑을 닫습니다."""
+        self.flush()
+        with self._lock:
+            for partition in self._partitions.values():
+                partition.release()
+            if self._totals is not None:
+                self._totals.close()
@@ -0,0 +1,297 @@
+import sys
+from array import array
+from collections.abc import Mapping
+
+# 찾는 문자열이나 창이 없을 때의 ID와 위치
+_EMPTY = -1
+
+
+class StringTable:
+    """문자열을 한 번만 저장하고 정수 ID로 가리키는 문자열 표입니다.
+
+    문자열 -> ID는 딕셔너리로, ID -> 문자열은 리스트로 찾습니다. 같은 창
+    제목이 여러 번 나와도 문자열 객체는 하나만 남고, 창별 시간 배열에는
+    문자열 대신 ID가 들어갑니다.
+    """
+    __slots__ = ('_ids', '_strings')
+
+    def __init__(self):
+        self._ids = {}  # 문자열 -> ID
+        self._strings = []  # ID -> 문자열
+
+    def __len__(self):
+        return len(self._strings)
+
+    def find(self, text):
+        """text의 ID를 반환합니다. 표에 없으면 -1입니다."""
+        return self._ids.get(text, _EMPTY)
+
+    def intern(self, text):
+        """text의 ID를 반환합니다. 처음 보는 문자열이면 표에 추가합니다."""
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = self._ids[text] = len(self._strings)
+            self._strings.append(text)
+        return string_id
+
+    def get(self, string_id):
+        """ID의 문자열을 반환합니다."""
+        return self._strings[string_id]
+
+    def get_many(self, string_ids):
+        """여러 ID의 문자열을 리스트로 반환합니다."""
+        strings = self._strings
+        return [strings[string_id] for string_id in string_ids]
+
+    def nbytes(self):
+        """표의 딕셔너리, 리스트와 문자열 객체가 차지하는 메모리(바이트)를 반환합니다."""
+        return (sys.getsizeof(self._ids) + sys.getsizeof(self._strings) +
+                sum(sys.getsizeof(text) for text in self._strings))
+
+
+class UsageRecord:
+    """한 앱의 누적 사용 시간입니다.
+
+    창별 시간은 창 제목 ID 배열(window_ids)과 같은 순서의 초 배열(seconds)에
+    담고, 창 ID -> 위치는 딕셔너리(slots)로 찾습니다. window_ids가 None이면 창
+    목록을 아직 읽지 않은 것이고 그동안은 window_count만 알고 있습니다.
+    """
+    __slots__ = ('total_time', 'last_update', 'window_count', 'window_ids', 'seconds', 'slots')
+
+    def __init__(self, total_time=0.0, last_update=0.0):
+        self.total_time = total_time
+        self.last_update = last_update
+        self.clear_windows()
+
+    def windows_loaded(self):
+        return self.window_ids is not None
+
+    def defer_windows(self, window_count):
+        """창 목록을 버리고 창 수만 남깁니다."""
+        self.window_ids = self.seconds = self.slots = None
+        self.window_count = window_count
+
+    def clear_windows(self):
+        """빈 창 목록으로 시작합니다."""
+        self.window_ids = array('I')
+        self.seconds = array('d')
+        self.slots = {}
+        self.window_count = 0
+
+    def slot(self, window_id):
+        """window_id의 위치를 반환합니다. 없으면 -1입니다."""
+        return self.slots.get(window_id, _EMPTY)
+
+    def add_window(self, window_id, seconds):
+        """window_id에 seconds를 더합니다. 처음 보는 창이면 추가합니다."""
+        slot = self.slots.get(window_id)
+        if slot is None:
+            self._append(window_id, seconds)
+        else:
+            self.seconds[slot] += seconds
+
+    def set_window(self, window_id, seconds):
+        """window_id의 시간을 seconds로 바꿉니다."""
+        slot = self.slots.get(window_id)
+        if slot is None:
+            self._append(window_id, seconds)
+        else:
+            self.seconds[slot] = seconds
+
+    def _append(self, window_id, seconds):
+        self.slots[window_id] = len(self.window_ids)
+        self.window_ids.append(window_id)
+        self.seconds.append(seconds)
+
+    def nbytes(self):
+        if self.window_ids is None:
+            return 0
+        return (self.window_ids.itemsize * len(self.window_ids) +
+                self.seconds.itemsize * len(self.seconds) + sys.getsizeof(self.slots))
+
+
+class WindowsView(Mapping):
+    """UsageRecord의 창별 시간을 창 제목 -> 초 딕셔너리처럼 읽는 뷰입니다."""
+    __slots__ = ('_record', '_strings')
+
+    def __init__(self, record, strings):
+        self._record = record
+        self._strings = strings
+
+    def __getitem__(self, window_title):
+        window_id = self._strings.find(window_title)
+        slot = self._record.slot(window_id) if window_id != _EMPTY else _EMPTY
+        if slot == _EMPTY:
+            raise KeyError(window_title)
+        return self._record.seconds[slot]
+
+    def __contains__(self, window_title):
+        window_id = self._strings.find(window_title)
+        return window_id != _EMPTY and self._record.slot(window_id) != _EMPTY
+
+    def __iter__(self):
+        get = self._strings.get
+        return (get(window_id) for window_id in self._record.window_ids)
+
+    def __len__(self):
+        return len(self._record.window_ids)
+
+    def items(self):
+        return list(zip(self._strings.get_many(self._record.window_ids), self._record.seconds))
+
+    def __setitem__(self, window_title, seconds):
+        self._record.set_window(self._strings.intern(window_title), seconds)
+
+
+class AppUsageView(Mapping):
+    """UsageRecord를 기존 app_usage의 앱 항목 딕셔너리처럼 읽는 뷰입니다.
+
+    'windows'는 창 목록을 읽지 않았으면 None이고, 그때만 'window_count'가 있습니다.
+    """
+    __slots__ = ('_record', '_strings')
+
+    def __init__(self, record, strings):
+        self._record = record
+        self._strings = strings
+
+    def _keys(self):
+        if self._record.windows_loaded():
+            return ('total_time', 'last_update', 'windows')
+        return ('total_time', 'last_update', 'windows', 'window_count')
+
+    def __getitem__(self, key):
+        record = self._record
+        if key == 'total_time':
+            return record.total_time
+        if key == 'last_update':
+            return record.last_update
+        if key == 'windows':
+            return WindowsView(record, self._strings) if record.windows_loaded() else None
+        if key == 'window_count' and not record.windows_loaded():
+            return record.window_count
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+
+class CompactUsage(Mapping):
+    """앱 사용 데이터를 앱별 UsageRecord와 공유 문자열 표로 담는 저장소입니다.
+
+    기존 코드는 app_usage[앱]['windows'][창]처럼 딕셔너리로 읽을 수 있고,
+    값을 바꿀 때는 add_interval, set_totals, set_window, set_windows를 씁니다.
+    창 제목은 StringTable에 한 번만 저장되고 창별 시간은 실수 배열에 들어가므로
+    창마다 float 객체를 만들지 않습니다. 일반 딕셔너리와의 메모리, 집계 시간
+    비교는 benchmarks/pipeline_benchmark.py의 사용 데이터 항목에 나옵니다.
+    """
+    __slots__ = ('_records', '_strings')
+
+    def __init__(self, strings=None):
+        self._records = {}  # 앱 이름 -> UsageRecord
+        self._strings = strings if strings is not None else StringTable()
+
+    @classmethod
+    def from_usage(cls, usage, strings=None):
+        """app_usage 형식의 딕셔너리(windows가 None인 항목 포함)로 만듭니다."""
+        compact = cls(strings)
+        for app_name, app_data in usage.items():
+            compact.set_totals(app_name, app_data.get('total_time', 0), app_data.get('last_update', 0))
+            compact.set_windows(app_name, app_data.get('windows'), app_data.get('window_count', 0))
+        return compact
+
+    # 읽기
+
+    def __getitem__(self, app_name):
+        return AppUsageView(self._records[app_name], self._strings)
+
+    def __contains__(self, app_name):
+        return app_name in self._records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def record(self, app_name):
+        """app_name의 UsageRecord를 반환합니다. 없으면 None입니다."""
+        return self._records.get(app_name)
+
+    def windows_loaded(self, app_name):
+        """app_name의 창 목록을 읽었는지 확인합니다. 앱이 없으면 None입니다."""
+        record = self._records.get(app_name)
+        return None if record is None else record.windows_loaded()
+
+    def window_count(self, app_name):
+        record = self._records.get(app_name)
+        if record is None:
+            return 0
+        return len(record.window_ids) if record.windows_loaded() else record.window_count
+
+    def to_dict(self):
+        """app_usage 형식의 일반 딕셔너리로 바꿉니다."""
+        usage = {}
+        for app_name, record in self._records.items():
+            app_data = {'total_time': record.total_time, 'last_update': record.last_update}
+            if record.windows_loaded():
+                app_data['windows'] = dict(WindowsView(record, self._strings).items())
+            else:
+                app_data['windows'] = None
+                app_data['window_count'] = record.window_count
+            usage[app_name] = app_data
+        return usage
+
+    def nbytes(self):
+        """문자열 표와 창 배열이 차지하는 메모리(바이트)를 반환합니다."""
+        return self._strings.nbytes() + sum(record.nbytes() for record in self._records.values())
+
+    # 쓰기
+
+    def _record(self, app_name):
+        record = self._records.get(app_name)
+        if record is None:
+            record = self._records[app_name] = UsageRecord()
+        return record
+
+    def add_interval(self, app_name, window_title, start_time, end_time):
+        """사용 구간 하나를 더합니다 (data_manager.apply_interval과 같은 규칙)."""
+        elapsed = end_time - start_time
+        if not app_name or elapsed <= 0:
+            return
+        record = self._record(app_name)
+        record.total_time += elapsed
+        record.last_update = max(record.last_update, end_time)
+        if window_title:
+            if not record.windows_loaded():
+                # 새 창인지 알 수 없으므로 펼칠 창이 있다는 것만 남깁니다
+                record.window_count = record.window_count or 1
+                return
+            record.add_window(self._strings.intern(window_title), elapsed)
+
+    def set_totals(self, app_name, total_time, last_update):
+        """앱의 합계와 마지막 사용 시각을 바꿉니다."""
+        record = self._record(app_name)
+        record.total_time = total_time
+        record.last_update = last_update
+
+    def set_window(self, app_name, window_title, seconds):
+        """창 하나의 누적 시간을 바꿉니다. 창 목록을 읽지 않은 앱은 창 수만 고칩니다."""
+        record = self._record(app_name)
+        if not record.windows_loaded():
+            record.window_count = record.window_count or 1
+            return
+        record.set_window(self._strings.intern(window_title), seconds)
+
+    def set_windows(self, app_name, windows, window_count=0):
+        """앱의 창 목록 전체를 바꿉니다. windows가 None이면 창 수만 남깁니다."""
+        record = self._record(app_name)
+        if windows is None:
+            record.defer_windows(window_count)
+            return
+        record.clear_windows()
+        intern = self._strings.intern
+        for window_title, seconds in windows.items():
+            record.set_window(intern(window_title), seconds)
@@ -9,10 +9,76 @@ DATA_DIR = os.path.join(os.path.expanduser('~'), '.mactimeja')
 APP_USAGE_FILE = os.path.join(DATA_DIR, 'app_usage.json')
 TIMER_DATA_FILE = os.path.join(DATA_DIR, 'timer_data.json')
 
+# 사용 기록 로그 설정
+USAGE_LOG_DIR = os.path.join(DATA_DIR, 'usage_log')
+USAGE_LOG_SEGMENT_SIZE = 1024 * 1024  # 바이트
+USAGE_LOG_COMPACT_INTERVAL = 300.0  # 초
+USAGE_LOG_CHECKPOINT_INTERVAL = 60.0  # 초, 열린 구간을 나눠 기록하는 주기
+USAGE_JSON_CHUNK_SIZE = 64 * 1024  # 문자, JSON 스냅샷을 나눠 읽는 단위
+
+# 사용 기록 저장소 설정 ('columnar', 'sqlite' 또는 'log')
+USAGE_BACKEND = 'columnar'
+USAGE_COLUMNAR_DIR = os.path.join(DATA_DIR, 'usage_columns')
+USAGE_DB_FILE = os.path.join(DATA_DIR, 'usage.db')
+USAGE_DB_BATCH_SIZE = 32  # 한 트랜잭션에 기록할 최대 구간 수
+
+# 저장 스레드 설정
+PERSIST_INTERVAL = 2.0  # 초, 같은 데이터를 다시 기록하기까지의 최소 간격
+
+# 비동기 작업 설정 (창 제목 조회, 저장, 내보내기 코루틴을 도는 asyncio 루프)
+ASYNC_TASK_TIMEOUT = 10.0  # 초, 따로 정하지 않은 작업의 제한 시간
+ASYNC_SHUTDOWN_TIMEOUT = 2.0  # 초, 종료할 때 남은 작업을 기다리는 시간
+CLOSE_FLUSH_TIMEOUT = 5.0  # 초, 창을 닫기 전에 기록 반영을 기다리는 최대 시간
+
+# 전면 앱 감지 설정 ('auto', 'nsworkspace', 'scripted')
+FOCUS_SOURCE = 'auto'
+
+# 창 제목 조회 설정
+TITLE_RESOLVER_COMMAND = None  # None이면 플랫폼 기본 도우미를 사용합니다
+TITLE_RESOLVER_TIMEOUT = 2.0  # 초, 응답 없는 요청을 다시 보내기까지의 시간
+TITLE_CACHE_TTL = 5.0  # 초, 같은 앱 안의 창 전환을 알아채는 최대 지연 (앱 전환 때는 바로 무효화합니다)
+TITLE_CACHE_SIZE = 256  # 앱 수
+
+# 틱 스케줄러 설정
+TICK_INTERVAL = 1.0  # 초, 화면이 보일 때의 간격
+TICK_BACKGROUND_INTERVAL = 5.0  # 초, 빠른 갱신을 요청한 곳이 없을 때의 간격
+TICK_IDLE_INTERVAL = 30.0  # 초, 자리 비움 중 틱 간격의 상한 (두 배씩 늘어납니다)
+TICK_ALIGN_SLACK = 0.005  # 초, 경계 직후에 울리도록 더하는 여유
+
+# 추적 데몬 설정 ('daemon'은 별도 프로세스, 'inprocess'는 화면 프로세스의 스레드에서 추적합니다)
+TRACKER_MODE = 'daemon'
+TRACKER_SOCKET = os.path.join(DATA_DIR, 'tracker.sock')
+TRACKER_LOG_FILE = os.path.join(DATA_DIR, 'tracker.log')
+TRACKER_CONNECT_TIMEOUT = 5.0  # 초, 데몬을 띄운 뒤 연결을 기다리는 시간
+TRACKER_RECONNECT_INTERVAL = 2.0  # 초
+TRACKER_MAX_BACKLOG = 1000  # 메시지, 읽지 않는 화면과의 연결을 끊기 전까지 쌓아 둘 수
+
+# 자리 비움 감지 설정 ('auto', 'quartz', 'scripted', 'none')
+IDLE_SOURCE = 'auto'
+IDLE_THRESHOLD = 300.0  # 초, 입력이 이만큼 없으면 사용 시간을 더하지 않습니다
+
+# 로그 설정 (환경 변수 MACTIMEJA_LOG_LEVEL로 수준을 바꿀 수 있습니다)
+LOG_LEVEL = 'WARNING'  # 'DEBUG'이면 틱마다의 추적 과정을 남깁니다
+LOG_DIR = os.path.join(DATA_DIR, 'logs')
+LOG_MAX_BYTES = 1024 * 1024  # 바이트, 넘으면 파일을 교체합니다
+LOG_BACKUP_COUNT = 3
+LOG_CONSOLE = True  # 표준 출력에도 씁니다 (추적 데몬은 쓰지 않습니다)
+LOG_RATE_LIMIT_INTERVAL = 60.0  # 초
+LOG_RATE_LIMIT_BURST = 5  # 같은 기록을 interval 동안 남길 최대 수
+
+# 계측 설정 (환경 변수 MACTIMEJA_METRICS=1로도 켤 수 있습니다)
+METRICS_ENABLED = False
+METRICS_DIR = os.path.join(DATA_DIR, 'metrics')
+METRICS_DUMP_INTERVAL = 60.0  # 초, 켜져 있을 때 파일로 기록하는 주기
+
+# 프로파일 설정 (상태바의 Profile 60s, MACTIMEJA_PROFILE 또는 main.py --profile)
+PROFILE_DIR = os.path.join(DATA_DIR, 'profiles')
+PROFILE_DURATION = 60.0  # 초
+PROFILE_SAMPLE_INTERVAL = 0.01  # 초, 스택을 읽는 간격
+
 # 캐시 설정
 APP_CACHE_LIFETIME = 2.0  # 초
 APP_LIST_UPDATE_INTERVAL = 10000  # 밀리초
-TIME_UPDATE_INTERVAL = 1000  # 밀리초
 
 # UI 설정
 STATUS_BAR_WIDTH = 90
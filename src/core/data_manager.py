@@ -1,8 +1,628 @@
+import copy
 import json
 import os
-from core.config import DATA_DIR, APP_USAGE_FILE, TIMER_DATA_FILE
+import tempfile
+import threading
+import time
+from core.config import (DATA_DIR, APP_USAGE_FILE, TIMER_DATA_FILE, USAGE_LOG_DIR,
+                         USAGE_LOG_SEGMENT_SIZE, USAGE_LOG_COMPACT_INTERVAL, USAGE_BACKEND,
+                         USAGE_DB_FILE, PERSIST_INTERVAL, USAGE_JSON_CHUNK_SIZE)
+from core.async_loop import run_blocking
+from core.metrics import get_metrics
+from core.time_ranges import next_day_start, range_bounds
+from core.log import get_logger
+
+log = get_logger('data_manager')
+
+
+def atomic_write(path, write, binary=False):
+    """임시 파일에 write(f)로 쓰고 fsync 한 뒤 os.replace로 교체해, 중간에 죽어도 이전 파일이 남게 합니다."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with (os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8')) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # 교체된 디렉토리 항목도 디스크에 반영합니다
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+def atomic_write_json(path, data, indent=None):
+    """data를 JSON으로 원자적으로 저장합니다 (atomic_write 참고)."""
+    if indent is None:
+        atomic_write(path, lambda f: json.dump(data, f, ensure_ascii=False, separators=(',', ':')))
+    else:
+        atomic_write(path, lambda f: json.dump(data, f, ensure_ascii=False, indent=indent))
+
+
+class StreamingJsonReader:
+    """큰 JSON 객체를 파일에서 조금씩 읽으며 멤버 단위로 해석하는 읽기 도구입니다.
+
+    json.load처럼 파일 전체를 문자열로 읽은 뒤 한꺼번에 객체로 바꾸지 않고,
+    chunk_size만큼씩 읽어 둔 버퍼에서 키와 값을 하나씩 꺼냅니다. 따라서 한
+    번에 메모리에 올라가는 것은 버퍼와 지금 해석 중인 값 하나뿐입니다.
+    """
+
+    _WHITESPACE = ' \t\r\n'
+
+    def __init__(self, f, chunk_size=USAGE_JSON_CHUNK_SIZE):
+        self._file = f
+        self.chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._first = True
+
+    def _fill(self, size=None):
+        """버퍼에 더 읽어 옵니다. 파일 끝이면 False를 반환합니다."""
+        if self._eof:
+            return False
+        chunk = self._file.read(size or self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos > self.chunk_size:
+            # 이미 해석한 앞부분은 버려 버퍼가 파일 크기만큼 커지지 않게 합니다
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += chunk
+        return True
+
+    def _peek(self):
+        """공백을 건너뛰고 다음 문자를 반환합니다. 파일 끝이면 ''입니다."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self._WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return self._buffer[self._pos:self._pos + 1]
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"JSON 형식 오류: '{char}'가 필요합니다 (위치 {self._pos})")
+        self._pos += 1
+
+    def begin_object(self):
+        """'{'를 읽어 객체 안으로 들어갑니다."""
+        self._expect('{')
+        self._first = True
+
+    def next_key(self):
+        """현재 객체의 다음 키를 반환합니다. 객체가 끝나면 None입니다."""
+        char = self._peek()
+        if char == '}':
+            self._pos += 1
+            return None
+        if not self._first:
+            self._expect(',')
+        self._first = False
+        key = self.value()
+        self._expect(':')
+        return key
+
+    def value(self):
+        """다음 값 하나를 해석해 반환합니다. 값이 버퍼를 넘으면 더 읽어 옵니다."""
+        self._peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # 버퍼 끝에서 잘린 값이면 더 읽고, 큰 값일수록 한 번에 많이 읽습니다
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            if end == len(self._buffer) and not self._eof and not isinstance(value, (dict, list, str)):
+                # 숫자는 버퍼 끝에서 잘려도 해석되므로 다음 조각을 확인합니다
+                if self._fill(size):
+                    continue
+            self._pos = end
+            return value
+
+    def skip_to(self, key):
+        """현재 객체에서 key 멤버의 값 앞까지 이동합니다. 없으면 False를 반환합니다."""
+        while True:
+            name = self.next_key()
+            if name is None:
+                return False
+            if name == key:
+                return True
+            self.value()
+
+
+def _defer_windows(app_data):
+    """앱 항목의 창 목록을 떼어 내고 창 수만 남깁니다."""
+    windows = app_data.get('windows') or {}
+    app_data['windows'] = None
+    app_data['window_count'] = len(windows)
+    return app_data
+
+
+def iter_usage_json(reader, with_windows=True):
+    """reader가 가리키는 app_usage 객체의 (앱 이름, 앱 데이터)를 하나씩 꺼냅니다.
+
+    with_windows가 False이면 앱마다 창 목록을 버리고 창 수(window_count)만
+    남기며 windows는 None이 됩니다. 창 목록은 필요할 때 load_windows로 읽습니다.
+    """
+    reader.begin_object()
+    while True:
+        app_name = reader.next_key()
+        if app_name is None:
+            return
+        app_data = reader.value()
+        yield app_name, app_data if with_windows else _defer_windows(app_data)
+
+
+def apply_interval(usage, app_name, window_title, start_time, end_time):
+    """사용 구간 하나를 app_usage 형식의 딕셔너리에 더합니다.
+
+    창 목록을 아직 읽지 않은(windows가 None인) 앱은 합계와 창 수만 고칩니다.
+    """
+    elapsed = end_time - start_time
+    if not app_name or elapsed <= 0:
+        return
+
+    app_data = usage.setdefault(app_name, {'total_time': 0, 'windows': {}})
+    app_data['total_time'] = app_data.get('total_time', 0) + elapsed
+    app_data['last_update'] = max(app_data.get('last_update', 0), end_time)
+
+    if window_title:
+        windows = app_data.setdefault('windows', {})
+        if windows is None:
+            # 새 창인지 알 수 없으므로 펼칠 창이 있다는 것만 남깁니다
+            app_data['window_count'] = app_data.get('window_count') or 1
+            return
+        windows[window_title] = windows.get(window_title, 0) + elapsed
+
+
+class UsageLog:
+    """앱 사용 구간을 세그먼트 로그에 덧붙여 기록하는 저장소입니다.
+
+    구간 하나는 [앱, 창, 시작, 끝] 형태의 한 줄 JSON으로 현재 세그먼트 끝에
+    추가되므로 기록 비용은 쌓인 기록의 양과 무관합니다. 닫힌 세그먼트는
+    압축 스레드가 스냅샷에 합친 뒤 삭제하고, 로드는 스냅샷에 남은 세그먼트를
+    재생한 결과를 돌려줍니다.
+    """
+
+    SNAPSHOT_NAME = 'snapshot.json'
+    SEGMENT_PREFIX = 'segment-'
+    SEGMENT_SUFFIX = '.log'
+
+    def __init__(self, log_dir=USAGE_LOG_DIR, segment_size=USAGE_LOG_SEGMENT_SIZE,
+                 legacy_file=APP_USAGE_FILE):
+        self.log_dir = log_dir
+        self.segment_size = segment_size
+        self.legacy_file = legacy_file
+        self.snapshot_file = os.path.join(log_dir, self.SNAPSHOT_NAME)
+
+        # _lock은 현재 세그먼트 파일을, _compact_lock은 스냅샷 파일을 보호합니다
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._file = None
+        self._segment = None
+        self._snapshot_segment = None
+
+        self._compactor = None
+        self._stop_event = threading.Event()
+
+        os.makedirs(log_dir, exist_ok=True)
+
+    def _segment_path(self, number):
+        return os.path.join(self.log_dir, f"{self.SEGMENT_PREFIX}{number:08d}{self.SEGMENT_SUFFIX}")
+
+    def _segment_numbers(self):
+        """디스크에 있는 세그먼트 번호를 오름차순으로 반환합니다."""
+        numbers = []
+        for name in os.listdir(self.log_dir):
+            if name.startswith(self.SEGMENT_PREFIX) and name.endswith(self.SEGMENT_SUFFIX):
+                try:
+                    numbers.append(int(name[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(numbers)
+
+    def _iter_snapshot(self, with_windows=True):
+        """스냅샷의 세그먼트 번호를 먼저 내고, 이어서 (앱 이름, 앱 데이터)를 하나씩 냅니다.
+
+        스냅샷은 segment 다음에 app_usage를 쓰므로 번호만 필요할 때는 첫 값만
+        받고 멈추면 나머지를 읽지 않습니다.
+        """
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                reader = StreamingJsonReader(f)
+                reader.begin_object()
+                segment, found = 0, False
+                while not found:
+                    key = reader.next_key()
+                    if key is None:
+                        break
+                    if key == 'segment':
+                        segment = reader.value()
+                    elif key == 'app_usage':
+                        found = True
+                    else:
+                        reader.value()
+                self._snapshot_segment = segment
+                yield segment
+                if found:
+                    yield from iter_usage_json(reader, with_windows)
+        elif os.path.exists(self.legacy_file):
+            # 기존 app_usage.json은 첫 스냅샷으로 사용합니다
+            self._snapshot_segment = 0
+            yield 0
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                yield from iter_usage_json(StreamingJsonReader(f), with_windows)
+        else:
+            self._snapshot_segment = 0
+            yield 0
+
+    def _read_snapshot(self, with_windows=True):
+        """(마지막으로 합쳐진 세그먼트 번호, 사용 데이터)를 반환합니다."""
+        entries = self._iter_snapshot(with_windows)
+        segment = next(entries)
+        return segment, dict(entries)
+
+    def _read_snapshot_segment(self):
+        """스냅샷의 세그먼트 번호만 읽습니다."""
+        entries = self._iter_snapshot()
+        segment = next(entries)
+        entries.close()
+        return segment
+
+    def _write_snapshot(self, segment, usage):
+        """스냅샷을 원자적으로 교체하고, 합쳐진 세그먼트를 삭제합니다."""
+        atomic_write_json(self.snapshot_file, {'segment': segment, 'app_usage': usage})
+        self._snapshot_segment = segment
+
+        for number in self._segment_numbers():
+            if number <= segment:
+                try:
+                    os.remove(self._segment_path(number))
+                except OSError:
+                    pass
+
+    def _replay_segment(self, number, usage, only_app=None):
+        """세그먼트에 기록된 구간을 사용 데이터에 더합니다. only_app이 있으면 그 앱만 더합니다."""
+        try:
+            with open(self._segment_path(number), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        app_name, window_title, start_time, end_time = json.loads(line)
+                    except ValueError:
+                        # 비정상 종료로 잘린 마지막 줄은 건너뜁니다
+                        continue
+                    if only_app is None or app_name == only_app:
+                        apply_interval(usage, app_name, window_title, start_time, end_time)
+        except FileNotFoundError:
+            pass
+
+    def _ensure_open(self):
+        if self._file is not None:
+            return
+        if self._snapshot_segment is None:
+            self._read_snapshot_segment()
+        number = max(self._segment_numbers() + [self._snapshot_segment]) + 1
+        self._open_segment(number)
+
+    def _open_segment(self, number):
+        self._segment = number
+        self._file = open(self._segment_path(number), 'ab')
+
+    def _seal_segment(self):
+        """현재 세그먼트를 닫고 마지막으로 닫힌 세그먼트 번호를 반환합니다."""
+        if self._file is None:
+            if self._snapshot_segment is None:
+                self._read_snapshot_segment()
+            return max(self._segment_numbers() + [self._snapshot_segment])
+        sealed = self._segment
+        if self._file.tell() > 0:
+            self._file.close()
+            self._open_segment(sealed + 1)
+        else:
+            sealed -= 1
+        return sealed
+
+    def append(self, app_name, window_title, start_time, end_time):
+        """사용 구간 하나를 현재 세그먼트 끝에 기록합니다."""
+        line = json.dumps([app_name, window_title, round(start_time, 3), round(end_time, 3)],
+                          ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._ensure_open()
+            self._file.write(line.encode('utf-8') + b'\n')
+            self._file.flush()
+            if self._file.tell() >= self.segment_size:
+                self._file.close()
+                self._open_segment(self._segment + 1)
+
+    def flush(self):
+        """기록은 추가할 때마다 파일에 내보내므로 따로 할 일이 없습니다."""
+
+    def roll_over(self, day_start):
+        """날짜별로 나누어 저장하지 않으므로 따로 할 일이 없습니다."""
+
+    def query_intervals(self, start_ts, end_ts, app_name=None):
+        """아직 스냅샷에 합쳐지지 않은 세그먼트에서 범위와 겹치는 구간을 찾습니다.
+
+        스냅샷에는 누적값만 남으므로 압축된 구간은 조회되지 않습니다.
+        """
+        intervals = []
+        with self._compact_lock:
+            if self._snapshot_segment is None:
+                self._read_snapshot_segment()
+            for number in self._segment_numbers():
+                if number <= self._snapshot_segment:
+                    continue
+                try:
+                    with open(self._segment_path(number), 'r', encoding='utf-8') as f:
+                        for line in f:
+                            try:
+                                interval = tuple(json.loads(line))
+                            except ValueError:
+                                continue
+                            if (interval[2] < end_ts and interval[3] > start_ts and
+                                    (app_name is None or interval[0] == app_name)):
+                                intervals.append(interval)
+                except FileNotFoundError:
+                    continue
+        intervals.sort(key=lambda interval: interval[2])
+        return intervals
+
+    def _usage_between(self, start_ts, end_ts):
+        """범위 안의 사용 시간을 app_usage 형식으로 집계합니다. 스냅샷에 합쳐진 구간은 날짜를 알 수 없어 빠집니다."""
+        usage = {}
+        for app_name, window_title, start_time, end_time in self.query_intervals(start_ts, end_ts):
+            apply_interval(usage, app_name, window_title, max(start_time, start_ts), min(end_time, end_ts))
+        return usage
+
+    def load_day(self, day_start):
+        """하루의 사용 데이터를 반환합니다 (_usage_between 참고)."""
+        return self._usage_between(day_start, next_day_start(day_start))
+
+    def range_summary(self, granularity, timestamp=None):
+        """timestamp가 속한 granularity 범위의 사용 데이터를 반환합니다 (_usage_between 참고)."""
+        return self._usage_between(*range_bounds(granularity, timestamp))
+
+    def load(self, with_windows=True):
+        """스냅샷에 이후 세그먼트를 재생한 사용 데이터를 반환합니다.
+
+        with_windows가 False이면 앱별 합계와 창 수만 읽습니다 (iter_usage_json 참고).
+        """
+        with self._compact_lock:
+            segment, usage = self._read_snapshot(with_windows)
+            for number in self._segment_numbers():
+                if number > segment:
+                    self._replay_segment(number, usage)
+        return usage
+
+    def load_windows(self, app_name):
+        """app_name 한 앱의 창별 누적 시간을 읽습니다. 스냅샷은 그 앱 항목까지만 해석합니다."""
+        usage = {}
+        with self._compact_lock:
+            entries = self._iter_snapshot()
+            segment = next(entries)
+            for name, app_data in entries:
+                if name == app_name:
+                    usage[app_name] = app_data
+                    break
+            entries.close()
+            for number in self._segment_numbers():
+                if number > segment:
+                    self._replay_segment(number, usage, only_app=app_name)
+        return dict(usage.get(app_name, {}).get('windows') or {})
+
+    def replace(self, usage):
+        """지금까지의 기록을 모두 반영한 사용 데이터로 스냅샷을 교체합니다.
+
+        창 목록을 읽지 않은(windows가 None인) 앱은 지금까지 기록된 창별 시간을
+        스냅샷에 그대로 옮깁니다.
+        """
+        with self._compact_lock:
+            with self._lock:
+                sealed = self._seal_segment()
+            deferred = [app_name for app_name, app_data in usage.items() if app_data.get('windows') is None]
+            if deferred:
+                segment, current = self._read_snapshot()
+                for number in self._segment_numbers():
+                    if segment < number <= sealed:
+                        self._replay_segment(number, current)
+                usage = dict(usage)
+                for app_name in deferred:
+                    app_data = dict(usage[app_name])
+                    app_data.pop('window_count', None)
+                    app_data['windows'] = dict(current.get(app_name, {}).get('windows') or {})
+                    usage[app_name] = app_data
+            self._write_snapshot(sealed, usage)
+
+    def compact(self):
+        """닫힌 세그먼트를 스냅샷에 합칩니다."""
+        with self._compact_lock:
+            with self._lock:
+                sealed = self._seal_segment()
+            segment, usage = self._read_snapshot()
+            numbers = [n for n in self._segment_numbers() if segment < n <= sealed]
+            if not numbers:
+                return
+            for number in numbers:
+                self._replay_segment(number, usage)
+            self._write_snapshot(numbers[-1], usage)
+
+    def start_compactor(self, interval=USAGE_LOG_COMPACT_INTERVAL):
+        """백그라운드 압축 스레드를 시작합니다."""
+        if self._compactor is not None:
+            return
+
+        def run():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.compact()
+                except Exception as e:
+                    log.error("사용 기록 압축 중 오류 발생: %s", e)
+
+        self._compactor = threading.Thread(target=run, name='UsageLogCompactor', daemon=True)
+        self._compactor.start()
+
+    def close(self):
+        """압축 스레드를 멈추고 열린 세그먼트를 닫습니다."""
+        self._stop_event.set()
+        if self._compactor is not None:
+            self._compactor.join(timeout=5)
+            self._compactor = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class PersistenceWorker:
+    """저장 작업을 GUI 스레드 밖에서 처리하는 write-behind 스레드입니다.
+
+    mark_dirty(key, write)로 변경을 알리면 같은 key의 알림은 마지막 것 하나로
+    합쳐지고, 기록은 interval 초마다 최대 한 번 이루어집니다. stats()는 대기 중인
+    작업 수, 합쳐진 알림 수와 기록 지연 시간을 보여줍니다.
+    """
+
+    def __init__(self, interval=PERSIST_INTERVAL):
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._dirty = {}
+        self._busy = False
+        self._flush_requested = False
+        self._running = False
+        self._thread = None
+        self._last_write = 0.0
+
+        # 통계
+        self.notifications = 0
+        self.writes = 0
+        self.errors = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def start(self):
+        """기록 스레드를 시작합니다."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='PersistenceWorker', daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self, key, write):
+        """key에 해당하는 데이터가 바뀌었음을 알립니다. write는 기록 스레드에서 호출됩니다."""
+        with self._cond:
+            self.notifications += 1
+            self._dirty[key] = write
+            self._cond.notify_all()
+        if not self._running:
+            self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._dirty:
+                    self._cond.wait()
+                if not self._dirty:
+                    break
+
+                # 마지막 기록 후 interval이 지날 때까지 알림을 더 모읍니다
+                delay = self._last_write + self.interval - time.monotonic()
+                if delay > 0 and self._running and not self._flush_requested:
+                    self._cond.wait(delay)
+                    continue
+
+                batch, self._dirty = self._dirty, {}
+                self._busy = True
+
+            self._write_batch(batch)
+
+            with self._cond:
+                self._busy = False
+                self._last_write = time.monotonic()
+                self._cond.notify_all()
+
+    def _write_batch(self, batch):
+        for key, write in batch.items():
+            started = time.perf_counter()
+            try:
+                write()
+            except Exception as e:
+                self.errors += 1
+                log.error("데이터 저장 중 오류 발생 (%s): %s", key, e)
+            latency = time.perf_counter() - started
+            get_metrics().observe(f"persist.{key}", latency)
+            self.writes += 1
+            self.last_latency = latency
+            self.max_latency = max(self.max_latency, latency)
+            self.total_latency += latency
+
+    def flush(self, timeout=10.0):
+        """대기 중인 기록을 모두 마칠 때까지 기다립니다."""
+        if not self._running:
+            with self._cond:
+                batch, self._dirty = self._dirty, {}
+            self._write_batch(batch)
+            return
+
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._dirty or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            self._flush_requested = False
+
+    def stop(self):
+        """남은 기록을 마치고 스레드를 멈춥니다."""
+        self.flush()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self):
+        """대기열 깊이, 합쳐진 알림 수, 기록 지연 시간(ms)을 반환합니다."""
+        with self._cond:
+            queue_depth = len(self._dirty)
+        return {
+            'queue_depth': queue_depth,
+            'notifications': self.notifications,
+            'writes': self.writes,
+            'coalesced': self.notifications - self.writes - queue_depth,
+            'errors': self.errors,
+            'last_latency_ms': self.last_latency * 1000,
+            'max_latency_ms': self.max_latency * 1000,
+            'avg_latency_ms': self.total_latency / self.writes * 1000 if self.writes else 0.0,
+        }
+
 
 class DataManager:
+    _usage_store = None
+    _persistence = None
+
     @staticmethod
     def ensure_data_directory():
         """데이터 저장 디렉토리가 존재하는지 확인하고 없으면 생성합니다."""
@@ -10,25 +630,185 @@ class DataManager:
             os.makedirs(DATA_DIR)
 
     @staticmethod
-    def load_app_usage():
-        """앱 사용 데이터를 로드합니다."""
+    def usage_store():
+        """설정된 백엔드의 공유 사용 기록 저장소를 반환합니다."""
+        if DataManager._usage_store is None:
+            DataManager.ensure_data_directory()
+            if USAGE_BACKEND == 'columnar':
+                from core.columnar_store import ColumnarUsageStore
+                # 처음 만들 때는 SQLite나 로그/JSON에 남은 기록을 옮겨 옵니다
+                DataManager._usage_store = ColumnarUsageStore(legacy_loader=DataManager._legacy_history)
+            elif USAGE_BACKEND == 'sqlite':
+                from core.sqlite_store import SQLiteUsageStore
+                # 처음 만들 때는 기존 로그/JSON의 누적값을 가져옵니다
+                DataManager._usage_store = SQLiteUsageStore(
+                    legacy_loader=lambda: UsageLog().load())
+            else:
+                DataManager._usage_store = UsageLog()
+                DataManager._usage_store.start_compactor()
+        return DataManager._usage_store
+
+    @staticmethod
+    def _legacy_history():
+        """이전 저장소의 (누적 데이터, 구간 목록)을 읽습니다. SQLite가 있으면 그쪽을 씁니다."""
+        if os.path.exists(USAGE_DB_FILE):
+            from core.sqlite_store import SQLiteUsageStore
+            store = SQLiteUsageStore()
+        else:
+            store = UsageLog()
         try:
-            if os.path.exists(APP_USAGE_FILE):
-                with open(APP_USAGE_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            return store.load(), store.query_intervals(0, float('inf'))
+        finally:
+            store.close()
+
+    @staticmethod
+    def load_app_usage(with_windows=True):
+        """앱 사용 데이터를 로드합니다.
+
+        with_windows가 False이면 앱별 합계와 창 수(window_count)만 읽고 windows는
+        None으로 둡니다. 창 목록은 load_app_windows로 앱마다 따로 읽습니다.
+        """
+        try:
+            return DataManager.usage_store().load(with_windows)
         except Exception as e:
-            print(f"앱 사용 데이터 로드 중 오류 발생: {e}")
+            log.error("앱 사용 데이터 로드 중 오류 발생: %s", e)
         return {}
 
     @staticmethod
-    def save_app_usage(data):
-        """앱 사용 데이터를 저장합니다."""
+    def load_app_windows(app_name):
+        """한 앱의 창별 누적 시간을 로드합니다."""
         try:
-            DataManager.ensure_data_directory()
-            with open(APP_USAGE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            return DataManager.usage_store().load_windows(app_name)
+        except Exception as e:
+            log.error("창 사용 데이터 로드 중 오류 발생: %s", e)
+        return {}
+
+    @staticmethod
+    def persistence():
+        """공유 write-behind 기록 스레드를 반환합니다."""
+        if DataManager._persistence is None:
+            DataManager._persistence = PersistenceWorker()
+            DataManager._persistence.start()
+        return DataManager._persistence
+
+    @staticmethod
+    def record_interval(app_name, window_title, start_time, end_time):
+        """앱 사용 구간 하나를 저장소에 추가합니다. 커밋은 기록 스레드가 모아서 합니다."""
+        try:
+            store = DataManager.usage_store()
+            store.append(app_name, window_title, start_time, end_time)
+            DataManager.persistence().mark_dirty('usage_store', store.flush)
+        except Exception as e:
+            log.error("앱 사용 구간 기록 중 오류 발생: %s", e)
+
+    @staticmethod
+    def flush():
+        """예약된 기록을 모두 디스크에 반영합니다."""
+        if DataManager._persistence is not None:
+            DataManager._persistence.flush()
+        if DataManager._usage_store is not None:
+            DataManager._usage_store.flush()
+
+    @staticmethod
+    async def flush_async():
+        """flush()를 스레드 풀에서 실행해 기다리는 코루틴입니다. 호출한 스레드를 막지 않습니다."""
+        await run_blocking(DataManager.flush)
+
+    @staticmethod
+    def roll_over_day(day_start):
+        """day_start 이전의 날을 닫도록 기록 스레드에 예약합니다."""
+        try:
+            store = DataManager.usage_store()
+            DataManager.persistence().mark_dirty('usage_roll_over', lambda: store.roll_over(day_start))
+        except Exception as e:
+            log.error("날짜 변경 처리 중 오류 발생: %s", e)
+
+    @staticmethod
+    def load_day_usage(day_start):
+        """하루의 사용 데이터를 app_usage 형식으로 로드합니다."""
+        try:
+            return DataManager.usage_store().load_day(day_start)
+        except Exception as e:
+            log.error("하루 사용 데이터 로드 중 오류 발생: %s", e)
+        return {}
+
+    @staticmethod
+    def range_summary(granularity, timestamp=None):
+        """timestamp(없으면 지금)가 속한 시간/날/주/달의 앱별, 창별 사용 데이터를 로드합니다."""
+        try:
+            return DataManager.usage_store().range_summary(granularity, timestamp)
+        except Exception as e:
+            log.error("범위 사용 데이터 로드 중 오류 발생: %s", e)
+        return {}
+
+    @staticmethod
+    def persistence_stats():
+        """기록 스레드의 통계를 반환합니다."""
+        return DataManager.persistence().stats()
+
+    @staticmethod
+    def query_intervals(start_time, end_time, app_name=None):
+        """범위와 겹치는 사용 구간을 (앱, 창, 시작, 끝) 리스트로 반환합니다."""
+        try:
+            return DataManager.usage_store().query_intervals(start_time, end_time, app_name)
+        except Exception as e:
+            log.error("사용 구간 조회 중 오류 발생: %s", e)
+        return []
+
+    @staticmethod
+    def export_usage_json(path, intervals_path=None):
+        """누적 사용 데이터를 app_usage.json 형식으로 내보냅니다.
+
+        intervals_path가 있으면 구간 기록도 사용 기록 로그와 같은 한 줄 JSON
+        ([앱, 창, 시작, 끝]) 형식으로 함께 내보냅니다.
+        """
+        try:
+            store = DataManager.usage_store()
+            atomic_write_json(path, store.load(), indent=2)
+            if intervals_path is not None:
+                intervals = store.query_intervals(0, float('inf'))
+
+                def write(f):
+                    for interval in intervals:
+                        f.write(json.dumps(list(interval), ensure_ascii=False, separators=(',', ':')))
+                        f.write('\n')
+
+                atomic_write(intervals_path, write)
+            return True
         except Exception as e:
-            print(f"앱 사용 데이터 저장 중 오류 발생: {e}")
+            log.error("사용 데이터 내보내기 중 오류 발생: %s", e)
+        return False
+
+    @staticmethod
+    def import_usage_json(path, intervals_path=None):
+        """app_usage.json 형식의 파일로 누적 사용 데이터를 바꿉니다.
+
+        intervals_path가 있으면 그 구간을 먼저 기록한 뒤 누적값을 맞춥니다.
+        """
+        try:
+            store = DataManager.usage_store()
+            if intervals_path is not None:
+                with open(intervals_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            store.append(*json.loads(line))
+            with open(path, 'r', encoding='utf-8') as f:
+                usage = dict(iter_usage_json(StreamingJsonReader(f)))
+            store.replace(usage)
+            return True
+        except Exception as e:
+            log.error("사용 데이터 가져오기 중 오류 발생: %s", e)
+        return False
+
+    @staticmethod
+    def close():
+        """예약된 기록을 마치고 열린 저장소를 닫습니다."""
+        if DataManager._persistence is not None:
+            DataManager._persistence.stop()
+            DataManager._persistence = None
+        if DataManager._usage_store is not None:
+            DataManager._usage_store.close()
+            DataManager._usage_store = None
 
     @staticmethod
     def load_timer_data():
@@ -38,7 +818,7 @@ class DataManager:
                 with open(TIMER_DATA_FILE, 'r', encoding='utf-8') as f:
                     return json.load(f)
         except Exception as e:
-            print(f"타이머 데이터 로드 중 오류 발생: {e}")
+            log.error("타이머 데이터 로드 중 오류 발생: %s", e)
         return {
             'app_name': None,
             'start_time': None,
@@ -49,10 +829,10 @@ class DataManager:
 
     @staticmethod
     def save_timer_data(data):
-        """타이머 데이터를 저장합니다."""
+        """타이머 데이터를 저장하도록 예약합니다."""
         try:
-            DataManager.ensure_data_directory()
-            with open(TIMER_DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            snapshot = copy.deepcopy(data)
+            DataManager.persistence().mark_dirty(
+                'timer_data', lambda: atomic_write_json(TIMER_DATA_FILE, snapshot, indent=2))
         except Exception as e:
-            print(f"타이머 데이터 저장 중 오류 발생: {e}")
+            log.error("타이머 데이터 저장 중 오류 발생: %s", e)
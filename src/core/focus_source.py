@@ -0,0 +1,245 @@
+import json
+import sys
+import threading
+import time
+from collections import namedtuple
+from core.config import FOCUS_SOURCE
+from core.log import get_logger
+
+log = get_logger('focus_source')
+
+# 전면 앱 전환 이벤트. timestamp는 전환이 일어난 시각(time.time())입니다.
+FocusEvent = namedtuple('FocusEvent', ['app_name', 'bundle_id', 'pid', 'path', 'timestamp'])
+
+
+class FocusSource:
+    """전면 앱이 바뀔 때마다 구독자에게 FocusEvent를 전달하는 기본 클래스입니다.
+
+    같은 앱이 다시 활성화된 알림은 걸러내므로 구독자는 실제 전환만 받습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._current = None
+
+    def subscribe(self, callback):
+        """전환 이벤트를 받을 콜백을 등록합니다."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        """등록된 콜백을 해제합니다."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def current(self):
+        """마지막으로 알려진 전면 앱의 FocusEvent를 반환합니다."""
+        return self._current
+
+    def window_title(self):
+        """이미 알고 있는 전면 창의 제목을 반환합니다. 모르면 None입니다."""
+        return None
+
+    def start(self):
+        """이벤트 수신을 시작합니다."""
+
+    def stop(self):
+        """이벤트 수신을 멈춥니다."""
+
+    def _emit(self, event):
+        with self._lock:
+            current = self._current
+            if (current is not None and current.pid == event.pid and
+                    current.app_name == event.app_name):
+                return
+            self._current = event
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                log.error("앱 전환 이벤트 처리 중 오류 발생: %s", e)
+
+
+_observer_class = None
+
+
+def _get_observer_class():
+    """NSWorkspace 알림을 받는 Objective-C 옵저버 클래스를 한 번만 정의합니다."""
+    global _observer_class
+    if _observer_class is None:
+        import objc
+        from Foundation import NSObject
+
+        class FocusObserver(NSObject):
+            def initWithSource_(self, source):
+                self = objc.super(FocusObserver, self).init()
+                if self is None:
+                    return None
+                self.source = source
+                return self
+
+            def applicationActivated_(self, notification):
+                app = notification.userInfo()['NSWorkspaceApplicationKey']
+                self.source._on_activated(app, time.time())
+
+        _observer_class = FocusObserver
+    return _observer_class
+
+
+class NSWorkspaceFocusSource(FocusSource):
+    """macOS NSWorkspace 앱 활성화 알림을 사용하는 이벤트 소스입니다.
+
+    폴링하지 않으므로 전환이 없을 때는 아무 일도 하지 않고, 전환 시각은
+    알림을 받은 순간으로 기록됩니다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._observer = None
+
+    def start(self):
+        if self._observer is not None:
+            return
+        from AppKit import NSWorkspace
+
+        workspace = NSWorkspace.sharedWorkspace()
+        self._observer = _get_observer_class().alloc().initWithSource_(self)
+        workspace.notificationCenter().addObserver_selector_name_object_(
+            self._observer, 'applicationActivated:',
+            'NSWorkspaceDidActivateApplicationNotification', None)
+
+        # 시작 시점의 전면 앱을 첫 이벤트로 알립니다
+        app = workspace.frontmostApplication()
+        if app is not None:
+            self._on_activated(app, time.time())
+
+    def stop(self):
+        if self._observer is None:
+            return
+        from AppKit import NSWorkspace
+
+        NSWorkspace.sharedWorkspace().notificationCenter().removeObserver_(self._observer)
+        self._observer = None
+
+    def _on_activated(self, app, timestamp):
+        bundle_url = app.bundleURL()
+        self._emit(FocusEvent(
+            app_name=app.localizedName() or '',
+            bundle_id=app.bundleIdentifier() or '',
+            pid=app.processIdentifier(),
+            path=bundle_url.path() if bundle_url is not None else '',
+            timestamp=timestamp))
+
+
+class ScriptedFocusSource(FocusSource):
+    """push()로 직접 전환 이벤트를 넣는 소스입니다. macOS가 아닌 환경과 테스트에서 사용합니다."""
+
+    def push(self, app_name, bundle_id='', pid=0, path='', timestamp=None):
+        """app_name이 전면 앱이 되었음을 알립니다."""
+        self._emit(FocusEvent(app_name, bundle_id, pid, path,
+                              time.time() if timestamp is None else timestamp))
+
+
+class TrackerFocusSource(FocusSource):
+    """추적기의 live 메시지로 전면 앱을 따라가는 소스입니다.
+
+    추적 데몬이 이미 NSWorkspace 알림을 받고 있으므로 화면 프로세스는 옵저버를
+    따로 두지 않고, 데몬이 알려 준 진행 중인 구간의 앱과 창 제목을 씁니다.
+    pid와 번들 ID는 알 수 없어 비워 둡니다. 자리 비움(app이 None)은 전환으로
+    보지 않습니다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._window_title = None
+
+    def handle_message(self, message):
+        """추적 클라이언트의 리스너입니다. live와 snapshot 메시지만 봅니다."""
+        kind = message.get('event')
+        if kind == 'snapshot':
+            message = message.get('live') or {}
+        elif kind != 'live':
+            return
+        app_name = message.get('app')
+        if not app_name:
+            return
+        self._window_title = message.get('window')
+        self._emit(FocusEvent(app_name, '', 0, '', message.get('start') or time.time()))
+
+    def window_title(self):
+        return self._window_title
+
+
+class ReplayFocusSource(ScriptedFocusSource):
+    """기록된 전환 순서를 실제 시간 간격대로 재생하는 소스입니다.
+
+    trace는 (시작 후 경과 초, 앱 이름, 번들 ID, pid) 항목의 리스트입니다.
+    speed를 높이면 간격이 그만큼 줄어듭니다.
+    """
+
+    def __init__(self, trace, speed=1.0, loop=False):
+        super().__init__()
+        self.trace = sorted(trace, key=lambda entry: entry[0])
+        self.speed = speed
+        self.loop = loop
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """한 줄에 [경과 초, 앱 이름, 번들 ID, pid] 배열이 하나씩 있는 파일을 읽습니다."""
+        with open(path, 'r', encoding='utf-8') as f:
+            trace = [json.loads(line) for line in f if line.strip()]
+        return cls(trace, **kwargs)
+
+    def start(self):
+        if self._thread is not None or not self.trace:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='ReplayFocusSource', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            for entry in self.trace:
+                offset, app_name = entry[0], entry[1]
+                delay = started + offset / self.speed - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    return
+                self.push(app_name, *entry[2:4])
+            if not self.loop or self._stop_event.is_set():
+                return
+
+
+_focus_source = None
+
+
+def create_focus_source(kind=FOCUS_SOURCE):
+    """설정에 맞는 FocusSource를 만듭니다. 'auto'는 macOS에서 NSWorkspace를 사용합니다."""
+    if kind == 'auto':
+        kind = 'nsworkspace' if sys.platform == 'darwin' else 'scripted'
+    if kind == 'nsworkspace':
+        return NSWorkspaceFocusSource()
+    return ScriptedFocusSource()
+
+
+def get_focus_source():
+    """앱 전체에서 공유하는 FocusSource를 반환합니다. 처음 호출 시 수신을 시작합니다."""
+    global _focus_source
+    if _focus_source is None:
+        _focus_source = create_focus_source()
+        _focus_source.start()
+    return _focus_source
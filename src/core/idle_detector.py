@@ -0,0 +1,120 @@
+import sys
+import time
+from core.config import IDLE_SOURCE, IDLE_THRESHOLD
+from core.log import get_logger
+
+log = get_logger('idle_detector')
+
+
+class ActivitySource:
+    """마지막 사용자 입력 이후 지난 시간을 알려주는 기본 클래스입니다."""
+
+    def seconds_since_input(self, now):
+        """마지막 입력 이후 지난 초를 반환합니다. 알 수 없으면 None입니다."""
+        return None
+
+    def touch(self, timestamp=None):
+        """timestamp에 입력이 있었음을 알립니다."""
+
+
+class QuartzActivitySource(ActivitySource):
+    """macOS의 HID 입력 시각(CGEventSource)을 읽는 소스입니다."""
+
+    def __init__(self):
+        from Quartz import (CGEventSourceSecondsSinceLastEventType,
+                            kCGEventSourceStateCombinedSessionState, kCGAnyInputEventType)
+        self._seconds_since = CGEventSourceSecondsSinceLastEventType
+        self._state = kCGEventSourceStateCombinedSessionState
+        self._event_type = kCGAnyInputEventType
+
+    def seconds_since_input(self, now):
+        return self._seconds_since(self._state, self._event_type)
+
+
+class ScriptedActivitySource(ActivitySource):
+    """touch()로 입력 시각을 직접 넣는 소스입니다. macOS가 아닌 환경과 테스트에서 사용합니다."""
+
+    def __init__(self, last_input=None):
+        self.last_input = time.time() if last_input is None else last_input
+
+    def seconds_since_input(self, now):
+        return max(0.0, now - self.last_input)
+
+    def touch(self, timestamp=None):
+        self.last_input = time.time() if timestamp is None else timestamp
+
+
+class IdleDetector:
+    """입력이 threshold초 동안 없으면 자리 비움으로 판단합니다.
+
+    sample()은 자리 비움이 시작된 시각(마지막 입력 + threshold)을, 사용 중이면
+    None을 반환하고, 마지막 입력 시각은 last_input에 남깁니다. 앱 전환처럼 입력 소스 밖에서 알게 된 활동은
+    note_activity()로 알려 바로 자리 비움을 끝냅니다.
+    """
+
+    def __init__(self, source=None, threshold=IDLE_THRESHOLD):
+        self.source = source or ActivitySource()
+        self.threshold = threshold
+        self.idle_since = None
+        self.last_input = None  # 마지막 sample()이 본 입력 시각, 알 수 없으면 None
+        self._last_activity = None
+
+        # 통계
+        self.samples = 0
+        self.idle_periods = 0
+
+    def sample(self, now=None):
+        """입력 소스를 한 번 읽어 자리 비움 상태를 갱신합니다."""
+        now = time.time() if now is None else now
+        self.samples += 1
+        seconds = self.source.seconds_since_input(now)
+        if seconds is None:
+            self.idle_since = self.last_input = None
+            return None
+        if self._last_activity is not None:
+            seconds = min(seconds, now - self._last_activity)
+        self.last_input = now - seconds
+
+        if seconds < self.threshold:
+            self.idle_since = None
+        elif self.idle_since is None:
+            self.idle_since = now - seconds + self.threshold
+            self.idle_periods += 1
+        return self.idle_since
+
+    def note_activity(self, timestamp=None):
+        """timestamp에 사용자 활동이 있었음을 알립니다."""
+        timestamp = time.time() if timestamp is None else timestamp
+        self._last_activity = max(self._last_activity or timestamp, timestamp)
+        self.source.touch(timestamp)
+        self.idle_since = None
+
+
+def create_activity_source(kind=IDLE_SOURCE):
+    """설정에 맞는 입력 소스를 만듭니다.
+
+    'auto'는 macOS에서 Quartz를 쓰고, 그 밖의 환경에서는 자리 비움을 감지하지
+    않습니다. 'scripted'는 touch()로만 입력이 들어오는 가짜 소스입니다.
+    """
+    if kind == 'auto':
+        kind = 'quartz' if sys.platform == 'darwin' else 'none'
+    if kind == 'quartz':
+        try:
+            return QuartzActivitySource()
+        except ImportError as e:
+            log.error("입력 감지 초기화 중 오류 발생: %s", e)
+            return ActivitySource()
+    if kind == 'scripted':
+        return ScriptedActivitySource()
+    return ActivitySource()
+
+
+_idle_detector = None
+
+
+def get_idle_detector():
+    """앱 전체에서 공유하는 IdleDetector를 반환합니다."""
+    global _idle_detector
+    if _idle_detector is None:
+        _idle_detector = IdleDetector(create_activity_source())
+    return _idle_detector
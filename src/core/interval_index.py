@@ -0,0 +1,218 @@
+import time
+from bisect import bisect_left, bisect_right
+from core.data_manager import DataManager
+from core.time_ranges import day_start_of, next_day_start
+
+# 상세도(LOD) 단계별 버킷 크기(초). 화면 한 픽셀이 가장 작은 버킷보다 짧으면 원본 구간을 그립니다.
+LOD_BUCKET_SIZES = tuple(4 * 2 ** level for level in range(11))  # 4초 ~ 4096초
+
+# 점유율을 그리기 단계로 나누는 수. 같은 단계가 이어지는 버킷은 한 번에 그립니다.
+LOD_SHADES = 8
+
+
+class _AppIntervals:
+    """한 앱의 구간을 시작 시각 순으로 담는 배열입니다.
+
+    한 앱의 구간은 서로 겹치지 않으므로 starts와 ends가 모두 정렬되어 있고,
+    범위와 시각 조회를 이진 탐색으로 처리할 수 있습니다. levels에는
+    LOD_BUCKET_SIZES마다 버킷 번호 -> 사용한 초를 합산해 둡니다. 가장 세밀한
+    단계만 항상 유지하고, 거친 단계는 처음 필요할 때 그 단계에서 만든 뒤
+    이후 추가되는 구간을 함께 반영합니다.
+    """
+    __slots__ = ('origin', 'starts', 'ends', 'windows', 'levels')
+
+    def __init__(self, origin):
+        self.origin = origin
+        self.starts = []
+        self.ends = []
+        self.windows = []
+        self.levels = [{}] + [None] * (len(LOD_BUCKET_SIZES) - 1)
+
+    def level(self, level):
+        """level 단계의 버킷 딕셔너리를 반환합니다."""
+        buckets = self.levels[level]
+        if buckets is None:
+            # 버킷 크기가 두 배씩 커지므로 가장 세밀한 단계의 번호를 level만큼 밀면 됩니다
+            buckets = {}
+            for bucket, seconds in self.levels[0].items():
+                bucket >>= level
+                buckets[bucket] = buckets.get(bucket, 0) + seconds
+            self.levels[level] = buckets
+        return buckets
+
+    def _accumulate(self, start_time, end_time):
+        start, end = start_time - self.origin, end_time - self.origin
+        for size, buckets in zip(LOD_BUCKET_SIZES, self.levels):
+            if buckets is None:
+                continue
+            bucket = int(start // size)
+            while bucket * size < end:
+                overlap = min(end, (bucket + 1) * size) - max(start, bucket * size)
+                buckets[bucket] = buckets.get(bucket, 0) + overlap
+                bucket += 1
+
+    def add(self, window_title, start_time, end_time):
+        self._accumulate(start_time, end_time)
+        # 체크포인트로 나뉜 같은 창의 연속 구간은 하나로 이어 붙입니다
+        if self.ends and self.ends[-1] == start_time and self.windows[-1] == window_title:
+            self.ends[-1] = end_time
+            return
+        if not self.starts or self.starts[-1] <= start_time:
+            self.starts.append(start_time)
+            self.ends.append(end_time)
+            self.windows.append(window_title)
+            return
+        position = bisect_right(self.starts, start_time)
+        self.starts.insert(position, start_time)
+        self.ends.insert(position, end_time)
+        self.windows.insert(position, window_title)
+
+    def span(self, time_start, time_end):
+        """[time_start, time_end)와 겹치는 구간의 인덱스 범위를 반환합니다."""
+        return bisect_right(self.ends, time_start), bisect_left(self.starts, time_end)
+
+    def find(self, timestamp):
+        """timestamp를 포함하는 구간의 인덱스를 반환합니다. 없으면 -1입니다."""
+        position = bisect_right(self.starts, timestamp) - 1
+        if position >= 0 and timestamp <= self.ends[position]:
+            return position
+        return -1
+
+
+class IntervalIndex:
+    """하루치 앱 사용 구간을 앱별 정렬 배열로 보관하는 색인입니다.
+
+    닫힌 구간은 add()로, 아직 진행 중인 구간은 set_live()로 알려 줍니다.
+    visible()과 at()은 앱마다 이진 탐색을 하므로 비용이 구간 수의 로그와
+    결과 구간 수에만 비례합니다.
+    """
+
+    def __init__(self, day_start):
+        self.day_start = day_start
+        self.day_end = next_day_start(day_start)
+        self._apps = {}  # 앱 이름 -> _AppIntervals
+        self._live = None  # (앱 이름, 창 제목, 시작 시각)
+        self.version = 0  # 닫힌 구간이 바뀔 때마다 증가합니다
+
+    @classmethod
+    def load_day(cls, day_start=None):
+        """저장소에 기록된 하루치 구간으로 색인을 만듭니다."""
+        index = cls(day_start_of() if day_start is None else day_start)
+        for app_name, window_title, start_time, end_time in DataManager.query_intervals(
+                index.day_start, index.day_end):
+            index.add(app_name, window_title, start_time, end_time)
+        return index
+
+    def covers(self, timestamp):
+        """timestamp가 이 색인의 날짜에 속하는지 확인합니다."""
+        return self.day_start <= timestamp < self.day_end
+
+    def add(self, app_name, window_title, start_time, end_time):
+        """닫힌 구간을 추가합니다. 날짜 밖의 부분은 잘라냅니다."""
+        start_time = max(start_time, self.day_start)
+        end_time = min(end_time, self.day_end)
+        if not app_name or end_time <= start_time:
+            return
+        intervals = self._apps.get(app_name)
+        if intervals is None:
+            intervals = self._apps[app_name] = _AppIntervals(self.day_start)
+        intervals.add(window_title, start_time, end_time)
+        self.version += 1
+
+    def set_live(self, app_name, window_title, start_time):
+        """진행 중인 구간을 설정합니다. 끝 시각은 조회할 때의 현재 시각입니다."""
+        self._live = (app_name, window_title, max(start_time, self.day_start)) if app_name else None
+
+    def clear_live(self):
+        """진행 중인 구간을 지웁니다."""
+        self._live = None
+
+    def app_names(self):
+        """구간이 있는 앱 이름 목록을 반환합니다."""
+        names = list(self._apps)
+        if self._live is not None and self._live[0] not in self._apps:
+            names.append(self._live[0])
+        return names
+
+    def visible(self, time_start, time_end):
+        """범위와 겹치는 닫힌 구간을 앱별 (시작, 끝) 리스트로 반환합니다.
+
+        진행 중인 구간은 포함하지 않으므로 visible_live()로 따로 그립니다.
+        """
+        result = {}
+        for app_name, intervals in self._apps.items():
+            first, last = intervals.span(time_start, time_end)
+            if first < last:
+                result[app_name] = list(zip(intervals.starts[first:last], intervals.ends[first:last]))
+        return result
+
+    def lod_level(self, seconds_per_pixel):
+        """픽셀당 초에 맞는 LOD 단계를 반환합니다. 원본 구간을 그려야 하면 None입니다.
+
+        버킷이 한 픽셀보다 좁지 않은 가장 작은 단계를 고르므로 보이는 버킷 수는
+        화면 너비를 넘지 않습니다.
+        """
+        if seconds_per_pixel < LOD_BUCKET_SIZES[0]:
+            return None
+        for level, size in enumerate(LOD_BUCKET_SIZES):
+            if size >= seconds_per_pixel:
+                return level
+        return len(LOD_BUCKET_SIZES) - 1
+
+    def occupancy(self, level, time_start, time_end):
+        """닫힌 구간의 점유율을 앱별 (시작, 끝, 점유율) 묶음 리스트로 반환합니다.
+
+        level 단계의 버킷을 훑으며 점유율 단계가 같은 이웃 버킷을 하나로 합칩니다.
+        진행 중인 구간은 포함하지 않으므로 visible_live()로 따로 그립니다.
+        """
+        size = LOD_BUCKET_SIZES[level]
+        first = int((max(time_start, self.day_start) - self.day_start) // size)
+        last = int((min(time_end, self.day_end) - self.day_start) // size)
+        result = {}
+        for app_name, intervals in self._apps.items():
+            buckets = intervals.level(level)
+            runs = []
+            run_start = run_shade = None
+            for bucket in range(first, last + 1):
+                seconds = buckets.get(bucket)
+                shade = min(LOD_SHADES, int(seconds / size * LOD_SHADES + 0.999)) if seconds else 0
+                if shade != run_shade:
+                    if run_shade:
+                        runs.append((self.day_start + run_start * size,
+                                     self.day_start + bucket * size, run_shade / LOD_SHADES))
+                    run_start, run_shade = bucket, shade
+            if run_shade:
+                runs.append((self.day_start + run_start * size,
+                             self.day_start + (last + 1) * size, run_shade / LOD_SHADES))
+            if runs:
+                result[app_name] = runs
+        return result
+
+    def visible_live(self, time_start, time_end, now=None):
+        """진행 중인 구간이 범위와 겹치면 (앱, 창, 시작, 끝)을, 아니면 None을 반환합니다."""
+        live = self._live_interval(now)
+        if live is not None and live[2] < time_end and live[3] > time_start:
+            return live
+        return None
+
+    def at(self, timestamp, now=None):
+        """timestamp에 사용 중이던 (앱, 창, 시작, 끝) 리스트를 반환합니다."""
+        found = []
+        live = self._live_interval(now)
+        if live is not None and live[2] <= timestamp <= live[3]:
+            found.append(live)
+        for app_name, intervals in self._apps.items():
+            position = intervals.find(timestamp)
+            if position >= 0:
+                found.append((app_name, intervals.windows[position],
+                              intervals.starts[position], intervals.ends[position]))
+        return found
+
+    def _live_interval(self, now):
+        if self._live is None:
+            return None
+        app_name, window_title, start_time = self._live
+        end_time = min(time.time() if now is None else now, self.day_end)
+        if end_time <= start_time:
+            return None
+        return (app_name, window_title, start_time, end_time)
@@ -0,0 +1,164 @@
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from core.config import (LOG_LEVEL, LOG_DIR, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_CONSOLE,
+                         LOG_RATE_LIMIT_INTERVAL, LOG_RATE_LIMIT_BURST)
+
+# 설정보다 우선하는 로그 수준 환경 변수 (예: MACTIMEJA_LOG_LEVEL=DEBUG)
+LOG_LEVEL_ENV = 'MACTIMEJA_LOG_LEVEL'
+
+ROOT_LOGGER = 'mactimeja'
+
+# 핸들러를 붙이기 전에도 꺼진 수준의 호출은 바로 돌아오도록 수준을 먼저 정합니다
+logging.getLogger(ROOT_LOGGER).setLevel(os.environ.get(LOG_LEVEL_ENV) or LOG_LEVEL)
+
+
+def get_logger(name):
+    """mactimeja.<name> 로거를 반환합니다.
+
+    메시지는 log.debug("창 제목: %s", title)처럼 인자를 따로 넘겨, 그 수준이
+    꺼져 있으면 문자열을 만들지 않게 합니다. 구조화된 값은
+    extra={'fields': {...}}로 넘기면 파일 기록에 그대로 남습니다.
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class RateLimitFilter(logging.Filter):
+    """같은 자리(로거, 수준, 메시지 형식)의 기록을 interval초마다 burst개까지만 통과시킵니다.
+
+    버린 수는 창이 바뀐 뒤 처음 통과하는 기록의 suppressed 값으로 알립니다.
+    호출한 스레드에서 큐에 넣기 전에 걸러지므로 반복되는 오류가 큐와 파일을
+    채우지 않습니다.
+    """
+
+    def __init__(self, interval=LOG_RATE_LIMIT_INTERVAL, burst=LOG_RATE_LIMIT_BURST):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._windows = {}  # 키 -> [창 시작 시각, 통과 수, 버린 수]
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """메시지 형식(event)을 남긴 채 인자와 예외를 문자열로 바꿔 큐에 넣습니다."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.event = str(record.msg)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """기록 하나를 한 줄 JSON으로 씁니다. event는 인자를 채우기 전의 메시지 형식입니다."""
+
+    def format(self, record):
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'event': getattr(record, 'event', str(record.msg)),
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry['fields'] = fields
+        suppressed = getattr(record, 'suppressed', None)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', None)
+        return f"{text} (같은 기록 {suppressed}건 생략)" if suppressed else text
+
+
+_listener = None
+_queue_handler = None
+
+
+def setup_logging(role='app', console=LOG_CONSOLE):
+    """로그를 큐 핸들러로 받아 별도 스레드에서 logs/<role>.log(크기별 교체)에 씁니다.
+
+    로그를 남기는 스레드는 큐에 넣고 바로 돌아오므로 파일 쓰기를 기다리지
+    않습니다. console이 참이면 같은 기록을 표준 출력에도 씁니다. 여러 번
+    호출해도 처음 한 번만 설정합니다.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    handlers = []
+    try:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            os.path.join(LOG_DIR, f"{role}.log"), maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    except OSError as e:
+        print(f"로그 파일 준비 중 오류 발생: {e}", file=sys.stderr)
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(_ConsoleFormatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = _QueueHandler(log_queue)
+    _queue_handler.addFilter(RateLimitFilter())
+    root = logging.getLogger(ROOT_LOGGER)
+    root.addHandler(_queue_handler)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """큐에 남은 기록을 모두 쓰고 기록 스레드를 멈춥니다."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        root = logging.getLogger(ROOT_LOGGER)
+        root.removeHandler(_queue_handler)
+        root.propagate = True
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,226 @@
+import functools
+import os
+import threading
+import time
+from core.config import METRICS_ENABLED, METRICS_DIR, METRICS_DUMP_INTERVAL
+from core.log import get_logger
+
+log = get_logger('metrics')
+
+# 설정과 상관없이 계측을 켜는 환경 변수
+METRICS_ENV = 'MACTIMEJA_METRICS'
+
+# 히스토그램 구간 수. i번째 구간은 2**(i-1) 이상 2**i 미만 마이크로초입니다
+HISTOGRAM_BUCKETS = 32
+
+
+class Histogram:
+    """값(초)을 2의 거듭제곱 마이크로초 구간으로 세는 히스토그램입니다."""
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        index = min(int(value * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1) if value > 0 else 0
+        self.buckets[index] += 1
+
+    def quantile(self, fraction):
+        """fraction 분위수가 들어 있는 구간의 상한(초)을 반환합니다. 최대값을 넘지 않습니다."""
+        if self.count == 0:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min((1 << index) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        """횟수, 합계와 분위수를 ms로 반환합니다."""
+        if self.count == 0:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.count * 1000,
+            'min_ms': self.min * 1000,
+            'p50_ms': self.quantile(0.5) * 1000,
+            'p90_ms': self.quantile(0.9) * 1000,
+            'p99_ms': self.quantile(0.99) * 1000,
+            'max_ms': self.max * 1000,
+        }
+
+
+class _NullTimer:
+    """계측이 꺼져 있을 때 쓰는 아무 일도 하지 않는 타이머입니다."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ('registry', 'name', 'started')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.registry.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class MetricsRegistry:
+    """단계별 시간(히스토그램)과 횟수(카운터)를 모으는 계측 저장소입니다.
+
+    꺼져 있으면 timer()는 공유 빈 타이머를, count()와 observe()는 바로
+    돌아오므로 경로에 남겨 두어도 비용이 거의 없습니다. 시간은 단조 시계
+    (perf_counter)로 잽니다. snapshot()은 지금까지의 값을 딕셔너리로
+    돌려주고, dump()는 그것을 METRICS_DIR/<role>.json에 기록합니다.
+    """
+
+    def __init__(self, enabled=False, role='app', directory=METRICS_DIR):
+        self.enabled = enabled
+        self.role = role
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._started = time.time()
+        self._dump_thread = None
+        self._dump_stop = threading.Event()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def timer(self, name):
+        """with 블록의 실행 시간을 name 히스토그램에 더하는 타이머를 반환합니다."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def count(self, name, amount=1):
+        """name 카운터를 amount만큼 늘립니다."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name, seconds):
+        """name 히스토그램에 값(초)을 하나 더합니다."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._started = time.time()
+
+    def snapshot(self):
+        """카운터와 히스토그램 요약을 딕셔너리로 반환합니다."""
+        with self._lock:
+            return {
+                'role': self.role,
+                'pid': os.getpid(),
+                'since': self._started,
+                'time': time.time(),
+                'counters': dict(self._counters),
+                'timers': {name: histogram.summary() for name, histogram in self._histograms.items()},
+            }
+
+    def dump_path(self):
+        return os.path.join(self.directory, f"{self.role}.json")
+
+    def dump(self, path=None):
+        """snapshot()을 JSON 파일로 기록하고 경로를 반환합니다."""
+        from core.data_manager import atomic_write_json
+
+        path = path or self.dump_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write_json(path, self.snapshot(), indent=2)
+        return path
+
+    def start_periodic_dump(self, interval=METRICS_DUMP_INTERVAL):
+        """켜져 있으면 interval초마다 dump()하는 스레드를 시작합니다."""
+        if not self.enabled or self._dump_thread is not None:
+            return
+
+        def run():
+            while not self._dump_stop.wait(interval):
+                try:
+                    self.dump()
+                except Exception as e:
+                    log.error("계측 기록 중 오류 발생: %s", e)
+
+        self._dump_stop.clear()
+        self._dump_thread = threading.Thread(target=run, name='MetricsDump', daemon=True)
+        self._dump_thread.start()
+
+    def close(self):
+        """주기 기록을 멈추고, 켜져 있었으면 마지막 값을 기록합니다."""
+        self._dump_stop.set()
+        if self._dump_thread is not None:
+            self._dump_thread.join(timeout=5)
+            self._dump_thread = None
+        if self.enabled:
+            try:
+                self.dump()
+            except Exception as e:
+                log.error("계측 기록 중 오류 발생: %s", e)
+
+
+_metrics = None
+
+
+def get_metrics():
+    """앱 전체에서 공유하는 MetricsRegistry를 반환합니다."""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry(enabled=METRICS_ENABLED or bool(os.environ.get(METRICS_ENV)))
+    return _metrics
+
+
+def timed(name):
+    """함수의 실행 시간을 name 히스토그램에 더하는 데코레이터입니다. 꺼져 있으면 바로 호출합니다."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            metrics = _metrics or get_metrics()
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.observe(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
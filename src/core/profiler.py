@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from core.config import PROFILE_DIR, PROFILE_DURATION, PROFILE_SAMPLE_INTERVAL
+from core.log import get_logger
+
+log = get_logger('profiler')
+
+# 프로파일을 켜는 환경 변수. 값은 초이고, 숫자가 아니면 PROFILE_DURATION입니다
+PROFILE_ENV = 'MACTIMEJA_PROFILE'
+
+
+def _frame_label(code):
+    """collapsed stack의 한 칸 이름입니다. 구분자인 ';'는 ':'로 바꿉니다."""
+    name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return name.replace(';', ':')
+
+
+class StackSampler:
+    """프로세스의 모든 스레드 스택을 일정 간격으로 모으는 샘플링 프로파일러입니다.
+
+    별도 스레드가 interval초마다 sys._current_frames()로 각 스레드의 스택을
+    읽어 (스레드 이름, 코드 객체들)별로 셉니다. 대상 스레드를 멈추거나
+    추적 함수를 걸지 않으므로 화면과 작업 스레드의 속도에 거의 영향이 없습니다.
+    duration초가 지나거나 stop()을 부르면 flamegraph.pl, speedscope 등에서
+    읽는 collapsed stack 형식("스레드;바깥 함수;...;안쪽 함수 횟수")으로
+    PROFILE_DIR/<role>-<시각>.folded에 기록합니다.
+    """
+
+    def __init__(self, duration=PROFILE_DURATION, interval=PROFILE_SAMPLE_INTERVAL,
+                 directory=PROFILE_DIR, role='app', on_finished=None):
+        self.duration = duration
+        self.interval = interval
+        self.directory = directory
+        self.role = role
+        self.on_finished = on_finished  # 기록을 마친 뒤 샘플링 스레드에서 on_finished(경로)
+        self.path = None
+        self.samples = 0
+
+        self._stacks = {}  # (스레드 이름, 코드 객체 튜플) -> 횟수
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run, name='StackSampler', daemon=True)
+        self._thread.start()
+        log.info("프로파일 시작: %.0f초, %.0fms 간격", self.duration, self.interval * 1000)
+        return self
+
+    def stop(self):
+        """샘플링을 멈추고 기록이 끝날 때까지 기다린 뒤 파일 경로를 반환합니다."""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=10)
+        return self.path
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + self.duration
+        names = {}
+        stacks = self._stacks
+        while not self._stop_event.wait(self.interval) and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            if len(names) != len(frames):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                key = (names.get(ident) or f"thread-{ident}", tuple(codes))
+                stacks[key] = stacks.get(key, 0) + 1
+            self.samples += 1
+            frames = frame = None  # 다음 샘플까지 스택을 붙잡아 두지 않습니다
+
+        try:
+            self.path = self._write()
+            log.info("프로파일 기록: %s (%d회 샘플)", self.path, self.samples)
+        except OSError as e:
+            log.error("프로파일 기록 중 오류 발생: %s", e)
+        if self.on_finished is not None:
+            try:
+                self.on_finished(self.path)
+            except Exception as e:
+                log.error("프로파일 완료 처리 중 오류 발생: %s", e)
+
+    def _write(self):
+        labels = {}
+        folded = {}
+        for (thread_name, codes), count in self._stacks.items():
+            parts = [thread_name.replace(';', ':')]
+            for code in reversed(codes):
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                parts.append(label)
+            line = ';'.join(parts)
+            folded[line] = folded.get(line, 0) + count
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory,
+                            f"{self.role}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded")
+        with open(path, 'w', encoding='utf-8') as f:
+            for line, count in sorted(folded.items(), key=lambda item: -item[1]):
+                f.write(f"{line} {count}\n")
+        return path
+
+
+_profiler = None
+
+
+def start_profile(duration=PROFILE_DURATION, role='app', on_finished=None):
+    """공유 프로파일러로 duration초 동안 샘플링을 시작합니다. 이미 실행 중이면 그것을 반환합니다."""
+    global _profiler
+    if _profiler is not None and _profiler.running:
+        return _profiler
+    _profiler = StackSampler(duration=duration, role=role, on_finished=on_finished).start()
+    return _profiler
+
+
+def stop_profile():
+    """실행 중인 프로파일을 멈추고 기록한 파일 경로를 반환합니다. 없으면 None입니다."""
+    if _profiler is None or not _profiler.running:
+        return None
+    return _profiler.stop()
+
+
+def profile_running():
+    return _profiler is not None and _profiler.running
+
+
+def profile_duration_from(value):
+    """환경 변수나 명령줄 값을 초로 바꿉니다. 숫자가 아니면 PROFILE_DURATION입니다."""
+    try:
+        duration = float(value)
+    except (TypeError, ValueError):
+        return PROFILE_DURATION
+    return duration if duration > 0 else PROFILE_DURATION
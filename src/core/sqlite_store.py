@@ -0,0 +1,253 @@
+import os
+import sqlite3
+import threading
+from core.config import USAGE_DB_FILE, USAGE_DB_BATCH_SIZE
+from core.time_ranges import next_day_start, range_bounds
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS focus_intervals (
+    id INTEGER PRIMARY KEY,
+    app TEXT NOT NULL,
+    window TEXT,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_focus_intervals_start ON focus_intervals(start_ts);
+CREATE INDEX IF NOT EXISTS idx_focus_intervals_app ON focus_intervals(app);
+
+-- 구간 정보가 없는 누적 시간(기존 JSON에서 가져온 값 등)을 보관합니다.
+-- window가 ''인 행은 특정 창에 속하지 않는 앱 시간입니다.
+CREATE TABLE IF NOT EXISTS usage_baseline (
+    app TEXT NOT NULL,
+    window TEXT NOT NULL DEFAULT '',
+    seconds REAL NOT NULL,
+    PRIMARY KEY (app, window)
+);
+"""
+
+
+class SQLiteUsageStore:
+    """앱 사용 구간을 SQLite focus_intervals 테이블에 저장하는 저장소입니다.
+
+    구간은 메모리에 모았다가 flush() 때나 배치가 찼을 때 한 트랜잭션에
+    기록합니다. 시작 시각 인덱스와 가장 긴 구간의 길이를 함께 사용하므로
+    범위 조회는 인덱스 탐색과 결과 행 수만큼의 비용만 듭니다. load/replace는 기존 app_usage 형식의
+    누적 데이터를 그대로 주고받는 호환용 뷰입니다.
+    """
+
+    def __init__(self, db_file=USAGE_DB_FILE, batch_size=USAGE_DB_BATCH_SIZE, legacy_loader=None):
+        self.db_file = db_file
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._pending = []
+
+        os.makedirs(os.path.dirname(db_file), exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema(legacy_loader)
+
+        row = self._conn.execute(
+            "SELECT MAX(end_ts - start_ts) FROM focus_intervals").fetchone()
+        self._max_duration = row[0] or 0.0
+
+    def _init_schema(self, legacy_loader):
+        """스키마를 만들고, 새 데이터베이스라면 기존 누적 데이터를 가져옵니다."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            if version == 0 and legacy_loader is not None:
+                self._write_baseline(legacy_loader(), {})
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def append(self, app_name, window_title, start_time, end_time):
+        """구간을 배치에 추가하고, 배치가 차면 기록합니다."""
+        if not app_name or end_time <= start_time:
+            return
+        with self._lock:
+            self._pending.append((app_name, window_title or None, start_time, end_time))
+            if len(self._pending) >= self.batch_size:
+                self._commit_pending()
+
+    def flush(self):
+        """배치에 남은 구간을 모두 기록합니다."""
+        with self._lock:
+            self._commit_pending()
+
+    def _commit_pending(self):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO focus_intervals (app, window, start_ts, end_ts) VALUES (?, ?, ?, ?)",
+                rows)
+        self._max_duration = max(self._max_duration, max(end - start for _, _, start, end in rows))
+
+    def roll_over(self, day_start):
+        """구간은 한 테이블에 두고 시작 시각 인덱스로 찾으므로 따로 할 일이 없습니다."""
+
+    def query_intervals(self, start_ts, end_ts, app_name=None):
+        """[start_ts, end_ts)와 겹치는 구간을 (앱, 창, 시작, 끝) 리스트로 반환합니다."""
+        self.flush()
+        sql = ("SELECT app, window, start_ts, end_ts FROM focus_intervals "
+               "WHERE start_ts >= ? AND start_ts < ? AND end_ts > ?")
+        params = [start_ts - self._max_duration, end_ts, start_ts]
+        if app_name is not None:
+            sql += " AND app = ?"
+            params.append(app_name)
+        sql += " ORDER BY start_ts"
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def query_usage(self, start_ts, end_ts):
+        """범위 안의 사용 시간을 app_usage 형식으로 집계합니다."""
+        usage = {}
+        for app_name, window_title, start, end in self.query_intervals(start_ts, end_ts):
+            start, end = max(start, start_ts), min(end, end_ts)
+            app_data = usage.setdefault(app_name, {'total_time': 0, 'windows': {}})
+            app_data['total_time'] += end - start
+            app_data['last_update'] = max(app_data.get('last_update', 0), end)
+            if window_title:
+                app_data['windows'][window_title] = app_data['windows'].get(window_title, 0) + end - start
+        return usage
+
+    def load_day(self, day_start):
+        """하루의 사용 데이터를 app_usage 형식으로 반환합니다."""
+        return self.query_usage(day_start, next_day_start(day_start))
+
+    def range_summary(self, granularity, timestamp=None):
+        """timestamp가 속한 granularity 범위의 사용 데이터를 반환합니다. 범위의 구간을 매번 집계합니다."""
+        return self.query_usage(*range_bounds(granularity, timestamp))
+
+    def _interval_sums(self):
+        """(앱, 창)별 구간 합계를 반환합니다."""
+        return {
+            (app_name, window_title): (seconds, last_update)
+            for app_name, window_title, seconds, last_update in self._conn.execute(
+                "SELECT app, window, SUM(end_ts - start_ts), MAX(end_ts) "
+                "FROM focus_intervals GROUP BY app, window")
+        }
+
+    def load(self, with_windows=True):
+        """누적 사용 데이터를 기존 app_usage 형식으로 반환합니다.
+
+        with_windows가 False이면 앱별 합계와 창 수(window_count)만 집계하고
+        windows는 None으로 둡니다.
+        """
+        if not with_windows:
+            return self._load_totals()
+        self.flush()
+        usage = {}
+        with self._lock:
+            for app_name, window_title, seconds in self._conn.execute(
+                    "SELECT app, window, seconds FROM usage_baseline"):
+                app_data = usage.setdefault(app_name, {'total_time': 0, 'windows': {}})
+                app_data['total_time'] += seconds
+                if window_title:
+                    app_data['windows'][window_title] = app_data['windows'].get(window_title, 0) + seconds
+
+            for (app_name, window_title), (seconds, last_update) in self._interval_sums().items():
+                app_data = usage.setdefault(app_name, {'total_time': 0, 'windows': {}})
+                app_data['total_time'] += seconds
+                app_data['last_update'] = max(app_data.get('last_update', 0), last_update)
+                if window_title:
+                    app_data['windows'][window_title] = app_data['windows'].get(window_title, 0) + seconds
+        return usage
+
+    def _load_totals(self):
+        """앱별 합계, 마지막 사용 시각과 창 수를 집계합니다."""
+        self.flush()
+        usage = {}
+        with self._lock:
+            for app_name, seconds in self._conn.execute(
+                    "SELECT app, SUM(seconds) FROM usage_baseline GROUP BY app"):
+                usage[app_name] = {'total_time': seconds, 'windows': None, 'window_count': 0}
+            for app_name, seconds, last_update in self._conn.execute(
+                    "SELECT app, SUM(end_ts - start_ts), MAX(end_ts) FROM focus_intervals GROUP BY app"):
+                app_data = usage.setdefault(app_name, {'total_time': 0, 'windows': None, 'window_count': 0})
+                app_data['total_time'] += seconds
+                app_data['last_update'] = last_update
+            for app_name, count in self._conn.execute(
+                    "SELECT app, COUNT(*) FROM ("
+                    "SELECT app, window FROM usage_baseline WHERE window != '' UNION "
+                    "SELECT app, window FROM focus_intervals WHERE window IS NOT NULL) GROUP BY app"):
+                if app_name in usage:
+                    usage[app_name]['window_count'] = count
+        return usage
+
+    def load_windows(self, app_name):
+        """한 앱의 창별 누적 시간을 반환합니다."""
+        self.flush()
+        windows = {}
+        with self._lock:
+            for window_title, seconds in self._conn.execute(
+                    "SELECT window, seconds FROM usage_baseline WHERE app = ? AND window != ''",
+                    (app_name,)):
+                windows[window_title] = windows.get(window_title, 0) + seconds
+            for window_title, seconds in self._conn.execute(
+                    "SELECT window, SUM(end_ts - start_ts) FROM focus_intervals "
+                    "WHERE app = ? AND window IS NOT NULL GROUP BY window", (app_name,)):
+                windows[window_title] = windows.get(window_title, 0) + seconds
+        return windows
+
+    def replace(self, usage):
+        """누적 데이터가 usage와 같아지도록 기준값 테이블을 다시 씁니다."""
+        self.flush()
+        with self._lock, self._conn:
+            # 창 목록을 읽지 않은 앱(windows가 None)의 창별 기준값은 지우지 않고 다시 넣습니다
+            kept = [row for row in self._conn.execute(
+                        "SELECT app, window, seconds FROM usage_baseline WHERE window != ''")
+                    if row[0] in usage and usage[row[0]].get('windows') is None]
+            self._conn.execute("DELETE FROM usage_baseline")
+            self._conn.executemany("INSERT INTO usage_baseline (app, window, seconds) VALUES (?, ?, ?)", kept)
+            self._write_baseline(usage, self._interval_sums(), kept)
+
+    def _write_baseline(self, usage, interval_sums, kept=()):
+        # 창 목록을 읽지 않은 앱(windows가 None)은 창별 값을 구간 합계와 남겨 둔
+        # 기준값(kept) 그대로 두고 창에 속하지 않는 시간만 맞춥니다
+        deferred = {app_name for app_name, app_data in usage.items() if app_data.get('windows') is None}
+        windowed_sums = {}
+        for (app_name, window_title), (seconds, _) in interval_sums.items():
+            if window_title and app_name in deferred:
+                windowed_sums[app_name] = windowed_sums.get(app_name, 0) + seconds
+        for app_name, _, seconds in kept:
+            windowed_sums[app_name] = windowed_sums.get(app_name, 0) + seconds
+
+        rows = []
+        for app_name, app_data in usage.items():
+            windows = app_data.get('windows') or {}
+            for window_title, seconds in windows.items():
+                seconds -= interval_sums.get((app_name, window_title), (0, 0))[0]
+                if abs(seconds) > 1e-6:
+                    rows.append((app_name, window_title, seconds))
+            window_total = windowed_sums.get(app_name, 0) if app_name in deferred else sum(windows.values())
+            remainder = (app_data.get('total_time', 0) - window_total -
+                         interval_sums.get((app_name, None), (0, 0))[0])
+            if abs(remainder) > 1e-6:
+                rows.append((app_name, '', remainder))
+
+        # usage에 없는 앱/창의 구간은 음수 기준값으로 상쇄합니다
+        for (app_name, window_title), (seconds, _) in interval_sums.items():
+            if app_name not in usage:
+                rows.append((app_name, window_title or '', -seconds))
+            elif (window_title and app_name not in deferred and
+                  window_title not in (usage[app_name].get('windows') or {})):
+                rows.append((app_name, window_title, -seconds))
+
+        self._conn.executemany(
+            "INSERT INTO usage_baseline (app, window, seconds) VALUES (?, ?, ?) "
+            "ON CONFLICT (app, window) DO UPDATE SET seconds = seconds + excluded.seconds",
+            rows)
+
+    def close(self):
+        """남은 배치를 기록하고 연결을 닫습니다."""
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,239 @@
+import threading
+import time
+from collections import namedtuple
+from core.config import TICK_INTERVAL, TICK_BACKGROUND_INTERVAL, TICK_IDLE_INTERVAL, TICK_ALIGN_SLACK
+from core.focus_source import get_focus_source
+from core.metrics import get_metrics, timed
+from core.log import get_logger
+
+log = get_logger('tick_scheduler')
+
+# 한 번의 틱. timestamp는 틱 시각(time.time()), focus는 그 순간의 FocusEvent(없으면 None),
+# idle_since는 자리 비움이 시작된 시각(사용 중이면 None), last_input은 마지막 입력
+# 시각(알 수 없으면 None)입니다.
+Tick = namedtuple('Tick', ['timestamp', 'focus', 'idle_since', 'last_input'], defaults=(None,))
+
+
+class ThreadTimer:
+    """Qt 없이 쓰는 단발 타이머입니다. QTimer와 같은 start(msec)/stop()을 제공하고
+    콜백은 타이머 스레드에서 호출됩니다."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._condition = threading.Condition()
+        self._deadline = None
+        self._closed = False
+        self._thread = None
+
+    def start(self, msec):
+        with self._condition:
+            self._deadline = time.monotonic() + msec / 1000.0
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='ThreadTimer', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._deadline = None
+            self._condition.notify()
+
+    def close(self):
+        """타이머 스레드를 끝냅니다."""
+        with self._condition:
+            self._closed = True
+            self._deadline = None
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._deadline is None:
+                        self._condition.wait()
+                        continue
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._closed:
+                    return
+                self._deadline = None
+            try:
+                self.callback()
+            except Exception as e:
+                log.error("타이머 콜백 처리 중 오류 발생: %s", e)
+
+
+class TickScheduler:
+    """앱 전체가 공유하는 1초 틱입니다.
+
+    틱마다 전면 앱 상태를 한 번만 읽어 모든 구독자에게 같은 Tick을 전달하므로
+    위젯마다 따로 타이머를 두고 시계와 작업 공간을 읽을 필요가 없습니다. 틱은
+    벽시계의 초 경계에 맞춰 울리고, 빠른 갱신을 요청한 곳이 없으면(창이 모두
+    숨겨졌을 때 등) background_interval 간격으로 느려집니다. 자리 비움 중에는
+    틱마다 간격을 두 배로 늘려 idle_interval까지 물러납니다.
+
+    타이머는 start() 때 timer_factory(콜백)로 만들어집니다. 기본값은 Qt 이벤트
+    루프의 단발 QTimer이고, Qt가 없는 추적 데몬은 ThreadTimer를 넘깁니다.
+    sample_focus가 거짓이면 전면 앱을 읽지 않고 Tick.focus를 None으로 둡니다.
+    """
+
+    def __init__(self, interval=TICK_INTERVAL, background_interval=TICK_BACKGROUND_INTERVAL,
+                 idle_interval=TICK_IDLE_INTERVAL, focus_source=None, idle_detector=None,
+                 clock=time.time, timer_factory=None, sample_focus=True):
+        self.interval = interval
+        self.background_interval = background_interval
+        self.idle_interval = idle_interval
+        self.clock = clock
+        self.sample_focus = sample_focus
+        self._focus_source = focus_source
+        self.idle_detector = idle_detector
+        self.timer_factory = timer_factory
+
+        self._subscribers = []
+        self._fast_requests = set()
+        self._idle_ticks = None  # 자리 비움 중 지난 틱 수, 사용 중이면 None
+        self._timer = None
+        self._running = False
+
+        # 통계
+        self.ticks = 0
+        self.last_tick = None
+
+    def subscribe(self, callback):
+        """틱마다 callback(tick)을 호출하도록 등록합니다."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        """등록된 콜백을 해제합니다."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def request_fast(self, owner, enabled=True):
+        """owner가 화면에 보이는 동안 등 매초 틱이 필요한지 알립니다."""
+        before = self.current_interval()
+        if enabled:
+            self._fast_requests.add(owner)
+        else:
+            self._fast_requests.discard(owner)
+        self._interval_changed(before)
+
+    def set_idle(self, idle):
+        """자리 비움 여부를 알립니다. 자리 비움이 이어질수록 간격이 늘어납니다."""
+        before = self.current_interval()
+        if not idle:
+            self._idle_ticks = None
+        elif self._idle_ticks is None:
+            self._idle_ticks = 0
+        else:
+            self._idle_ticks += 1
+        self._interval_changed(before)
+
+    def is_idle(self):
+        return self._idle_ticks is not None
+
+    def note_activity(self, timestamp=None):
+        """앱 전환처럼 사용자가 돌아왔음을 알 수 있는 활동을 알립니다."""
+        if self.idle_detector is not None:
+            self.idle_detector.note_activity(timestamp)
+        if self.is_idle():
+            self.set_idle(False)
+
+    def current_interval(self):
+        """지금 적용되는 틱 간격(초)을 반환합니다."""
+        if self._idle_ticks is not None:
+            return min(self.idle_interval, self.interval * 2 ** (self._idle_ticks + 1))
+        return self.interval if self._fast_requests else self.background_interval
+
+    def _interval_changed(self, before):
+        if self._running and self.current_interval() != before:
+            # 빨라질 때 다음 느린 틱까지 기다리지 않도록 바로 다시 예약합니다
+            self._schedule()
+
+    def next_delay(self, now=None):
+        """다음 간격 경계까지 남은 시간(초)을 반환합니다."""
+        now = self.clock() if now is None else now
+        interval = self.current_interval()
+        return interval - (now % interval) + TICK_ALIGN_SLACK
+
+    def focus_source(self):
+        if self._focus_source is None:
+            self._focus_source = get_focus_source()
+        return self._focus_source
+
+    @timed('scheduler.tick')
+    def tick(self, now=None):
+        """전면 앱과 자리 비움 상태를 한 번 읽어 모든 구독자에게 전달합니다."""
+        now = self.clock() if now is None else now
+        idle_since = last_input = None
+        if self.idle_detector is not None:
+            with get_metrics().timer('scheduler.idle_sample'):
+                idle_since = self.idle_detector.sample(now)
+            last_input = self.idle_detector.last_input
+            self.set_idle(idle_since is not None)
+        tick = Tick(now, self.focus_source().current() if self.sample_focus else None, idle_since,
+                    last_input)
+        self.ticks += 1
+        self.last_tick = tick
+        for callback in list(self._subscribers):
+            try:
+                callback(tick)
+            except Exception as e:
+                log.error("틱 처리 중 오류 발생: %s", e)
+        return tick
+
+    def start(self):
+        """틱을 시작합니다."""
+        if self._running:
+            return
+        if self._timer is None:
+            self._timer = self._create_timer()
+        self._running = True
+        self._schedule()
+
+    def stop(self):
+        """틱을 멈춥니다."""
+        self._running = False
+        if self._timer is not None:
+            self._timer.stop()
+            if hasattr(self._timer, 'close'):
+                self._timer.close()
+                self._timer = None
+
+    def _on_timeout(self):
+        if not self._running:
+            return
+        self.tick()
+        self._schedule()
+
+    def _schedule(self):
+        self._timer.start(max(1, int(self.next_delay() * 1000)))
+
+    def _create_timer(self):
+        if self.timer_factory is not None:
+            return self.timer_factory(self._on_timeout)
+        from PyQt5.QtCore import Qt, QTimer
+
+        timer = QTimer()
+        timer.setSingleShot(True)
+        timer.setTimerType(Qt.PreciseTimer)  # 초 경계에 맞추려면 기본 CoarseTimer의 오차가 큽니다
+        timer.timeout.connect(self._on_timeout)
+        return timer
+
+
+_tick_scheduler = None
+
+
+def get_tick_scheduler():
+    """화면이 공유하는 다시 그리기용 TickScheduler를 반환합니다.
+
+    전면 앱과 자리 비움은 추적기(데몬이나 추적 스레드)가 자기 스케줄러로
+    읽으므로, 화면의 틱은 시각만 전달하고 둘 다 읽지 않습니다.
+    """
+    global _tick_scheduler
+    if _tick_scheduler is None:
+        _tick_scheduler = TickScheduler(sample_focus=False)
+    return _tick_scheduler
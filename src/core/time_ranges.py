@@ -0,0 +1,46 @@
+import time
+from datetime import datetime, timedelta
+
+# 범위 요약 단위 (작은 것부터)
+RANGE_GRANULARITIES = ('hour', 'day', 'week', 'month')
+
+
+def day_start_of(timestamp=None):
+    """timestamp가 속한 날의 자정 시각을 반환합니다."""
+    moment = datetime.fromtimestamp(time.time() if timestamp is None else timestamp)
+    return datetime(moment.year, moment.month, moment.day).timestamp()
+
+
+def next_day_start(day_start):
+    """day_start 다음 날의 자정 시각을 반환합니다. 서머타임으로 하루가 24시간이 아닐 수 있습니다."""
+    return (datetime.fromtimestamp(day_start) + timedelta(days=1)).timestamp()
+
+
+def hour_start_of(timestamp):
+    """timestamp가 속한 시간의 시작 시각을 반환합니다. 시간은 그 날 자정부터 3600초씩 셉니다."""
+    day_start = day_start_of(timestamp)
+    return day_start + (timestamp - day_start) // 3600 * 3600
+
+
+def range_bounds(granularity, timestamp=None):
+    """timestamp가 속한 granularity 단위 범위의 (시작, 끝) 시각을 반환합니다.
+
+    주는 월요일 자정에 시작하고, 달은 1일 자정에 시작합니다.
+    """
+    timestamp = time.time() if timestamp is None else timestamp
+    if granularity == 'hour':
+        start = hour_start_of(timestamp)
+        return start, start + 3600
+    moment = datetime.fromtimestamp(timestamp)
+    start = datetime(moment.year, moment.month, moment.day)
+    if granularity == 'day':
+        end = start + timedelta(days=1)
+    elif granularity == 'week':
+        start -= timedelta(days=start.weekday())
+        end = start + timedelta(days=7)
+    elif granularity == 'month':
+        start = start.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        raise ValueError(f"알 수 없는 범위 단위: {granularity}")
+    return start.timestamp(), end.timestamp()
@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from core.async_loop import get_async_loop
+from core.config import TITLE_CACHE_TTL, TITLE_CACHE_SIZE
+from core.metrics import get_metrics
+from core.title_resolver import get_title_resolver
+from core.log import get_logger
+
+log = get_logger('title_cache')
+
+_Entry = namedtuple('_Entry', ['time', 'title', 'pid', 'bundle_id'])
+
+
+class TitleCache:
+    """앱별 창 제목 캐시입니다.
+
+    항목은 ttl초 동안 유효하고, max_size를 넘으면 가장 오래 쓰지 않은 앱부터
+    지웁니다. 같은 앱 이름이라도 pid나 번들 ID가 바뀌면 다른 프로세스로 보고
+    항목을 버립니다.
+    """
+
+    def __init__(self, ttl=TITLE_CACHE_TTL, max_size=TITLE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _lookup(self, app_name, pid, bundle_id):
+        entry = self._entries.get(app_name)
+        if entry is not None and (entry.pid != pid or entry.bundle_id != bundle_id):
+            del self._entries[app_name]
+            self.invalidations += 1
+            return None
+        return entry
+
+    def get(self, app_name, pid, bundle_id, now=None):
+        """유효한 제목을 반환합니다. 없거나 만료되었으면 None입니다."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._lookup(app_name, pid, bundle_id)
+            if entry is None or now - entry.time >= self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(app_name)
+            self.hits += 1
+            return entry.title
+
+    def peek(self, app_name, pid, bundle_id):
+        """만료 여부와 상관없이 같은 프로세스의 마지막 제목을 반환합니다."""
+        with self._lock:
+            entry = self._lookup(app_name, pid, bundle_id)
+            return entry.title if entry is not None else None
+
+    def put(self, app_name, pid, bundle_id, title, now=None):
+        """제목을 저장하고 크기 제한을 넘으면 LRU 항목을 지웁니다."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._entries[app_name] = _Entry(now, title, pid, bundle_id)
+            self._entries.move_to_end(app_name)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, app_name=None):
+        """app_name의 항목을, 인자가 없으면 전체를 지웁니다."""
+        with self._lock:
+            if app_name is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(app_name, None) is not None:
+                self.invalidations += 1
+
+    def stats(self):
+        """적중/실패/제거/무효화 횟수와 현재 크기를 반환합니다."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+_title_cache = None
+
+
+def get_title_cache():
+    """앱 전체에서 공유하는 TitleCache를 반환합니다."""
+    global _title_cache
+    if _title_cache is None:
+        _title_cache = TitleCache()
+    return _title_cache
+
+
+def _cached_title(cache, event):
+    """캐시에서 유효한 제목을 찾고 적중/실패를 셉니다. 없으면 None입니다."""
+    title = cache.get(event.app_name, event.pid, event.bundle_id)
+    get_metrics().count('title.cache_hit' if title is not None else 'title.cache_miss')
+    return title
+
+
+async def _resolve_and_store(cache, event, timeout=None):
+    title = await get_title_resolver().resolve(event.pid, event.app_name, timeout)
+    cache.put(event.app_name, event.pid, event.bundle_id, title)
+    return title
+
+
+async def resolve_window_title(event, timeout=None):
+    """FocusEvent의 창 제목을 돌려주는 코루틴입니다.
+
+    캐시가 유효하면 바로, 아니면 상주 도우미의 응답을 기다렸다가 캐시에
+    저장하고 반환합니다. 시간을 넘기면 asyncio.TimeoutError를 냅니다.
+    """
+    cache = get_title_cache()
+    title = _cached_title(cache, event)
+    if title is not None:
+        return title
+    return await _resolve_and_store(cache, event, timeout)
+
+
+def lookup_window_title(event, on_resolved=None):
+    """FocusEvent의 창 제목을 기다리지 않고 반환합니다.
+
+    캐시가 유효하면 그 값을 쓰고, 아니면 조회 코루틴을 비동기 루프에 넘긴 뒤
+    같은 프로세스의 마지막 제목(없으면 None)을 돌려줍니다. 응답은 캐시에
+    저장되고, on_resolved가 있으면 루프 스레드에서 on_resolved(제목)으로도
+    전달됩니다. 시간을 넘긴 조회는 버리고 다음 호출에서 다시 요청합니다.
+    """
+    cache = get_title_cache()
+    title = _cached_title(cache, event)
+    if title is not None:
+        return title
+
+    def deliver(future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            log.debug("창 제목 조회 실패 (%s): %r", event.app_name, error)
+        elif on_resolved is not None:
+            try:
+                on_resolved(future.result())
+            except Exception as e:
+                log.error("창 제목 콜백 처리 중 오류 발생: %s", e)
+
+    # 제한 시간은 도우미 조회(TITLE_RESOLVER_TIMEOUT)가 정합니다
+    get_async_loop().submit(_resolve_and_store(cache, event), timeout=None).add_done_callback(deliver)
+    return cache.peek(event.app_name, event.pid, event.bundle_id)
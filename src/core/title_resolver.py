@@ -0,0 +1,189 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from core.config import TITLE_RESOLVER_COMMAND, TITLE_RESOLVER_TIMEOUT
+from core.metrics import get_metrics
+from core.log import get_logger
+
+log = get_logger('title_resolver')
+
+# System Events로 pid의 첫 번째 창 제목을 찾는 JXA 도우미입니다.
+# 표준 입력에서 "pid\t앱 이름" 줄을 읽고 "pid\t제목" 줄로 답합니다.
+HELPER_SCRIPT = r'''
+ObjC.import('Foundation');
+var events = Application('System Events');
+var input = $.NSFileHandle.fileHandleWithStandardInput;
+var output = $.NSFileHandle.fileHandleWithStandardOutput;
+var buffer = '';
+
+function windowTitle(pid) {
+    try {
+        var procs = events.processes.whose({unixId: pid});
+        if (procs.length > 0 && procs[0].windows.length > 0) {
+            return procs[0].windows[0].name() || '';
+        }
+    } catch (e) {}
+    return '';
+}
+
+while (true) {
+    var data = input.availableData;
+    if (data.length === 0) {
+        break;
+    }
+    buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+    var index;
+    while ((index = buffer.indexOf('\n')) >= 0) {
+        var line = buffer.slice(0, index);
+        buffer = buffer.slice(index + 1);
+        var pid = parseInt(line.split('\t')[0], 10);
+        var title = String(windowTitle(pid)).replace(/[\t\r\n]/g, ' ');
+        output.writeData($(pid + '\t' + title + '\n').dataUsingEncoding($.NSUTF8StringEncoding));
+    }
+}
+'''
+
+# macOS가 아닌 환경에서 쓰는 대역입니다. 창 제목 대신 앱 이름을 돌려줍니다.
+STAND_IN_SCRIPT = r'''
+import sys
+for line in sys.stdin:
+    pid, _, app_name = line.rstrip('\n').partition('\t')
+    sys.stdout.write(f"{pid}\t{app_name}\n")
+    sys.stdout.flush()
+'''
+
+
+def default_command():
+    """플랫폼에 맞는 도우미 프로세스 명령을 반환합니다."""
+    if sys.platform == 'darwin':
+        return ['osascript', '-l', 'JavaScript', '-e', HELPER_SCRIPT]
+    return [sys.executable, '-u', '-c', STAND_IN_SCRIPT]
+
+
+class TitleResolver:
+    """창 제목을 조회하는 상주 도우미 프로세스를 관리합니다.
+
+    요청은 파이프로 한 줄씩 보내고 응답은 읽기 스레드가 받으므로 호출한 쪽은
+    기다리지 않습니다. 같은 pid의 조회가 진행 중이면 새 요청을 보내지 않고
+    콜백만 덧붙입니다. 도우미가 종료되면 다음 요청에서 다시 띄웁니다.
+    """
+
+    def __init__(self, command=None, timeout=TITLE_RESOLVER_TIMEOUT):
+        self.command = command or default_command()
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._process = None
+        self._in_flight = {}  # pid -> (요청 시각, 앱 이름, 콜백 리스트)
+
+        # 통계
+        self.requests = 0
+        self.deduplicated = 0
+        self.responses = 0
+        self.restarts = 0
+
+    def _ensure_process(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        if self._process is not None:
+            self.restarts += 1
+        self._in_flight.clear()
+        self._process = subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, bufsize=0)
+        threading.Thread(target=self._read_responses, args=(self._process,),
+                         name='TitleResolverReader', daemon=True).start()
+
+    def request(self, pid, app_name, callback=None):
+        """pid 프로세스의 창 제목 조회를 요청합니다.
+
+        결과는 읽기 스레드에서 callback(pid, title)으로 전달됩니다. 실제로
+        요청을 보냈으면 True를 반환합니다.
+        """
+        app_name = (app_name or '').replace('\t', ' ').replace('\n', ' ')
+        with self._lock:
+            now = time.monotonic()
+            entry = self._in_flight.get(pid)
+            if entry is not None and now - entry[0] < self.timeout:
+                self.deduplicated += 1
+                if callback is not None:
+                    entry[2].append(callback)
+                return False
+
+            try:
+                self._ensure_process()
+                self._in_flight[pid] = (now, app_name, [callback] if callback is not None else [])
+                self._process.stdin.write(f"{pid}\t{app_name}\n".encode('utf-8'))
+                self.requests += 1
+                return True
+            except (OSError, ValueError) as e:
+                self._in_flight.pop(pid, None)
+                log.error("창 제목 조회 요청 중 오류 발생: %s", e)
+                return False
+
+    async def resolve(self, pid, app_name, timeout=None):
+        """pid 프로세스의 창 제목을 조회해 반환하는 코루틴입니다.
+
+        응답이 timeout초(없으면 self.timeout) 안에 오지 않으면
+        asyncio.TimeoutError를 냅니다. 취소되거나 시간을 넘겨도 보낸 요청은
+        그대로 두므로, 늦게 온 응답은 같은 pid를 기다리는 다른 호출에 쓰입니다.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def deliver(_, title):
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(title))
+
+        self.request(pid, app_name, deliver)
+        return await asyncio.wait_for(future, self.timeout if timeout is None else timeout)
+
+    def _read_responses(self, process):
+        for line in process.stdout:
+            pid_text, _, title = line.decode('utf-8', 'replace').rstrip('\n').partition('\t')
+            try:
+                pid = int(pid_text)
+            except ValueError:
+                continue
+
+            with self._lock:
+                entry = self._in_flight.pop(pid, None)
+                app_name = entry[1] if entry else ''
+                title = title.strip() or app_name
+                self.responses += 1
+            if entry is not None:
+                # 요청부터 도우미(osascript)의 응답까지 걸린 시간
+                get_metrics().observe('title.resolve', time.monotonic() - entry[0])
+            for callback in (entry[2] if entry else []):
+                try:
+                    callback(pid, title)
+                except Exception as e:
+                    log.error("창 제목 콜백 처리 중 오류 발생: %s", e)
+
+        with self._lock:
+            if self._process is process:
+                self._in_flight.clear()
+
+    def stop(self):
+        """도우미 프로세스를 종료합니다."""
+        with self._lock:
+            process, self._process = self._process, None
+            self._in_flight.clear()
+        if process is not None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+
+
+_title_resolver = None
+
+
+def get_title_resolver():
+    """앱 전체에서 공유하는 TitleResolver를 반환합니다."""
+    global _title_resolver
+    if _title_resolver is None:
+        _title_resolver = TitleResolver(TITLE_RESOLVER_COMMAND)
+    return _title_resolver
@@ -0,0 +1,438 @@
+import threading
+import time
+from datetime import datetime
+from core.config import APP_NAME, USAGE_LOG_CHECKPOINT_INTERVAL
+from core.compact_usage import CompactUsage
+from core.data_manager import DataManager, apply_interval
+from core.metrics import timed
+from core.time_ranges import RANGE_GRANULARITIES, day_start_of, range_bounds
+from core.title_cache import get_title_cache, lookup_window_title
+from core.log import get_logger
+
+log = get_logger('tracker')
+
+
+class UsageTracker:
+    """전면 앱과 창의 사용 시간을 집계하고 기록하는 추적 파이프라인입니다.
+
+    Qt에 의존하지 않으며, FocusSource의 전환 이벤트와 TickScheduler의 틱을
+    받아 구간을 닫고 저장소에 기록합니다. 화면은 subscribe()로 등록한
+    리스너가 받는 메시지(딕셔너리)로만 갱신됩니다.
+
+    - snapshot: 앱별 누적 합계와 오늘의 구간 (snapshot()을 호출할 때)
+    - windows: 한 앱의 창별 누적 시간 (windows_message()를 호출할 때)
+    - range: 이번 시간/날/주/달의 앱별, 창별 사용 시간 (range_message()를 호출할 때)
+    - usage: 틱 동안 바뀐 (앱, 창) 행의 새 누적값과 늘어난 시간
+    - interval: 기록된 닫힌 구간
+    - live: 진행 중인 구간 (자리 비움 중이면 app이 None)
+
+    전환 이벤트, 틱, 명령이 서로 다른 스레드에서 올 수 있으므로 모든 상태
+    변경은 하나의 잠금 안에서 이루어집니다.
+    """
+
+    def __init__(self, focus_source, scheduler):
+        self.focus_source = focus_source
+        self.scheduler = scheduler
+
+        self._lock = threading.RLock()
+        self._listeners = []
+
+        # 시작할 때는 앱별 합계만 읽고, 창 목록은 그 앱을 처음 쓸 때 읽습니다
+        self.app_usage = CompactUsage.from_usage(DataManager.load_app_usage(with_windows=False) or {})
+        self.active_app = None
+        self.active_window = None
+        self.active_start_time = None
+        self.interval_start_time = None  # 아직 로그에 기록되지 않은 구간의 시작
+        self._idle = False  # 자리 비움 중에는 사용 시간을 더하지 않습니다
+        self._idle_start = None  # 자리 비움으로 구간을 닫은 시각
+        self._day_start = day_start_of()  # 지금 기록 중인 날의 자정
+        self._dirty_rows = {}  # 다음 usage 메시지로 보낼 (앱, 창) -> 그동안 늘어난 초
+        self._title_overrides = {}  # pid -> 화면이 알려준 자기 창 제목
+
+    # 구독
+
+    def subscribe(self, listener):
+        """메시지를 받을 리스너를 등록합니다."""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener):
+        """등록된 리스너를 해제합니다."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _emit(self, message):
+        for listener in list(self._listeners):
+            try:
+                listener(message)
+            except Exception as e:
+                log.error("추적 메시지 전달 중 오류 발생: %s", e)
+
+    # 수명 주기
+
+    def start(self):
+        """전환 이벤트와 틱 구독을 시작합니다."""
+        self.focus_source.subscribe(self.handle_focus)
+        self.scheduler.subscribe(self.handle_tick)
+
+    def stop(self):
+        """구독을 끊고 열린 구간을 기록합니다."""
+        self.scheduler.unsubscribe(self.handle_tick)
+        self.focus_source.unsubscribe(self.handle_focus)
+        self.flush()
+
+    # 외부 명령
+
+    def snapshot(self):
+        """앱별 누적 합계와 오늘의 구간을 담은 메시지를 반환합니다.
+
+        창 목록은 보내지 않고 창 수만 알려 주므로, 화면은 앱을 펼칠 때
+        windows 명령으로 그 앱의 창 목록을 받습니다.
+        """
+        with self._lock:
+            day_start = day_start_of()
+            app_usage = {}
+            for app_name in self.app_usage:
+                record = self.app_usage.record(app_name)
+                app_usage[app_name] = {
+                    'total_time': record.total_time,
+                    'last_update': record.last_update,
+                    'windows': None,
+                    'window_count': self.app_usage.window_count(app_name),
+                }
+            return {
+                'event': 'snapshot',
+                'app_usage': app_usage,
+                'day_start': day_start,
+                'intervals': [list(interval) for interval in
+                              DataManager.query_intervals(day_start, time.time() + 1)],
+                'live': self._live_message(),
+            }
+
+    def windows_message(self, app_name):
+        """app_name의 창별 누적 시간을 담은 메시지를 반환합니다."""
+        with self._lock:
+            self._ensure_windows(app_name)
+            app_data = self.app_usage.get(app_name)
+            windows = dict(app_data['windows'].items()) if app_data is not None else {}
+        return {'event': 'windows', 'app': app_name, 'windows': windows}
+
+    def range_message(self, granularity):
+        """지금이 속한 granularity 범위의 사용 데이터를 담은 메시지를 반환합니다.
+
+        저장소의 범위 요약에 아직 기록되지 않은 진행 중인 구간을 더합니다.
+        """
+        if granularity not in RANGE_GRANULARITIES:
+            log.warning("알 수 없는 범위 단위: %s", granularity)
+            return None
+        with self._lock:
+            now = time.time()
+            start, end = range_bounds(granularity, now)
+            app_usage = DataManager.range_summary(granularity, now)
+            # 진행 중인 구간은 마지막으로 반영한 시각까지만 더합니다. 그 뒤는 usage 메시지의 증가분으로 옵니다
+            if not self._idle and self.active_app and self.interval_start_time and self.active_start_time:
+                interval_start = max(self.interval_start_time, start)
+                if self.active_start_time > interval_start:
+                    apply_interval(app_usage, self.active_app, self.active_window,
+                                   interval_start, self.active_start_time)
+        return {'event': 'range', 'range': granularity, 'start': start, 'end': end, 'app_usage': app_usage}
+
+    def _ensure_windows(self, app_name):
+        """아직 읽지 않은 app_name의 창 목록을 저장소에서 읽어 옵니다."""
+        if self.app_usage.windows_loaded(app_name) is False:
+            self.app_usage.set_windows(app_name, DataManager.load_app_windows(app_name))
+
+    def set_title_override(self, pid, title):
+        """pid 프로세스의 창 제목을 title로 고정합니다. title이 없으면 해제합니다.
+
+        추적 데몬은 화면 프로세스의 어느 창이 활성인지 알 수 없으므로 화면이
+        'Home'/'Timer' 같은 제목을 직접 알려 줍니다.
+        """
+        with self._lock:
+            if title:
+                self._title_overrides[pid] = title
+            else:
+                self._title_overrides.pop(pid, None)
+
+    def flush(self):
+        """현재까지의 사용 시간을 반영하고 열린 구간을 기록합니다."""
+        with self._lock:
+            if not self.active_app or not self.active_start_time:
+                return
+            current_time = time.time()
+            self.update_app_time(self.active_app, self.active_window,
+                                 self.active_start_time, current_time)
+            self.active_start_time = current_time
+            self._close_interval(current_time)
+            self._emit_usage()
+
+    # 이벤트 처리
+
+    def _normalize_app_name(self, event):
+        """Python 관련 프로세스인 경우 APP_NAME을 사용합니다."""
+        app_name = event.app_name
+        log.debug("App Info: name=%s, bundle=%s, path=%s", app_name, event.bundle_id, event.path)
+        if (app_name.lower() in ['python', 'python3', 'python.app'] or
+            'python' in app_name.lower() or
+            'python' in event.bundle_id.lower() or
+            'python' in event.path.lower()):
+            log.debug("Detected Python process, changing name from %s to %s", app_name, APP_NAME)
+            app_name = APP_NAME
+        return app_name
+
+    @timed('tracker.focus')
+    def handle_focus(self, event):
+        """전면 앱이 바뀐 순간에 이전 구간을 닫고 새 구간을 시작합니다."""
+        try:
+            # 앱 전환은 사용자가 자리에 있다는 뜻입니다
+            self.scheduler.note_activity(event.timestamp)
+            with self._lock:
+                self._roll_over_day(event.timestamp)
+                if self._idle:
+                    self._resume_from_idle(event.timestamp)
+
+                app_name = self._normalize_app_name(event)
+                if app_name == self.active_app:
+                    return
+                # 뒤에 있던 동안 바뀌었을 수 있으므로 새 전면 앱의 제목은 다시 조회합니다
+                get_title_cache().invalidate(event.app_name)
+                self._switch_to(app_name, self.get_active_window_title(event), event.timestamp)
+                log.debug("App changed to: %s", app_name)
+                self._emit_usage()
+        except Exception as e:
+            log.error("Error in handle_focus: %s", e)
+
+    @timed('tracker.tick')
+    def handle_tick(self, tick):
+        """틱마다 활성 앱의 시간을 더하고 창 전환과 자리 비움을 처리합니다."""
+        current_time = tick.timestamp
+        try:
+            with self._lock:
+                self._roll_over_day(current_time)
+
+                # 자리 비움 중에는 시간을 더하지 않고, 돌아오면 그 시각부터 다시 셉니다
+                if tick.idle_since is not None:
+                    if not self._idle:
+                        self._pause_for_idle(min(tick.idle_since, current_time))
+                    return
+                if self._idle:
+                    # 자리 비움 중에는 틱 간격이 늘어나므로 틱 시각이 아닌 마지막 입력 시각부터 다시 셉니다
+                    self._resume_from_idle(self._resume_time(tick))
+
+                # 아직 전환 이벤트를 받지 못했다면 마지막으로 알려진 전면 앱에서 시작
+                if not self.active_app and tick.focus:
+                    self._switch_to(self._normalize_app_name(tick.focus),
+                                    self.get_active_window_title(tick.focus), current_time)
+
+                # 활성 앱이 없으면 바뀐 것이 없습니다
+                if not self.active_app:
+                    return
+
+                window_title = self.get_active_window_title(tick.focus)
+                log.debug("Window Title: %s", window_title)
+
+                if not self._apply_window_title(window_title, current_time):
+                    # 같은 앱을 계속 사용 중일 때도 시간 업데이트
+                    self.update_app_time(self.active_app, self.active_window,
+                                         self.active_start_time, current_time)
+                    self.active_start_time = current_time  # 시작 시간 갱신
+
+                    # 오래 열린 구간은 나눠서 기록해 비정상 종료 시 손실을 줄입니다
+                    if current_time - self.interval_start_time >= USAGE_LOG_CHECKPOINT_INTERVAL:
+                        self._close_interval(current_time)
+
+                self._emit_usage()
+        except Exception as e:
+            log.error("Error in handle_tick: %s", e)
+
+    def get_active_window_title(self, event):
+        """event 앱의 창 제목을 가져옵니다. 아직 조회 결과가 없으면 None을 반환합니다."""
+        if not event:
+            return None
+        try:
+            override = self._title_overrides.get(event.pid)
+            if override:
+                return override
+
+            # 공유 캐시를 먼저 보고, 만료되었으면 조회 코루틴을 넘긴 뒤 응답이 오면 바로 반영합니다
+            window_title = lookup_window_title(
+                event, lambda title: self._on_title_resolved(event, title))
+            log.debug("Resolved window title: %s", window_title)
+            return window_title
+        except Exception as e:
+            log.warning("Error getting window title: %s", e)
+            return None
+
+    def _on_title_resolved(self, event, title):
+        """늦게 도착한 창 제목을 다음 틱을 기다리지 않고 반영합니다. 비동기 루프 스레드에서 호출됩니다."""
+        try:
+            with self._lock:
+                current = self.focus_source.current()
+                if (self._idle or not self.active_app or current is None or current.pid != event.pid or
+                        event.pid in self._title_overrides):
+                    return
+                if self._apply_window_title(title, max(self.scheduler.clock(), self.active_start_time)):
+                    self._emit_usage()
+        except Exception as e:
+            log.error("창 제목 반영 중 오류 발생: %s", e)
+
+    def _apply_window_title(self, window_title, current_time):
+        """활성 앱의 창 제목이 바뀌었으면 current_time에 반영하고 True를 반환합니다."""
+        if self.active_window is None and window_title:
+            # 전환 직후 아직 몰랐던 제목은 구간을 나누지 않고 그대로 붙입니다
+            self.active_window = window_title
+            self.update_app_time(self.active_app, self.active_window,
+                                 self.active_start_time, current_time)
+            self.active_start_time = current_time
+            self._emit(self._live_message())
+            return True
+        if window_title and window_title != self.active_window:
+            # 같은 앱의 다른 창으로 전환
+            self._switch_to(self.active_app, window_title, current_time)
+            return True
+        return False
+
+    # 구간 관리
+
+    def _switch_to(self, app_name, window_title, timestamp):
+        """timestamp 시각에 활성 앱/창을 바꿉니다."""
+        if self.active_app and self.active_start_time:
+            # 이전 앱의 사용 시간 업데이트
+            self.update_app_time(self.active_app, self.active_window,
+                                 self.active_start_time, timestamp)
+            self._close_interval(timestamp)
+
+        self.active_app = app_name
+        self.active_window = window_title
+        self.active_start_time = timestamp
+        self.interval_start_time = timestamp
+        self._emit(self._live_message())
+
+    def _roll_over_day(self, timestamp):
+        """자정이 지났으면 열린 구간을 자정에서 나눠 기록하고 지난 날을 닫습니다.
+
+        진행 중인 구간은 버리지 않고 자정부터 새 날의 구간으로 이어집니다.
+        """
+        day_start = day_start_of(timestamp)
+        if day_start <= self._day_start:
+            return
+        self._day_start = day_start
+        if (self.active_app and self.active_start_time and not self._idle and
+                self.interval_start_time < day_start):
+            self.update_app_time(self.active_app, self.active_window,
+                                 self.active_start_time, day_start)
+            self.active_start_time = day_start
+            self._close_interval(day_start)
+            self._emit_usage()
+        DataManager.roll_over_day(day_start)
+        log.info("Day rolled over: %s", datetime.fromtimestamp(day_start).strftime('%Y-%m-%d'))
+
+    def _pause_for_idle(self, idle_since):
+        """idle_since 시각까지의 사용 시간만 반영하고 열린 구간을 닫습니다."""
+        if self.active_app and self.active_start_time:
+            end_time = max(idle_since, self.active_start_time)
+            self.update_app_time(self.active_app, self.active_window,
+                                 self.active_start_time, end_time)
+            self._close_interval(end_time)
+            self._emit_usage()
+        self.active_start_time = None
+        self._idle = True
+        self._idle_start = idle_since
+        self._emit(self._live_message())
+        log.info("Idle since: %s", datetime.fromtimestamp(idle_since).strftime('%H:%M:%S'))
+
+    def _resume_time(self, tick):
+        """자리 비움이 끝난 시각을 반환합니다. 입력 시각을 모르면 틱 시각입니다."""
+        if tick.last_input is None:
+            return tick.timestamp
+        earliest = max(self._idle_start or self._day_start, self._day_start)
+        return min(tick.timestamp, max(tick.last_input, earliest))
+
+    def _resume_from_idle(self, timestamp):
+        """자리 비움이 끝난 시각부터 현재 앱의 구간을 다시 시작합니다."""
+        self._idle = False
+        if self.active_app:
+            self.active_start_time = timestamp
+            self.interval_start_time = timestamp
+        self._emit(self._live_message())
+        log.info("Resumed at: %s", datetime.fromtimestamp(timestamp).strftime('%H:%M:%S'))
+
+    def update_app_time(self, app_name, window_title, start_time, end_time):
+        """앱과 창의 사용 시간을 업데이트합니다."""
+        self._ensure_windows(app_name)
+        self.app_usage.add_interval(app_name, window_title, start_time, end_time)
+        key = (app_name, window_title)
+        self._dirty_rows[key] = self._dirty_rows.get(key, 0.0) + max(0.0, end_time - start_time)
+
+    def _close_interval(self, end_time):
+        """열린 구간을 사용 기록 로그에 남기고 새 구간을 시작합니다."""
+        if self.active_app and self.interval_start_time and end_time > self.interval_start_time:
+            DataManager.record_interval(self.active_app, self.active_window,
+                                        self.interval_start_time, end_time)
+            self._emit({
+                'event': 'interval',
+                'app': self.active_app,
+                'window': self.active_window,
+                'start': self.interval_start_time,
+                'end': end_time,
+            })
+        self.interval_start_time = end_time
+        self._emit(self._live_message())
+
+    # 메시지
+
+    def _live_message(self):
+        live = not self._idle and self.active_app and self.interval_start_time
+        return {
+            'event': 'live',
+            'app': self.active_app if live else None,
+            'window': self.active_window if live else None,
+            'start': self.interval_start_time if live else None,
+        }
+
+    def _emit_usage(self):
+        """바뀐 행의 누적값과 늘어난 시간을 usage 메시지로 보냅니다.
+
+        행은 [앱, 창, 앱 합계, 마지막 사용 시각, 창 누적값(모르면 None), 늘어난 초]입니다.
+        """
+        if not self._dirty_rows:
+            return
+        dirty_rows, self._dirty_rows = self._dirty_rows, {}
+        rows = []
+        for (app_name, window_title), delta in dirty_rows.items():
+            app_data = self.app_usage.get(app_name)
+            if app_data is None:
+                continue
+            windows = app_data['windows']
+            window_time = windows.get(window_title) if window_title and windows is not None else None
+            rows.append([app_name, window_title, app_data['total_time'],
+                         app_data['last_update'], window_time, delta])
+        self._emit({'event': 'usage', 'rows': rows})
+
+
+def apply_usage_rows(app_usage, rows, bounds=None):
+    """usage 메시지의 행을 CompactUsage에 반영하고 바뀐 (앱, 창) 목록을 반환합니다.
+
+    창 목록을 아직 받지 않은 앱은 합계와 창 수만 고칩니다. bounds=(시작, 끝)을
+    넘기면 누적값 대신 행의 늘어난 시간 중 그 범위에 든 부분만 더하므로,
+    범위 요약으로 받은 사용 데이터를 다시 조회하지 않고 갱신할 수 있습니다.
+    """
+    dirty_rows = set()
+    for row in rows:
+        app_name, window_title, total_time, last_update, window_time = row[:5]
+        if bounds is not None:
+            # 늘어난 시간이 없는 이전 형식의 행은 건너뜁니다
+            delta = row[5] if len(row) > 5 else 0
+            start_time, end_time = max(last_update - delta, bounds[0]), min(last_update, bounds[1])
+            if end_time <= start_time:
+                continue
+            app_usage.add_interval(app_name, window_title, start_time, end_time)
+        else:
+            app_usage.set_totals(app_name, total_time, last_update)
+            if window_title and window_time is not None:
+                app_usage.set_window(app_name, window_title, window_time)
+        dirty_rows.add((app_name, window_title))
+    return dirty_rows
@@ -0,0 +1,456 @@
+import asyncio
+import json
+import os
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from core.async_loop import get_async_loop, run_blocking
+from core.config import (TRACKER_MODE, TRACKER_SOCKET, TRACKER_LOG_FILE, TRACKER_CONNECT_TIMEOUT,
+                         TRACKER_RECONNECT_INTERVAL, TRACKER_MAX_BACKLOG, ASYNC_TASK_TIMEOUT)
+from core.data_manager import DataManager
+from core.metrics import get_metrics
+from core.profiler import profile_duration_from, start_profile
+from core.log import get_logger
+
+log = get_logger('tracker_ipc')
+
+# 추적 데몬과 화면은 유닉스 도메인 소켓으로 한 줄에 JSON 객체 하나씩 주고받습니다.
+# 화면 -> 데몬: {"cmd": "snapshot" | "windows" | "range" | "flush" | "title" | "metrics" | "profile" | "shutdown", ...}
+# 데몬 -> 화면: UsageTracker가 보내는 메시지 ({"event": ...})
+
+
+def encode_message(message):
+    return (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def dispatch_command(tracker, command):
+    """화면이 보낸 명령을 처리하고, 그 연결에만 보낼 답이 있으면 반환합니다."""
+    name = command.get('cmd')
+    if name == 'snapshot':
+        return tracker.snapshot()
+    if name == 'windows':
+        return tracker.windows_message(command.get('app'))
+    if name == 'range':
+        return tracker.range_message(command.get('range'))
+    if name == 'flush':
+        tracker.flush()
+        DataManager.flush()
+        return {'event': 'flushed'}
+    if name == 'title':
+        tracker.set_title_override(command.get('pid'), command.get('title'))
+        return None
+    if name == 'metrics':
+        # dump가 참이면 데몬의 계측 파일도 함께 기록합니다
+        metrics = get_metrics()
+        path = metrics.dump() if command.get('dump') and metrics.enabled else None
+        return {'event': 'metrics', 'metrics': metrics.snapshot(), 'path': path}
+    if name == 'profile':
+        # 데몬의 스레드도 화면과 같은 시간 동안 프로파일합니다
+        start_profile(profile_duration_from(command.get('duration')), role='tracker')
+        return None
+    log.warning("알 수 없는 추적 명령: %s", name)
+    return None
+
+
+def daemon_running(socket_path=TRACKER_SOCKET):
+    """socket_path에서 응답하는 데몬이 있는지 확인합니다."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+class _Connection:
+    """화면 하나와의 연결입니다. 보낼 메시지는 큐에 넣고 전용 스레드가 씁니다.
+
+    화면이 멈춰 읽지 않으면 큐가 max_backlog를 넘는 순간 연결을 끊으므로,
+    추적 스레드는 화면 때문에 기다리지 않습니다.
+    """
+
+    def __init__(self, sock, max_backlog):
+        self.sock = sock
+        self._queue = queue.Queue(max_backlog)
+        self.closed = False
+        threading.Thread(target=self._write_loop, name='TrackerConnectionWriter', daemon=True).start()
+
+    def send(self, data):
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(data)
+            return True
+        except queue.Full:
+            log.warning("화면이 메시지를 읽지 않아 연결을 끊습니다")
+            self.close()
+            return False
+
+    def _write_loop(self):
+        while not self.closed:
+            data = self._queue.get()
+            if data is None:
+                return
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                self.close()
+                return
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class TrackerServer:
+    """UsageTracker의 메시지를 연결된 화면에 전달하고 화면의 명령을 받는 서버입니다.
+
+    연결된 화면이 있으면 매초 틱을, 없으면 느린 틱을 요청합니다.
+    """
+
+    def __init__(self, tracker, socket_path=TRACKER_SOCKET, max_backlog=TRACKER_MAX_BACKLOG,
+                 on_shutdown=None):
+        self.tracker = tracker
+        self.socket_path = socket_path
+        self.max_backlog = max_backlog
+        self.on_shutdown = on_shutdown
+
+        self._lock = threading.Lock()
+        self._connections = []
+        self._sock = None
+
+    def start(self):
+        """소켓을 열고 연결을 받기 시작합니다. 다른 데몬이 실행 중이면 RuntimeError를 냅니다."""
+        if daemon_running(self.socket_path):
+            raise RuntimeError(f"추적 데몬이 이미 실행 중입니다: {self.socket_path}")
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # 비정상 종료로 남은 소켓 파일
+
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self._sock.listen(8)
+
+        self.tracker.subscribe(self._broadcast)
+        threading.Thread(target=self._accept_loop, args=(self._sock,), name='TrackerServer',
+                         daemon=True).start()
+
+    def _accept_loop(self, server_sock):
+        while True:
+            try:
+                sock, _ = server_sock.accept()
+            except OSError:
+                return
+            connection = _Connection(sock, self.max_backlog)
+            with self._lock:
+                self._connections.append(connection)
+            self._update_rate()
+            threading.Thread(target=self._read_loop, args=(connection,),
+                             name='TrackerConnectionReader', daemon=True).start()
+
+    def _read_loop(self, connection):
+        try:
+            for line in connection.sock.makefile('rb'):
+                try:
+                    command = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    continue
+                if command.get('cmd') == 'shutdown':
+                    if self.on_shutdown is not None:
+                        self.on_shutdown()
+                    continue
+                reply = dispatch_command(self.tracker, command)
+                if reply is not None:
+                    connection.send(encode_message(reply))
+        except OSError:
+            pass
+        finally:
+            connection.close()
+            with self._lock:
+                if connection in self._connections:
+                    self._connections.remove(connection)
+            self._update_rate()
+
+    def _broadcast(self, message):
+        data = encode_message(message)
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            connection.send(data)
+
+    def _update_rate(self):
+        with self._lock:
+            has_clients = bool(self._connections)
+        self.tracker.scheduler.request_fast(self, has_clients)
+
+    def close(self):
+        """소켓과 모든 연결을 닫습니다."""
+        self.tracker.unsubscribe(self._broadcast)
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+
+
+def spawn_daemon():
+    """추적 데몬을 화면과 분리된 세션의 프로세스로 띄웁니다."""
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'tracker_daemon.py')
+    DataManager.ensure_data_directory()
+    with open(TRACKER_LOG_FILE, 'a', encoding='utf-8') as log:
+        subprocess.Popen([sys.executable, script], stdin=subprocess.DEVNULL, stdout=log,
+                         stderr=subprocess.STDOUT, start_new_session=True, close_fds=True)
+
+
+class TrackerClient:
+    """추적 데몬에 연결해 메시지를 구독하는 화면 쪽 클라이언트입니다.
+
+    연결이 끊기면 {'event': 'disconnected'}를 알리고 다시 연결하며, 연결될
+    때마다 (리스너가 있으면) snapshot을 요청하므로 화면은 항상 전체 상태부터
+    다시 받습니다. 나중에 구독한 화면은 send('snapshot')으로 직접 요청합니다.
+    리스너는 읽기 스레드에서 호출됩니다.
+    """
+
+    def __init__(self, socket_path=TRACKER_SOCKET, spawn=True):
+        self.socket_path = socket_path
+        self.spawn = spawn
+
+        self._listeners = []
+        self._send_lock = threading.Lock()
+        self._sock = None
+        self._thread = None
+        self._closed = False
+
+    def subscribe(self, listener):
+        """메시지를 받을 리스너를 등록합니다."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+        return listener
+
+    def _emit(self, message):
+        for listener in list(self._listeners):
+            try:
+                listener(message)
+            except Exception as e:
+                log.error("추적 메시지 처리 중 오류 발생: %s", e)
+
+    def start(self):
+        """연결 스레드를 시작합니다."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='TrackerClient', daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+            return sock
+        except OSError:
+            sock.close()
+        if not self.spawn:
+            return None
+
+        spawn_daemon()
+        deadline = time.monotonic() + TRACKER_CONNECT_TIMEOUT
+        while time.monotonic() < deadline and not self._closed:
+            time.sleep(0.1)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+                return sock
+            except OSError:
+                sock.close()
+        return None
+
+    def _run(self):
+        while not self._closed:
+            sock = self._connect()
+            if sock is None:
+                time.sleep(TRACKER_RECONNECT_INTERVAL)
+                continue
+
+            self._sock = sock
+            if self._listeners:
+                self.send('snapshot')
+            try:
+                for line in sock.makefile('rb'):
+                    try:
+                        message = json.loads(line.decode('utf-8'))
+                    except ValueError:
+                        continue
+                    self._emit(message)
+            except OSError:
+                pass
+            finally:
+                self._sock = None
+                sock.close()
+
+            if not self._closed:
+                self._emit({'event': 'disconnected'})
+                time.sleep(TRACKER_RECONNECT_INTERVAL)
+
+    def send(self, cmd, **fields):
+        """데몬에 명령을 보냅니다. 연결되어 있지 않으면 False를 반환합니다."""
+        sock = self._sock
+        if sock is None:
+            return False
+        fields['cmd'] = cmd
+        try:
+            with self._send_lock:
+                sock.sendall(encode_message(fields))
+            return True
+        except OSError as e:
+            log.error("추적 명령 전송 중 오류 발생: %s", e)
+            return False
+
+    def close(self):
+        """연결을 닫습니다. 데몬은 계속 실행됩니다."""
+        self._closed = True
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class InProcessTrackerClient:
+    """데몬 없이 화면 프로세스의 스레드에서 UsageTracker를 돌리는 클라이언트입니다.
+
+    TrackerClient와 같은 subscribe/send/close를 제공하며, 틱은 Qt 이벤트
+    루프가 아닌 ThreadTimer에서 울리므로 화면 스레드가 바빠도 추적은
+    계속됩니다. 저장된 기록은 start()가 띄운 스레드에서 읽으므로 시작을
+    늦추지 않습니다. 명령은 저장소를 읽거나 기록을 기다리기도 하므로
+    send()는 비동기 루프에 넘기고 바로 돌아오며, 답은 데몬 모드처럼
+    리스너로 전달됩니다.
+    """
+
+    def __init__(self):
+        self._listeners = []
+        self.tracker = None
+        self.scheduler = None
+        self._thread = None
+        self._command_lock = asyncio.Lock()  # 명령은 보낸 순서대로 하나씩 처리합니다
+
+    def subscribe(self, listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+        return listener
+
+    def _emit(self, message):
+        for listener in list(self._listeners):
+            try:
+                listener(message)
+            except Exception as e:
+                log.error("추적 메시지 처리 중 오류 발생: %s", e)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        from core.focus_source import get_focus_source
+
+        # 전환 알림은 메인 스레드의 런 루프로 오므로 소스는 여기서 시작합니다
+        focus_source = get_focus_source()
+        self._thread = threading.Thread(target=self._load, args=(focus_source,),
+                                        name='InProcessTracker', daemon=True)
+        self._thread.start()
+
+    def _load(self, focus_source):
+        from core.idle_detector import get_idle_detector
+        from core.tick_scheduler import ThreadTimer, TickScheduler
+        from core.tracker import UsageTracker
+
+        scheduler = TickScheduler(focus_source=focus_source, idle_detector=get_idle_detector(),
+                                  timer_factory=ThreadTimer)
+        tracker = UsageTracker(focus_source, scheduler)
+        tracker.subscribe(self._emit)
+        tracker.start()
+        scheduler.request_fast(self)
+        scheduler.start()
+        self.scheduler, self.tracker = scheduler, tracker
+        if self._listeners:
+            self._emit(tracker.snapshot())
+
+    def send(self, cmd, **fields):
+        if self.tracker is None:
+            return False
+        fields['cmd'] = cmd
+        get_async_loop().submit(self._dispatch(self.tracker, fields), timeout=None)
+        return True
+
+    async def _dispatch(self, tracker, command):
+        try:
+            async with self._command_lock:
+                reply = await asyncio.wait_for(run_blocking(dispatch_command, tracker, command),
+                                               ASYNC_TASK_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.warning("추적 명령 시간 초과: %s", command.get('cmd'))
+            return
+        except Exception as e:
+            log.error("추적 명령 처리 중 오류 발생: %s", e)
+            return
+        if reply is not None:
+            self._emit(reply)
+
+    def close(self):
+        if self.tracker is None:
+            return
+        self.scheduler.stop()
+        self.tracker.stop()
+        self.tracker = None
+
+
+_tracker_client = None
+_display_focus_source = None
+
+
+def get_tracker_client():
+    """설정(TRACKER_MODE)에 맞는 추적 클라이언트를 반환합니다."""
+    global _tracker_client
+    if _tracker_client is None:
+        _tracker_client = InProcessTrackerClient() if TRACKER_MODE == 'inprocess' else TrackerClient()
+    return _tracker_client
+
+
+def get_display_focus_source():
+    """화면이 전면 앱을 알기 위해 쓰는 FocusSource를 반환합니다.
+
+    데몬 모드에서는 NSWorkspace 옵저버를 다시 두지 않고 추적 데몬의 live
+    메시지를 따라가는 TrackerFocusSource를 쓰고, 같은 프로세스에서 추적할
+    때는 추적기와 같은 공유 소스를 씁니다. 리스너는 추적 클라이언트의
+    스레드에서 호출될 수 있습니다.
+    """
+    global _display_focus_source
+    if _display_focus_source is None:
+        from core.focus_source import TrackerFocusSource, get_focus_source
+
+        if TRACKER_MODE == 'inprocess':
+            _display_focus_source = get_focus_source()
+        else:
+            _display_focus_source = TrackerFocusSource()
+            get_tracker_client().subscribe(_display_focus_source.handle_message)
+    return _display_focus_source
@@ -1,42 +1,115 @@
+import argparse
+import json
 import os
 import sys
+import time
 
 # src 디렉토리를 Python 경로에 추가
 current_dir = os.path.dirname(os.path.abspath(__file__))
 src_dir = current_dir
 sys.path.append(src_dir)
 
-from PyQt5.QtWidgets import QApplication
-from ui.timer_king import TimerKing
-from core.data_manager import DataManager
-from core.config import APP_NAME, BUNDLE_ID
-import objc
-from Foundation import NSBundle
+# 시작 단계별 시각. 화면과 AppKit 모듈은 필요한 단계에서 import 합니다
+STARTUP_BENCHMARK_ENV = 'MACTIMEJA_STARTUP_BENCHMARK'
+_startup_marks = [('process', time.perf_counter())]
+
+
+def mark_startup(stage):
+    """시작 단계가 끝난 시각을 기록합니다."""
+    _startup_marks.append((stage, time.perf_counter()))
+
+
+def startup_report():
+    """단계별 시작 시각(프로세스 시작 기준 ms)을 딕셔너리로 반환합니다."""
+    origin = _startup_marks[0][1]
+    return {stage: (moment - origin) * 1000 for stage, moment in _startup_marks[1:]}
+
+
+def parse_profile_flag(argv):
+    """--profile[=초] 인자나 MACTIMEJA_PROFILE 환경 변수의 값을 반환합니다. 둘 다 없으면 None입니다."""
+    from core.profiler import PROFILE_ENV
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', nargs='?', const='', default=None)
+    args, _ = parser.parse_known_args(argv)
+    if args.profile is not None:
+        return args.profile
+    return os.environ.get(PROFILE_ENV)
+
 
 def main():
     try:
+        benchmark = bool(os.environ.get(STARTUP_BENCHMARK_ENV))
+
+        # 시작부터 프로파일하도록 가장 먼저 켭니다
+        profile = parse_profile_flag(sys.argv[1:])
+        if profile is not None:
+            from core.profiler import profile_duration_from, start_profile
+            start_profile(profile_duration_from(profile))
+
+        from PyQt5.QtCore import QTimer
+        from PyQt5.QtWidgets import QApplication
+        from core.data_manager import DataManager
+        from core.config import APP_NAME, BUNDLE_ID
+        from core.tracker_ipc import get_tracker_client
+        from core.metrics import get_metrics
+        from core.log import setup_logging, shutdown_logging
+        mark_startup('imports')
+
+        # 로그는 큐에 넣고 별도 스레드가 기록합니다
+        setup_logging('app')
+
         # 데이터 디렉토리 확인
         DataManager.ensure_data_directory()
-        
+
         # 앱 실행
         app = QApplication(sys.argv)
         app.setQuitOnLastWindowClosed(False)
         app.setApplicationName(APP_NAME)
-        
+        app.aboutToQuit.connect(get_tracker_client().close)  # 추적 데몬은 화면이 닫혀도 계속 실행됩니다
+        from core.async_loop import get_async_loop
+        app.aboutToQuit.connect(get_async_loop().stop)  # 남은 코루틴 취소 (기록은 아래 close가 마칩니다)
+        app.aboutToQuit.connect(DataManager.close)  # 종료 전에 예약된 기록 반영
+        get_metrics().start_periodic_dump()
+        app.aboutToQuit.connect(get_metrics().close)  # 켜져 있으면 마지막 계측을 기록
+        from core.profiler import stop_profile
+        app.aboutToQuit.connect(stop_profile)  # 진행 중인 프로파일은 그때까지의 샘플로 기록
+        app.aboutToQuit.connect(shutdown_logging)  # 남은 로그 기록
+        mark_startup('qapplication')
+
         # macOS 앱 설정
+        from Foundation import NSBundle
         bundle = NSBundle.mainBundle()
         info = bundle.localizedInfoDictionary() or bundle.infoDictionary()
         if info:
             info['CFBundleName'] = APP_NAME
             info['CFBundleIdentifier'] = BUNDLE_ID
             info['LSUIElement'] = True  # dock 아이콘 숨기기
-        
+
+        # 1단계: 상태바와 추적만 먼저 띄웁니다
+        from ui.timer_king import TimerKing
         timer_app = TimerKing()
-        timer_app.show()
-        
+        mark_startup('status_bar')
+
+        def show_home():
+            # 3단계: Home 화면(트리, 그래프)은 상태바가 그려진 뒤에 만듭니다
+            timer_app.show_home()
+            mark_startup('home')
+            if benchmark:
+                print(json.dumps(startup_report()))
+                app.quit()
+
+        def on_first_paint():
+            # 2단계: 첫 이벤트 루프에서 상태바를 그리고 시각을 기록합니다
+            timer_app.status_bar_controller.custom_view.displayIfNeeded()
+            mark_startup('first_status_bar_paint')
+            QTimer.singleShot(0, show_home)
+
+        QTimer.singleShot(0, on_first_paint)
+
         sys.exit(app.exec_())
     except Exception as e:
         print(f"오류 발생: {e}")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,88 @@
+import os
+import signal
+import sys
+import threading
+
+# src 디렉토리를 Python 경로에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = current_dir
+sys.path.append(src_dir)
+
+from core.data_manager import DataManager
+from core.focus_source import get_focus_source
+from core.idle_detector import get_idle_detector
+from core.async_loop import get_async_loop
+from core.metrics import get_metrics
+from core.profiler import stop_profile
+from core.tick_scheduler import ThreadTimer, TickScheduler
+from core.tracker import UsageTracker
+from core.tracker_ipc import TrackerServer
+from core.log import get_logger, setup_logging, shutdown_logging
+
+log = get_logger('tracker_daemon')
+
+
+def run_until(stop_event):
+    """stop_event가 설정될 때까지 메인 스레드를 돌립니다.
+
+    macOS에서는 NSWorkspace 알림이 메인 스레드의 런 루프로 전달되므로
+    런 루프를 짧게 나눠 돌리며 종료 요청을 확인합니다.
+    """
+    if sys.platform == 'darwin':
+        from Foundation import NSDate, NSRunLoop
+
+        run_loop = NSRunLoop.currentRunLoop()
+        while not stop_event.is_set():
+            run_loop.runUntilDate_(NSDate.dateWithTimeIntervalSinceNow_(0.5))
+    else:
+        while not stop_event.wait(0.5):
+            pass
+
+
+def main():
+    try:
+        # 데이터 디렉토리 확인
+        DataManager.ensure_data_directory()
+
+        # 표준 출력은 tracker.log로 가므로 로그는 크기별로 교체되는 logs/tracker.log에만 씁니다
+        setup_logging('tracker', console=False)
+
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+        # 계측은 켜져 있을 때만 metrics/tracker.json에 주기적으로 기록합니다
+        metrics = get_metrics()
+        metrics.role = 'tracker'
+        metrics.start_periodic_dump()
+
+        # 화면 없이 전환 이벤트와 틱만으로 추적합니다
+        focus_source = get_focus_source()
+        scheduler = TickScheduler(focus_source=focus_source, idle_detector=get_idle_detector(),
+                                  timer_factory=ThreadTimer)
+        tracker = UsageTracker(focus_source, scheduler)
+        server = TrackerServer(tracker, on_shutdown=stop_event.set)
+        server.start()
+        tracker.start()
+        scheduler.start()
+        log.info("추적 데몬 시작: pid=%s", os.getpid())
+
+        try:
+            run_until(stop_event)
+        finally:
+            scheduler.stop()
+            tracker.stop()
+            server.close()
+            focus_source.stop()
+            get_async_loop().stop()  # 창 제목 조회 코루틴
+            DataManager.close()
+            metrics.close()
+            stop_profile()
+            log.info("추적 데몬 종료")
+            shutdown_logging()
+    except Exception as e:
+        log.error("오류 발생: %s", e)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
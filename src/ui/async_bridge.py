@@ -0,0 +1,62 @@
+import asyncio
+from PyQt5.QtCore import QObject, pyqtSignal
+from core.async_loop import get_async_loop
+from core.config import ASYNC_TASK_TIMEOUT
+from core.log import get_logger
+
+log = get_logger('async_bridge')
+
+
+class AsyncBridge(QObject):
+    """화면 슬롯에서 코루틴을 넘기고 결과를 GUI 스레드에서 받게 해 줍니다.
+
+    run()은 코루틴을 공유 asyncio 루프에 넘기고 바로 돌아오므로 슬롯은
+    기다리지 않습니다. 끝나면 on_result(결과)나 on_error(예외)가 시그널을
+    거쳐 이 객체가 사는 GUI 스레드에서 호출됩니다. 취소된 작업은 어느 쪽도
+    부르지 않습니다. 반환한 Future의 cancel()로 하나를, cancel_all()로
+    이 브리지가 넘긴 작업 전체를 취소합니다.
+    """
+    finished = pyqtSignal(object, object, object)  # (Future, on_result, on_error)
+
+    def __init__(self, parent=None, loop=None):
+        super().__init__(parent)
+        self.loop = loop or get_async_loop()
+        self._pending = set()
+        self.finished.connect(self._deliver)
+
+    def run(self, coro, on_result=None, on_error=None, timeout=ASYNC_TASK_TIMEOUT):
+        """coro를 비동기 루프에서 실행합니다. timeout이 None이면 제한이 없습니다."""
+        future = self.loop.submit(coro, timeout)
+        self._pending.add(future)
+        # 완료 콜백은 루프 스레드에서 불리므로 시그널로 GUI 스레드에 넘깁니다
+        future.add_done_callback(lambda done: self._finish(done, on_result, on_error))
+        return future
+
+    def _finish(self, future, on_result, on_error):
+        try:
+            self.finished.emit(future, on_result, on_error)
+        except RuntimeError:
+            pass  # 받을 화면이 이미 닫혔습니다
+
+    def _deliver(self, future, on_result, on_error):
+        self._pending.discard(future)
+        if future.cancelled():
+            return
+        error = future.exception()
+        try:
+            if error is None:
+                if on_result is not None:
+                    on_result(future.result())
+            elif on_error is not None:
+                on_error(error)
+            elif isinstance(error, asyncio.TimeoutError):
+                log.warning("비동기 작업 시간 초과")
+            else:
+                log.error("비동기 작업 중 오류 발생: %s", error)
+        except Exception as e:
+            log.error("비동기 작업 결과 처리 중 오류 발생: %s", e)
+
+    def cancel_all(self):
+        """아직 끝나지 않은 작업을 모두 취소합니다."""
+        for future in list(self._pending):
+            future.cancel()
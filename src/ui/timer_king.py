@@ -1,24 +1,45 @@
 import sys
 import time
-from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QPushButton, QLabel, QSystemTrayIcon, QMenu, QAction)
-from PyQt5.QtCore import Qt, QTimer, QSettings
+from PyQt5.QtCore import Qt, QTimer, QSettings, pyqtSignal
 from PyQt5.QtGui import QIcon, QFont
 import os
 
 from core.config import *
 from core.data_manager import DataManager
 from core.status_bar import StatusBarController
-from ui.widgets.home_widget import HomeWidget
-from ui.widgets.timer_widget import TimerWidget
+from core.profiler import profile_running, start_profile, stop_profile
+from core.tick_scheduler import get_tick_scheduler
+from core.tracker_ipc import get_display_focus_source, get_tracker_client
+from ui.async_bridge import AsyncBridge
 from AppKit import NSWorkspace, NSApplicationActivationPolicyRegular
-import datetime
-import shutil
 import objc
-from subprocess import Popen, PIPE, TimeoutExpired
 import Cocoa
+from core.log import get_logger
+
+log = get_logger('timer_king')
+
+TIMER_FRAME_ACTIVE_STYLE = """
+    QFrame {
+        background-color: #CCE5FF;
+        border-radius: 4px;
+        padding: 5px;
+    }
+"""
+
+TIMER_FRAME_INACTIVE_STYLE = """
+    QFrame {
+        background-color: #FFCCCC;
+        border-radius: 4px;
+        padding: 5px;
+    }
+"""
 
 class TimerKing(QMainWindow):
+    # 전환 이벤트는 추적 클라이언트 스레드에서 올 수 있으므로 GUI 스레드로 넘겨 처리합니다
+    focus_changed = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.setAttribute(Qt.WA_QuitOnClose, False)
@@ -42,53 +63,49 @@ class TimerKing(QMainWindow):
             'is_active': False
         }
         
-        # 앱 사용 통계 관련 초기화
-        self.last_update_time = time.time()
-        self.app_usage = DataManager.load_app_usage() or {}
+        # 전면 앱 전환 이벤트 구독 (데몬 모드에서는 데몬이 알려 준 전환을 씁니다)
+        self.focus_source = get_display_focus_source()
+        self.focus_changed.connect(self.on_focus_changed)
+        self.focus_source.subscribe(self.focus_changed.emit)
         
         # StatusBarController 초기화
         self.status_bar_controller = StatusBarController.alloc().init()
         self.create_status_bar_menu()
         
-        # 위젯 초기화
-        self.home_widget = HomeWidget(self)
-        self.time_track_widget = TimerWidget()
-        
-        # Timer 위젯 설정
-        self.time_track_widget.setWindowFlags(Qt.Window | Qt.WindowStaysOnTopHint)
-        self.time_track_widget.reset_button.clicked.connect(self.reset_timer)
-        self.time_track_widget.app_combo.currentTextChanged.connect(self.on_app_selected)
-        
-        # 앱 리스트 초기화
+        # Home 화면과 Timer 창은 처음 열 때 만듭니다 (ensure_home, ensure_timer_widget)
+        self.home_widget = None
+        self.time_track_widget = None
         self.running_apps = set()
-        self.update_app_list()
         
         self.initUI()
         
-        # 타이머 설정
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_time)
-        self.timer.start(TIME_UPDATE_INTERVAL)
+        # 추적 데몬에 연결합니다. 기록은 데몬이 읽으므로 여기서 기다리지 않습니다
+        self.tracker_client = get_tracker_client()
+        self.tracker_client.start()
+        QApplication.instance().focusWindowChanged.connect(self.on_focus_window_changed)
+        
+        # 공유 틱 구독 (Home 위젯과 그래프도 같은 틱을 받습니다)
+        self.tick_scheduler = get_tick_scheduler()
+        self.tick_scheduler.subscribe(self.update_time)
+        self.tick_scheduler.start()
         
+        # 실행 중인 앱 목록은 Timer 창이 만들어진 뒤부터 갱신합니다
         self.app_update_timer = QTimer(self)
         self.app_update_timer.timeout.connect(self.update_app_list)
-        self.app_update_timer.start(APP_LIST_UPDATE_INTERVAL)
+        
+        # 저장처럼 기다려야 하는 작업은 코루틴으로 넘기고 결과만 GUI 스레드에서 받습니다
+        self.async_bridge = AsyncBridge(self)
         
         # 기타 초기화
-        self._window_title_cache = {}
         self._pending_updates = False
         self._is_shutting_down = False
+        self._close_flush = None  # 창을 닫기 전에 기다리는 기록 반영 작업
         
         self.start_time = time.time()
 
     def initUI(self):
         self.setWindowTitle('타임')
         self.setFixedSize(1024, 1024)
-        
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        layout = QVBoxLayout(central_widget)
-        layout.addWidget(self.home_widget)
 
         # 스타일시트 설정
         self.setStyleSheet("""
@@ -114,46 +131,75 @@ class TimerKing(QMainWindow):
             }
         """)
 
-    def update_time(self):
+    def ensure_home(self):
+        """Home 화면(사용 목록과 그래프)을 처음 필요할 때 만듭니다."""
+        if self.home_widget is None:
+            from ui.widgets.home_widget import HomeWidget
+
+            self.home_widget = HomeWidget(self)
+            central_widget = QWidget()
+            self.setCentralWidget(central_widget)
+            layout = QVBoxLayout(central_widget)
+            layout.addWidget(self.home_widget)
+        return self.home_widget
+
+    def ensure_timer_widget(self):
+        """Timer 창을 처음 필요할 때 만듭니다."""
+        if self.time_track_widget is None:
+            from ui.widgets.timer_widget import TimerWidget
+
+            self.time_track_widget = TimerWidget()
+            self.time_track_widget.setWindowFlags(Qt.Window | Qt.WindowStaysOnTopHint)
+            self.time_track_widget.reset_button.clicked.connect(self.reset_timer)
+            self.time_track_widget.app_combo.currentTextChanged.connect(self.on_app_selected)
+            self.app_update_timer.start(APP_LIST_UPDATE_INTERVAL)
+        return self.time_track_widget
+
+    def show_home(self):
+        """Home 화면을 표시합니다."""
+        self.ensure_home()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def _set_timer_frame_active(self, is_active):
+        """Timer 창의 배경색을 선택된 앱의 활성 상태에 맞춥니다."""
+        if self.time_track_widget is None:
+            return
+        self.time_track_widget.time_frame.setStyleSheet(
+            TIMER_FRAME_ACTIVE_STYLE if is_active else TIMER_FRAME_INACTIVE_STYLE)
+
+    def on_focus_changed(self, event):
+        """전면 앱이 바뀐 순간에 선택된 앱의 측정을 시작하거나 멈춥니다."""
         try:
             if not self.timer_data['app_name']:
                 return
-                
-            current_time = time.time()
-            app = NSWorkspace.sharedWorkspace().activeApplication()
-            
-            if not app:
-                return
-            
-            app_name = app['NSApplicationName']
             
             # 선택된 앱이 현재 활성화되어 있는지 확인
-            is_selected_app_active = (app_name == self.timer_data['app_name'])
+            is_selected_app_active = (event.app_name == self.timer_data['app_name'])
             
-            # UI 색상 업데이트
-            if is_selected_app_active:
-                if not self.timer_data['is_active']:
-                    self.timer_data['start_time'] = current_time
-                    self.timer_data['is_active'] = True
-                self.time_track_widget.time_frame.setStyleSheet("""
-                    QFrame {
-                        background-color: #CCE5FF;
-                        border-radius: 4px;
-                        padding: 5px;
-                    }
-                """)
+            if is_selected_app_active and not self.timer_data['is_active']:
+                self.timer_data['start_time'] = event.timestamp
+                self.timer_data['is_active'] = True
+            elif not is_selected_app_active and self.timer_data['is_active']:
+                elapsed = event.timestamp - self.timer_data['start_time']
+                self.timer_data['total_time'] += elapsed
+                self.timer_data['is_active'] = False
             else:
-                if self.timer_data['is_active']:
-                    elapsed = current_time - self.timer_data['start_time']
-                    self.timer_data['total_time'] += elapsed
-                    self.timer_data['is_active'] = False
-                self.time_track_widget.time_frame.setStyleSheet("""
-                    QFrame {
-                        background-color: #FFCCCC;
-                        border-radius: 4px;
-                        padding: 5px;
-                    }
-                """)
+                return
+            
+            # UI 색상 업데이트
+            self._set_timer_frame_active(self.timer_data['is_active'])
+            self.update_time()
+        except Exception as e:
+            log.error("Error in on_focus_changed: %s", e)
+
+    def update_time(self, tick=None):
+        try:
+            if not self.timer_data['app_name']:
+                return
+                
+            current_time = tick.timestamp if tick else time.time()
             
             # 활성 상태일 때만 시간 업데이트
             if self.timer_data['is_active']:
@@ -170,79 +216,24 @@ class TimerKing(QMainWindow):
                 seconds = int(current_total % 60)
                 time_text = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
                 self.status_bar_controller.update_time_display(time_text)
-                if hasattr(self, 'time_track_widget'):
+                if self.time_track_widget is not None:
                     self.time_track_widget.update_time_display(time_text)
                 self._pending_updates = False
                 
         except Exception as e:
-            print(f"Error in update_time: {e}")
+            log.error("Error in update_time: %s", e)
 
-    def get_active_window_title(self):
-        current_time = time.time()
-        
-        try:
-            # Home 화면과 Timer 창 모두 인식하도록 수정
-            if self.isActiveWindow():
-                return "Home"
-            elif hasattr(self, 'time_track_widget') and self.time_track_widget.isActiveWindow():
-                return "Timer"
-            
-            active_app = NSWorkspace.sharedWorkspace().activeApplication()
-            if not active_app:
-                return "Unknown"
-            
-            app_name = active_app.get('NSApplicationName', '')
-            active_pid = active_app.get('NSApplicationProcessIdentifier', 0)
-            
-            # 우리 앱인 경우
-            if active_pid == self.our_pid:
-                if self.isActiveWindow():
-                    return "Home"
-                elif hasattr(self, 'time_track_widget') and self.time_track_widget.isActiveWindow():
-                    return "Timer"
-                return "Home"
-            
-            # 캐시된 타이틀이 있고 아직 유효한지 확인
-            if (app_name in self._window_title_cache and 
-                current_time - self._window_title_cache[app_name]['time'] < 1.0 and
-                self._window_title_cache[app_name]['pid'] == active_pid and
-                self._window_title_cache[app_name]['bundle_id'] == active_app.get('NSApplicationBundleIdentifier', '')):
-                return self._window_title_cache[app_name]['title']
-            
-            # AppleScript로 윈도우 타이틀 가져오기
-            script = f'''
-                tell application "System Events"
-                    tell process "{app_name}"
-                        try
-                            get name of window 1
-                        on error
-                            return "{app_name}"
-                        end try
-                    end tell
-                end tell
-            '''
-            
-            p = Popen(['osascript', '-e', script], stdout=PIPE, stderr=PIPE)
-            try:
-                out, err = p.communicate(timeout=0.3)
-                if p.returncode == 0 and out:
-                    title = out.decode('utf-8').strip()
-                    if title:
-                        self._window_title_cache[app_name] = {
-                            'time': current_time,
-                            'title': title,
-                            'pid': active_pid,
-                            'bundle_id': active_app.get('NSApplicationBundleIdentifier', '')
-                        }
-                        return title
-            except TimeoutExpired:
-                p.kill()
-            
-            return app_name
-            
-        except Exception as e:
-            print(f"Error getting window title: {e}")
-            return "Unknown"
+    def on_focus_window_changed(self, window):
+        """우리 창이 활성화되면 추적 데몬에 그 창의 제목을 알려 줍니다.
+
+        데몬은 다른 프로세스라 우리 앱의 어느 창이 활성인지 알 수 없습니다.
+        """
+        title = None
+        if self.isActiveWindow():
+            title = "Home"
+        elif self.time_track_widget is not None and self.time_track_widget.isActiveWindow():
+            title = "Timer"
+        self.tracker_client.send('title', pid=self.our_pid, title=title)
 
     def create_status_bar_menu(self):
         """상태바 메뉴를 생성합니다."""
@@ -258,6 +249,12 @@ class TimerKing(QMainWindow):
         timer_item.setTarget_(self)
         menu.addItem_(timer_item)
         
+        # 프로파일 메뉴 아이템 (실행 중에 다시 누르면 바로 멈추고 기록합니다)
+        profile_item = Cocoa.NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+            f"Profile {PROFILE_DURATION:.0f}s", "profileApp:", "")
+        profile_item.setTarget_(self)
+        menu.addItem_(profile_item)
+        
         # 구분선
         menu.addItem_(Cocoa.NSMenuItem.separatorItem())
         
@@ -266,23 +263,54 @@ class TimerKing(QMainWindow):
         quit_item.setTarget_(self)
         menu.addItem_(quit_item)
         
+        # 추적 데몬까지 멈추는 종료 메뉴 아이템 (Quit은 화면만 닫고 추적은 계속합니다)
+        if TRACKER_MODE == 'daemon':
+            stop_item = Cocoa.NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+                "Quit and Stop Tracking", "quitAndStopTracking:", "")
+            stop_item.setTarget_(self)
+            menu.addItem_(stop_item)
+        
         # 메뉴 설정
         self.status_bar_controller.setMenu_(menu)
 
     @objc.python_method
     def showHome_(self, sender):
-        self.show()
+        self.show_home()
 
     @objc.python_method
     def showTimer_(self, sender):
         self.show_timer()
 
+    @objc.python_method
+    def profileApp_(self, sender):
+        self.toggle_profile()
+
+    def toggle_profile(self):
+        """화면 프로세스와 추적 데몬의 스택 샘플링을 시작하거나, 실행 중이면 멈춥니다."""
+        if profile_running():
+            stop_profile()
+            return
+        start_profile(PROFILE_DURATION)
+        self.tracker_client.send('profile', duration=PROFILE_DURATION)
+
     @objc.python_method
     def quitApp_(self, sender):
         QApplication.instance().quit()
 
+    @objc.python_method
+    def quitAndStopTracking_(self, sender):
+        self.stop_tracking()
+        QApplication.instance().quit()
+
+    def stop_tracking(self):
+        """추적 데몬에 종료를 요청합니다. 데몬은 열린 구간을 기록한 뒤 끝납니다."""
+        if not self.tracker_client.send('shutdown'):
+            log.warning("추적 데몬에 연결되어 있지 않아 종료를 요청하지 못했습니다")
+
     def show_timer(self):
         """Timer 창을 표시합니다."""
+        self.ensure_timer_widget()
+        
         # 창이 이미 표시되어 있다면 활성화만 합니다
         if self.time_track_widget.isVisible():
             self.time_track_widget.raise_()
@@ -315,56 +343,11 @@ class TimerKing(QMainWindow):
             'total_time': 0,
             'is_active': False
         }
+        # 상태바에 초 단위로 보여줄 앱이 없으면 틱을 늦춰도 됩니다
+        self.tick_scheduler.request_fast(self, False)
         # 화면 업데이트
         self.update_time_display()
 
-    def _delayed_ui_update(self):
-        if not self._is_shutting_down:
-            self.update_time_display()
-            self.update_usage_stats()
-            self._pending_updates = False
-
-    def update_usage_stats(self):
-        """앱 사용 통계를 업데이트합니다."""
-        try:
-            current_time = time.time()
-            
-            # 현재 활성화된 앱의 시간 업데이트
-            if self.timer_data['is_active'] and self.timer_data['app_name']:
-                app_name = self.timer_data['app_name']
-                if app_name not in self.app_usage:
-                    self.app_usage[app_name] = {
-                        'total_time': 0,
-                        'windows': {},
-                        'is_active': True,
-                        'last_update': current_time
-                    }
-                
-                elapsed = current_time - self.timer_data.get('start_time', current_time)
-                self.app_usage[app_name]['total_time'] = self.app_usage[app_name].get('total_time', 0) + elapsed
-                self.app_usage[app_name]['last_update'] = current_time
-                
-                # 현재 창 시간 업데이트
-                window_title = self.get_active_window_title()
-                if window_title:
-                    if window_title not in self.app_usage[app_name]['windows']:
-                        self.app_usage[app_name]['windows'][window_title] = 0
-                    self.app_usage[app_name]['windows'][window_title] += elapsed
-            
-            # 데이터 저장
-            self.save_app_usage()
-            
-            # Home 위젯 업데이트
-            if hasattr(self, 'home_widget') and hasattr(self.home_widget, 'home_app_tracking'):
-                self.home_widget.home_app_tracking.update_usage_stats()
-            
-        except Exception as e:
-            print(f"통계 업데이트 중 오류 발생: {e}")
-
-    def save_app_usage(self):
-        """앱 사용 통계를 저장합니다."""
-        DataManager.save_app_usage(self.app_usage)
-
     def format_time(self, seconds):
         """Convert seconds into a formatted time string (HH:MM:SS)."""
         hours = int(seconds // 3600)
@@ -382,7 +365,7 @@ class TimerKing(QMainWindow):
         self.status_bar_controller.update_time_display(time_text)
         
         # Timer 위젯이 있으면 업데이트
-        if hasattr(self, 'time_track_widget'):
+        if self.time_track_widget is not None:
             # 현재 창 시간과 전체 시간을 함께 전달
             window_time = time.time() - self.timer_data.get('start_time', 0) if self.timer_data['is_active'] else 0
             self.time_track_widget.update_time_display(time_text, self.format_time(window_time), self.timer_data['app_name'])
@@ -408,7 +391,7 @@ class TimerKing(QMainWindow):
             self._last_app_update = current_time
         
         # Timer 창의 콤보박스 업데이트 (재귀 호출 방지)
-        if hasattr(self, 'time_track_widget'):
+        if self.time_track_widget is not None:
             current_app = self.timer_data.get('app_name')  # timer_data에서 현재 앱 이름을 가져옴
             self.time_track_widget.app_combo.blockSignals(True)  # 시그널 일시 차단
             self.time_track_widget.update_app_list(self.running_apps, current_app)
@@ -425,28 +408,17 @@ class TimerKing(QMainWindow):
         }
         
         # 현재 앱이 활성화되어 있는지 확인
-        active_app = NSWorkspace.sharedWorkspace().activeApplication()
-        is_target_app_active = active_app and active_app['NSApplicationName'] == app_name
+        active_app = self.focus_source.current()
+        is_target_app_active = active_app and active_app.app_name == app_name
+        
+        # 상태바 시간을 매초 갱신해야 하므로 빠른 틱을 요청합니다
+        self.tick_scheduler.request_fast(self, True)
         
         # UI 업데이트
         if is_target_app_active:
             self.timer_data['start_time'] = time.time()
             self.timer_data['is_active'] = True
-            self.time_track_widget.time_frame.setStyleSheet("""
-                QFrame {
-                    background-color: #CCE5FF;
-                    border-radius: 4px;
-                    padding: 5px;
-                }
-            """)
-        else:
-            self.time_track_widget.time_frame.setStyleSheet("""
-                QFrame {
-                    background-color: #FFCCCC;
-                    border-radius: 4px;
-                    padding: 5px;
-                }
-            """)
+        self._set_timer_frame_active(is_target_app_active)
         
         # 데이터 저장
         DataManager.save_timer_data(self.timer_data)
@@ -454,31 +426,37 @@ class TimerKing(QMainWindow):
     def start_tracking(self):
         # 이 메서드는 더 이상 update_time_display를 호출하지 않음
         if self.current_app:
-            active_app = NSWorkspace.sharedWorkspace().activeApplication()
-            is_target_app_active = active_app and active_app['NSApplicationName'] == self.current_app
+            active_app = self.focus_source.current()
+            is_target_app_active = active_app and active_app.app_name == self.current_app
             
             # 배경색만 업데이트
-            if is_target_app_active:
-                self.time_track_widget.time_frame.setStyleSheet("""
-                    QFrame {
-                        background-color: #CCE5FF;
-                        border-radius: 4px;
-                        padding: 5px;
-                    }
-                """)
-            else:
-                self.time_track_widget.time_frame.setStyleSheet("""
-                    QFrame {
-                        background-color: #FFCCCC;
-                        border-radius: 4px;
-                        padding: 5px;
-                    }
-                """)
+            self._set_timer_frame_active(is_target_app_active)
 
     def closeEvent(self, event):
-        """앱이 종료될 때 데이터를 저장합니다."""
+        """앱이 종료될 때 데이터를 저장합니다.
+
+        예약된 기록은 비동기 루프에서 최대 CLOSE_FLUSH_TIMEOUT초 기다리고, 그동안
+        창은 닫지 않습니다. 기록이 끝나거나 시간을 넘기면 창을 다시 닫습니다.
+        """
         if not self._is_shutting_down:
             self._is_shutting_down = True
-            self.update_usage_stats()
             DataManager.save_timer_data(self.timer_data)
-        event.accept()
\ No newline at end of file
+            self._close_flush = self.async_bridge.run(
+                DataManager.flush_async(), on_result=self._finish_close,
+                on_error=self._finish_close, timeout=CLOSE_FLUSH_TIMEOUT)
+        if self._close_flush is not None and not self._close_flush.done():
+            event.ignore()
+            return
+        event.accept()
+
+    def _finish_close(self, error=None):
+        if error is not None:
+            log.warning("닫기 전 기록 반영 실패: %r", error)
+        self.log_persistence_stats()
+        self.close()
+
+    def log_persistence_stats(self):
+        stats = DataManager.persistence_stats()
+        log.info("저장 통계: 알림 %d회, 기록 %d회, 대기 %d건, 평균 지연 %.1fms, 최대 지연 %.1fms",
+                 stats['notifications'], stats['writes'], stats['queue_depth'],
+                 stats['avg_latency_ms'], stats['max_latency_ms'])
\ No newline at end of file
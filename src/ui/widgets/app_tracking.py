@@ -1,21 +1,30 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget, 
-                            QTreeWidgetItem, QHeaderView, QToolTip)
-from PyQt5.QtCore import QTimer, Qt, QRect, QPoint
-from PyQt5.QtGui import QFont, QPainter, QColor, QPen
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeView, 
+                            QHeaderView, QToolTip, QComboBox)
+from PyQt5.QtCore import Qt, QRect, QPoint, QObject, pyqtSignal
+from PyQt5.QtGui import QFont, QPainter, QColor, QPen, QPixmap
 import time
 from datetime import datetime, timedelta
-from core.data_manager import DataManager
-import subprocess
-from Foundation import NSWorkspace
+from core.compact_usage import CompactUsage
+from core.interval_index import IntervalIndex, day_start_of
+from core.metrics import timed
 import os
-from core.config import APP_NAME
+from core.tick_scheduler import get_tick_scheduler
+from core.tracker import apply_usage_rows
+from core.tracker_ipc import get_tracker_client
+from ui.widgets.usage_tree_model import UsageTreeModel
+from core.log import get_logger
+
+log = get_logger('app_tracking')
 
 class TimeGraphWidget(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, interval_index=None, parent=None):
         super().__init__(parent)
         self.setMinimumHeight(50)
         self.setMouseTracking(True)  # 마우스 추적 활성화
         
+        # 하루치 사용 구간 색인 (Home_app_tracking이 채우고 날짜가 바뀌면 교체합니다)
+        self.interval_index = interval_index
+        
         # 줌 관련 변수
         self.zoom_level = 1.0  # 1.0 = 24시간
         self.center_time = None  # 줌 중심점 (현재 시각)
@@ -25,10 +34,13 @@ class TimeGraphWidget(QWidget):
         self.drag_start_pos = None
         self.drag_start_time = None
         
-        # 타이머 설정
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update)
-        self.update_timer.start(1000)  # 1초마다 업데이트
+        # 정적 배경 캐시 (눈금과 닫힌 구간은 줌/이동/구간 추가 때만 다시 그립니다)
+        self._static_pixmap = None
+        self._static_cache_key = None
+        self._painted_live_span = None
+        
+        # 공유 틱 구독
+        get_tick_scheduler().subscribe(self.on_tick)
         
         # 툴팁 폰트 설정
         QToolTip.setFont(QFont('Arial', 10))
@@ -45,13 +57,23 @@ class TimeGraphWidget(QWidget):
             QColor(50, 255, 255),  # 시안
         ]
     
+    def day_start(self):
+        """그래프가 보여 주는 날의 자정 시각입니다. 색인이 없으면 오늘입니다."""
+        return self.interval_index.day_start if self.interval_index is not None else day_start_of()
+    
+    def set_interval_index(self, interval_index):
+        """보여 줄 색인을 바꿉니다. 날짜가 바뀌면 줌 중심을 새 날로 되돌립니다."""
+        if self.interval_index is None or self.interval_index.day_start != interval_index.day_start:
+            self.center_time = None
+        self.interval_index = interval_index
+        self.update()
+    
     def wheelEvent(self, event):
         """마우스 휠 이벤트 처리"""
         # 현재 마우스 위치의 시각 계산
         width = self.width()
         x = event.pos().x()
-        now = datetime.now()
-        day_start = datetime(now.year, now.month, now.day).timestamp()
+        day_start = self.day_start()
         
         # 줌 중심점이 없으면 마우스 위치를 중심점으로 설정
         if self.center_time is None:
@@ -92,14 +114,12 @@ class TimeGraphWidget(QWidget):
             self.update()
         
         # 툴팁 표시
-        if hasattr(self.window(), 'app_usage'):
-            current_time = time.time()
+        if self.interval_index is not None:
             width = self.width()
             x = event.pos().x()
             
-            # 현재 시각 (자정 기준)
-            now = datetime.now()
-            day_start = datetime(now.year, now.month, now.day).timestamp()
+            # 색인의 날짜 (자정 기준)
+            day_start = self.day_start()
             
             # 마우스 위치의 시각 (줌 레벨 적용)
             visible_duration = 24 * 3600 * self.zoom_level
@@ -109,18 +129,12 @@ class TimeGraphWidget(QWidget):
             time_start = self.center_time - visible_duration / 2
             hover_time = time_start + (x / width * visible_duration)
             
-            # 해당 시각에 실행 중이던 앱 찾기
+            # 해당 시각에 실행 중이던 앱 찾기 (앱마다 이진 탐색)
             active_apps = []
-            for app_name, app_data in self.window().app_usage.items():
-                start_time = max(day_start, 
-                              app_data.get('last_update', current_time) - app_data.get('total_time', 0))
-                end_time = app_data.get('last_update', current_time)
-                
-                if start_time <= hover_time <= end_time:
-                    # 해당 시점의 시간 표시
-                    hover_dt = datetime.fromtimestamp(hover_time)
-                    window_name = app_data.get('last_window', '')
-                    active_apps.append(f"{app_name}\n- {window_name}\n- 시각: {hover_dt.strftime('%H:%M:%S')}")
+            hover_dt = datetime.fromtimestamp(hover_time)
+            for app_name, window_name, start_time, end_time in self.interval_index.at(hover_time):
+                active_apps.append(f"{app_name}\n- {window_name or ''}\n- 시각: {hover_dt.strftime('%H:%M:%S')}"
+                                   f"\n- 구간: {self.format_duration(end_time - start_time)}")
             
             if active_apps:
                 QToolTip.showText(event.globalPos(), "\n\n".join(active_apps))
@@ -141,27 +155,79 @@ class TimeGraphWidget(QWidget):
         seconds = int(seconds % 60)
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
     
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+    def _fill_span(self, painter, start_time, end_time, time_start, time_end,
+                   visible_duration, bar_height, color):
+        """시각 구간을 화면 좌표로 변환해 채웁니다."""
+        width = self.width()
+        x_start = int(width * (max(start_time, time_start) - time_start) / visible_duration)
+        x_end = int(width * (min(end_time, time_end) - time_start) / visible_duration)
+        painter.fillRect(x_start, 0, max(1, x_end - x_start), bar_height, color)
+    
+    def _visible_range(self):
+        """보이는 시간 범위 (시작, 끝, 길이)를 반환합니다."""
+        visible_duration = 24 * 3600 * self.zoom_level
+        if self.center_time is None:
+            self.center_time = self.day_start() + visible_duration / 2
+        time_start = self.center_time - visible_duration / 2
+        return time_start, time_start + visible_duration, visible_duration
+    
+    def _static_key(self):
+        """정적 배경을 다시 그려야 하는지 판단하는 키입니다."""
+        index = self.interval_index
+        return (self.width(), self.height(), self.devicePixelRatioF(), self.zoom_level, self.center_time,
+                index, index.version if index is not None else 0,
+                len(index.app_names()) if index is not None else 0)
+    
+    def _live_span(self, current_time=None):
+        """진행 중인 구간의 화면 x 범위를 (앱, 시작 x, 끝 x)로 반환합니다. 없으면 None입니다."""
+        if self.interval_index is None:
+            return None
+        time_start, time_end, visible_duration = self._visible_range()
+        live = self.interval_index.visible_live(time_start, time_end, current_time)
+        if live is None:
+            return None
+        width = self.width()
+        x_start = int(width * (max(live[2], time_start) - time_start) / visible_duration)
+        x_end = int(width * (min(live[3], time_end) - time_start) / visible_duration)
+        return (live[0], x_start, max(x_start + 1, x_end))
+    
+    def on_tick(self, tick):
+        """매 틱 호출됩니다. 바뀐 부분이 있을 때만 그 영역을 다시 그리도록 요청합니다."""
+        if not self.isVisible():
+            return
+        if self._static_key() != self._static_cache_key:
+            self.update()
+            return
+        
+        live_span = self._live_span(tick.timestamp)
+        painted = self._painted_live_span
+        if live_span == painted:
+            return
+        if live_span is None or painted is None or live_span[:2] != painted[:2]:
+            self.update()
+            return
         
-        # 현재 시각 (자정 기준)
-        now = datetime.now()
-        day_start = datetime(now.year, now.month, now.day).timestamp()
-        current_time = time.time()
+        # 진행 중인 구간의 오른쪽 끝이 움직인 픽셀만 다시 그립니다
+        x_left = min(painted[2], live_span[2]) - 1
+        x_right = max(painted[2], live_span[2]) + 1
+        self.update(QRect(x_left, 0, x_right - x_left, self.height()))
+    
+    @timed('ui.graph_static')
+    def _render_static(self):
+        """배경, 시간 눈금, 닫힌 구간을 오프스크린 픽스맵에 그립니다."""
         width = self.width()
         height = self.height()
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(max(1, int(width * ratio)), max(1, int(height * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
         
-        # 배경 (회색)
-        painter.fillRect(self.rect(), QColor(50, 50, 50))
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
         
-        # 보이는 시간 범위 계산
-        visible_duration = 24 * 3600 * self.zoom_level
-        if self.center_time is None:
-            self.center_time = day_start + visible_duration / 2
+        # 배경 (회색)
+        painter.fillRect(0, 0, width, height, QColor(50, 50, 50))
         
-        time_start = self.center_time - visible_duration / 2
-        time_end = self.center_time + visible_duration / 2
+        time_start, time_end, visible_duration = self._visible_range()
         
         # 시간 눈금 (1시간 간격)
         painter.setPen(QPen(QColor(100, 100, 100), 1))
@@ -176,32 +242,77 @@ class TimeGraphWidget(QWidget):
                 time_text = f"{hour % 24:02d}:00"
                 painter.drawText(x + 2, height - 2, time_text)
         
-        # 앱 사용 시간
-        if hasattr(self.window(), 'app_usage'):
+        # 닫힌 사용 구간 (보이는 범위의 구간만 이진 탐색으로 꺼냅니다)
+        app_names = self.interval_index.app_names() if self.interval_index is not None else []
+        if app_names:
             bar_height = height - 20  # 모든 앱이 전체 높이 사용
             
             # 앱별 투명도 설정
-            opacity = min(0.7, 1.0 / len(self.window().app_usage))
+            opacity = min(0.7, 1.0 / len(app_names))
             
-            for app_name, app_data in self.window().app_usage.items():
-                # 앱의 시작 시간을 오늘 자정 이후로 조정
-                start_time = max(day_start, 
-                              app_data.get('last_update', current_time) - app_data.get('total_time', 0))
-                end_time = app_data.get('last_update', current_time)
-                
-                # 시작 시간과 현재 시간을 화면 좌표로 변환
-                if start_time <= time_end and end_time >= time_start:
-                    x_start = int(width * (max(start_time, time_start) - time_start) / visible_duration)
-                    x_end = int(width * (min(end_time, time_end) - time_start) / visible_duration)
-                    
+            # 축소해서 한 픽셀에 여러 구간이 들어가면 미리 합산한 LOD 버킷을 그립니다
+            level = self.interval_index.lod_level(visible_duration / width)
+            if level is None:
+                visible = self.interval_index.visible(time_start, time_end)
+                for app_name, intervals in visible.items():
                     color = self.get_app_color(app_name)
                     color.setAlphaF(opacity)  # 투명도 설정
-                    painter.fillRect(x_start, 0, x_end - x_start, bar_height, color)
+                    for start_time, end_time in intervals:
+                        self._fill_span(painter, start_time, end_time, time_start, time_end,
+                                        visible_duration, bar_height, color)
+            else:
+                occupancy = self.interval_index.occupancy(level, time_start, time_end)
+                for app_name, runs in occupancy.items():
+                    color = self.get_app_color(app_name)
+                    for start_time, end_time, fill_ratio in runs:
+                        # 버킷을 채운 비율만큼 옅게 그립니다
+                        color.setAlphaF(opacity * fill_ratio)
+                        self._fill_span(painter, start_time, end_time, time_start, time_end,
+                                        visible_duration, bar_height, color)
+        
+        painter.end()
+        self._static_pixmap = pixmap
+        self._static_cache_key = self._static_key()
+    
+    @timed('ui.graph_paint')
+    def paintEvent(self, event):
+        if self._static_key() != self._static_cache_key:
+            self._render_static()
+        
+        painter = QPainter(self)
+        width = self.width()
+        height = self.height()
+        
+        # 바뀐 영역만 정적 픽스맵에서 복사합니다
+        rect = event.rect()
+        ratio = self._static_pixmap.devicePixelRatioF()
+        painter.drawPixmap(rect, self._static_pixmap,
+                           QRect(int(rect.x() * ratio), int(rect.y() * ratio),
+                                 int(rect.width() * ratio), int(rect.height() * ratio)))
+        
+        # 진행 중인 구간
+        live_span = self._live_span()
+        if live_span is not None:
+            app_names = self.interval_index.app_names()
+            color = self.get_app_color(live_span[0])
+            color.setAlphaF(min(0.7, 1.0 / len(app_names)))
+            painter.fillRect(live_span[1], 0, live_span[2] - live_span[1], height - 20, color)
+        self._painted_live_span = live_span
         
         # 테두리
         painter.setPen(QPen(QColor(100, 100, 100), 1))
         painter.drawRect(0, 0, width - 1, height - 1)
 
+# 트리에 보여 줄 사용 시간 범위 (표시 이름, 추적 데몬의 범위 단위). 'all'은 누적 합계입니다
+USAGE_RANGES = [('전체', 'all'), ('이번 달', 'month'), ('이번 주', 'week'),
+                ('오늘', 'day'), ('이번 시간', 'hour')]
+
+
+class _TrackerBridge(QObject):
+    """추적 클라이언트의 스레드에서 받은 메시지를 GUI 스레드로 넘겨 줍니다."""
+    message = pyqtSignal(object)
+
+
 class Home_app_tracking(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -210,27 +321,37 @@ class Home_app_tracking(QWidget):
         
         # 시작 시간 및 업데이트 관련 변수 초기화
         self.start_time = time.time()
-        self._last_update = time.time()
-        self._update_interval = 1.0  # 1초로 변경
         self._pending_updates = set()
         
-        # 앱 사용 시간 데이터
-        self.app_usage = DataManager.load_app_usage() or {}
+        # 앱 사용 시간 데이터 (추적 데몬이 보내 주는 사본입니다)
+        self.app_usage = CompactUsage()
         self.active_app = None
         self.active_window = None
-        self.active_start_time = None
+        self.active_start_time = None  # 진행 중인 구간의 시작
         
-        # 트리 위젯의 확장 상태 저장
-        self._expanded_items = set()
+        # 트리에 보여 줄 범위. 'all'이 아니면 range 메시지로 받은 사용 데이터를 보여 줍니다
+        self.usage_range = 'all'
+        self.range_usage = CompactUsage()
+        self.range_bounds = None  # range_usage가 다루는 (시작, 끝), 받기 전이면 None
+        
+        # 시간 그래프가 읽는 오늘의 구간 색인 (snapshot을 받으면 채워집니다)
+        self.interval_index = IntervalIndex(day_start_of())
+        
+        # 추적은 데몬이 하고, 이 화면은 데몬의 메시지로만 갱신됩니다
+        self.tick_scheduler = get_tick_scheduler()
+        self.tracker_client = get_tracker_client()
+        self._bridge = _TrackerBridge(self)
+        self._bridge.message.connect(self.on_tracker_message)
+        self.tracker_client.subscribe(self._receive_tracker_message)
+        
+        self._dirty_rows = set()  # 다음 갱신 때 고칠 (앱, 창) 목록
         
         # 폰트 설정
         self.app_font = QFont("Arial", 15)  # 14에서 15로 변경
         self.window_font = QFont("Arial", 13)  # 12에서 13으로 변경
         
-        # 캐시 및 상태 변수 초기화
-        self._widgets_cache = {}
+        # 상태 변수 초기화
         self._is_active = True
-        self.MAX_ITEMS = 100
         
         # Total 시간과 그래프를 포함하는 컨테이너
         total_graph_container = QWidget()
@@ -247,74 +368,88 @@ class Home_app_tracking(QWidget):
         self.total_time_label = QLabel("00:00:00")
         self.total_time_label.setFont(QFont("Arial", 20, QFont.Bold))
         
+        self.range_combo = QComboBox()
+        self.range_combo.setFont(QFont("Arial", 15))
+        for label, usage_range in USAGE_RANGES:
+            self.range_combo.addItem(label, usage_range)
+        self.range_combo.currentIndexChanged.connect(self.on_range_changed)
+        
         total_layout.addWidget(self.total_label)
+        total_layout.addWidget(self.range_combo)
         total_layout.addStretch()
         total_layout.addWidget(self.total_time_label)
         
         # 시간 그래프
-        self.time_graph = TimeGraphWidget()
+        self.time_graph = TimeGraphWidget(self.interval_index)
         
         # 컨테이너에 위젯 추가
         total_graph_layout.addWidget(total_container)
         total_graph_layout.addWidget(self.time_graph)
         
-        # 트리 위젯 설정
-        self.tree_widget = QTreeWidget()
-        self.tree_widget.setHeaderHidden(False)
-        self.tree_widget.setColumnCount(2)
-        self.tree_widget.setHeaderLabels(["Name", "Time"])
+        # 트리 뷰와 모델 설정 (창 행은 앱을 펼칠 때 만들어집니다)
+        self.usage_model = UsageTreeModel(self.app_usage, self.app_font, self.window_font, self)
+        self.usage_model.request_windows = self.request_windows
+        self.tree_view = QTreeView()
+        self.tree_view.setModel(self.usage_model)
+        self.tree_view.setHeaderHidden(False)
+        self.tree_view.setUniformRowHeights(True)
+        self.tree_view.collapsed.connect(self.usage_model.release_children)
         
         # 헤더 설정
-        header = self.tree_widget.header()
+        header = self.tree_view.header()
         header.setSectionsMovable(True)
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
         header.setSectionResizeMode(0, QHeaderView.Interactive)
         header.setSectionResizeMode(1, QHeaderView.Interactive)
         
         # Name 열의 너비를 화면의 절반으로 설정
-        self.tree_widget.setColumnWidth(0, 512)
-        self.tree_widget.setColumnWidth(1, 200)
+        self.tree_view.setColumnWidth(0, 512)
+        self.tree_view.setColumnWidth(1, 200)
         
         # 헤더 클릭 시 정렬 이벤트 연결
-        self.tree_widget.header().sectionClicked.connect(self.on_header_clicked)
+        header.sectionClicked.connect(self.on_header_clicked)
         
         # 정렬 상태 추적을 위한 변수
         self.sort_column = 1
         self.sort_order = Qt.DescendingOrder
         
-        # 초기 정렬 설정
-        self.tree_widget.sortItems(self.sort_column, self.sort_order)
+        # 초기 정렬 설정 (이후에는 값이 바뀐 행만 모델 안에서 제자리를 찾아갑니다)
+        self.tree_view.sortByColumn(self.sort_column, self.sort_order)
         
         # 스타일 설정
         self.setup_style()
         
         # 레이아웃에 위젯 추가
         layout.addWidget(total_graph_container)
-        layout.addWidget(self.tree_widget)
+        layout.addWidget(self.tree_view)
         
         # 타이머 설정
         self.setup_timers()
+        
+        # 이미 연결되어 있으면 전체 상태를 요청합니다 (아니면 연결될 때 받습니다)
+        self.tracker_client.send('snapshot')
 
     def setup_style(self):
         # 헤더와 아이템 폰트 크기 설정
         header_font = QFont("Arial", 17, QFont.Bold)
         item_font = QFont("Arial", 15)
         
-        self.tree_widget.headerItem().setFont(0, header_font)
-        self.tree_widget.headerItem().setFont(1, header_font)
+        self.tree_view.header().setFont(header_font)
         
-        self.tree_widget.setStyleSheet("""
-            QTreeWidget {
+        self.tree_view.setStyleSheet("""
+            QTreeView {
                 background-color: #1E1E1E;
                 color: white;
                 border: none;
                 font-size: 15px;
             }
-            QTreeWidget::item {
+            QTreeView::item {
                 padding: 8px;
                 border-bottom: 1px solid #3C3C3C;
                 height: 35px;
             }
-            QTreeWidget::item:selected {
+            QTreeView::item:selected {
                 background-color: #404040;
             }
             QHeaderView::section {
@@ -330,252 +465,157 @@ class Home_app_tracking(QWidget):
         """)
 
     def setup_timers(self):
-        # 앱 사용 시간 업데이트 타이머
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update_usage_stats)
-        self.update_timer.start(1000)  # 1초마다 업데이트
-        
-        # 총 시간 업데이트 타이머
-        self.total_timer = QTimer(self)
-        self.total_timer.timeout.connect(self.update_total_time)
-        self.total_timer.start(1000)
-        
-        # 레이아웃 업데이트 타이머
-        self._layout_update_timer = QTimer(self)
-        self._layout_update_timer.timeout.connect(self._update_layout)
-        self._layout_update_timer.setSingleShot(True)
+        # 공유 틱은 총 시간 표시와 날짜 변경 확인에만 씁니다
+        self.tick_scheduler.subscribe(self.on_tick)
+
+    def on_tick(self, tick):
+        # 자정이 지나면 새 날짜의 색인으로 바꿉니다
+        if not self.interval_index.covers(tick.timestamp):
+            self.roll_over_interval_index(tick.timestamp)
+        # 보고 있는 범위가 끝났으면(다음 시간/날/주/달) 새 범위를 요청합니다
+        if self.range_bounds is not None and tick.timestamp >= self.range_bounds[1]:
+            self.range_bounds = None
+            self.request_range()
+        self.update_total_time(tick)
 
     def showEvent(self, event):
         self._is_active = True
+        self.tick_scheduler.request_fast(self, True)
+        # 숨겨져 있는 동안 모아 둔 변경을 반영합니다
+        self.update_tree_widget()
+        self.request_range()
         super().showEvent(event)
         
     def hideEvent(self, event):
         self._is_active = False
+        self.tick_scheduler.request_fast(self, False)
         super().hideEvent(event)
 
-    def update_usage_stats(self):
-        if not self._is_active:
-            return
-            
-        current_time = time.time()
-        if current_time - self._last_update < self._update_interval:
-            return
+    def _receive_tracker_message(self, message):
+        """추적 클라이언트 스레드에서 호출됩니다. 무거운 준비는 여기서 마칩니다."""
+        if message.get('event') == 'snapshot':
+            # 하루치 구간 색인은 GUI 스레드를 막지 않도록 미리 만들어 넘깁니다
+            index = IntervalIndex(message['day_start'])
+            for app_name, window_title, start_time, end_time in message['intervals']:
+                index.add(app_name, window_title, start_time, end_time)
+            message['index'] = index
+            message['usage'] = CompactUsage.from_usage(message.pop('app_usage'))
+        elif message.get('event') == 'range':
+            message['usage'] = CompactUsage.from_usage(message.pop('app_usage'))
+        self._bridge.message.emit(message)
 
+    def on_tracker_message(self, message):
+        """추적 데몬의 메시지를 화면 상태에 반영합니다."""
         try:
-            # 현재 활성 앱 정보 가져오기
-            active_app = NSWorkspace.sharedWorkspace().activeApplication()
-            if active_app:
-                app_bundle = active_app.get('NSApplicationBundleIdentifier', '')
-                app_name = active_app.get('NSApplicationName', '')
-                app_path = active_app.get('NSApplicationPath', '')
-                
-                print(f"Debug - App Info: name={app_name}, bundle={app_bundle}, path={app_path}")
-                
-                # Python 관련 프로세스인 경우 APP_NAME 사용
-                if (app_name.lower() in ['python', 'python3', 'python.app'] or 
-                    'python' in app_name.lower() or
-                    'python' in app_bundle.lower() or
-                    'python' in app_path.lower()):
-                    print(f"Debug - Detected Python process, changing name from {app_name} to {APP_NAME}")
-                    app_name = APP_NAME
-                
-                window_title = self.get_active_window_title()
-                print(f"Debug - Window Title: {window_title}")
-                
-                # 앱이 변경되었거나 처음 시작할 때
-                if app_name != self.active_app:
-                    if self.active_app and self.active_start_time:
-                        # 이전 앱의 사용 시간 업데이트
-                        elapsed = current_time - self.active_start_time
-                        self.update_app_time(self.active_app, self.active_window, elapsed)
-                    
-                    # 새 앱 정보 설정
-                    self.active_app = app_name
-                    self.active_window = window_title
-                    self.active_start_time = current_time
-                    print(f"Debug - App changed to: {app_name}")
-                elif window_title != self.active_window:
-                    # 같은 앱의 다른 창으로 전환
-                    if self.active_start_time:
-                        elapsed = current_time - self.active_start_time
-                        self.update_app_time(self.active_app, self.active_window, elapsed)
-                    self.active_window = window_title
-                    self.active_start_time = current_time
-                else:
-                    # 같은 앱을 계속 사용 중일 때도 시간 업데이트
-                    elapsed = current_time - self.active_start_time
-                    self.update_app_time(self.active_app, self.active_window, elapsed)
-                    self.active_start_time = current_time  # 시작 시간 갱신
-            
-            # 트리 위젯 업데이트
-            self.update_tree_widget()
-            
-            # 현재 상태 저장
-            DataManager.save_app_usage(self.app_usage)
-            self._last_update = current_time
-
+            kind = message.get('event')
+            if kind == 'snapshot':
+                self.apply_snapshot(message)
+            elif kind == 'usage':
+                dirty_rows = apply_usage_rows(self.app_usage, message['rows'])
+                # 범위를 보고 있을 때는 늘어난 시간을 범위 사용 데이터에 더합니다
+                if self.usage_range != 'all':
+                    dirty_rows = (apply_usage_rows(self.range_usage, message['rows'], self.range_bounds)
+                                  if self.range_bounds is not None else set())
+                self._dirty_rows |= dirty_rows
+                if self._is_active:
+                    self.update_tree_widget()
+            elif kind == 'windows':
+                self.apply_windows(message)
+            elif kind == 'range':
+                self.apply_range(message)
+            elif kind == 'interval':
+                self.interval_index.add(message['app'], message['window'],
+                                        message['start'], message['end'])
+            elif kind == 'live':
+                self.set_live(message)
+            elif kind == 'disconnected':
+                # 다시 연결되면 snapshot으로 전체 상태를 받습니다
+                self.active_app = self.active_window = self.active_start_time = None
+                self.interval_index.clear_live()
+                log.info("Tracker disconnected")
         except Exception as e:
-            print(f"Error in update_usage_stats: {e}")
-    
-    def update_app_time(self, app_name, window_title, elapsed):
-        """앱과 창의 사용 시간을 업데이트합니다."""
-        if not app_name:
+            log.error("Error in on_tracker_message: %s", e)
+
+    def apply_snapshot(self, message):
+        """snapshot 메시지로 누적 데이터와 오늘의 구간을 다시 만듭니다."""
+        self.app_usage = message['usage']
+        if self.usage_range == 'all':
+            self.sync_tree_widget()
+        else:
+            self.request_range()
+
+        self.interval_index = message['index']
+        self.set_live(message['live'])
+        self.time_graph.set_interval_index(self.interval_index)
+
+    def request_windows(self, app_name):
+        """펼친 앱의 창 목록을 추적 데몬에 요청합니다."""
+        self.tracker_client.send('windows', app=app_name)
+
+    def apply_windows(self, message):
+        """windows 메시지로 받은 창 목록을 채우고 트리에 알립니다."""
+        if message['app'] not in self.app_usage:
             return
-            
-        if app_name not in self.app_usage:
-            self.app_usage[app_name] = {
-                'total_time': 0,
-                'windows': {}
-            }
-        
-        self.app_usage[app_name]['total_time'] = self.app_usage[app_name].get('total_time', 0) + elapsed
-        
-        if window_title:
-            if 'windows' not in self.app_usage[app_name]:
-                self.app_usage[app_name]['windows'] = {}
-            self.app_usage[app_name]['windows'][window_title] = (
-                self.app_usage[app_name]['windows'].get(window_title, 0) + elapsed
-            )
+        self.app_usage.set_windows(message['app'], message['windows'])
+        if self.usage_range == 'all':
+            self.usage_model.windows_loaded(message['app'])
+
+    def on_range_changed(self, index):
+        """범위 선택이 바뀌면 누적 합계를 다시 보여 주거나 그 범위의 사용 데이터를 요청합니다."""
+        self.usage_range = self.range_combo.itemData(index)
+        self.range_bounds = None
+        if self.usage_range == 'all':
+            self.sync_tree_widget()
+        else:
+            self.request_range()
+
+    def request_range(self):
+        """선택한 범위의 사용 데이터를 추적 데몬에 요청합니다."""
+        if self.usage_range != 'all':
+            self.tracker_client.send('range', range=self.usage_range)
+
+    def apply_range(self, message):
+        """range 메시지가 지금 선택한 범위의 것이면 트리를 그 사용 데이터로 바꿉니다."""
+        if message['range'] != self.usage_range:
+            return
+        self.range_usage = message['usage']
+        self.range_bounds = (message['start'], message['end'])
+        self.sync_tree_widget()
+
+    def set_live(self, message):
+        """live 메시지로 진행 중인 구간을 바꿉니다."""
+        self.active_app = message.get('app')
+        self.active_window = message.get('window')
+        self.active_start_time = message.get('start')
+        if self.active_app:
+            self.interval_index.set_live(self.active_app, self.active_window, message['start'])
+        else:
+            self.interval_index.clear_live()
     
-    def update_tree_widget(self):
-        """트리 위젯의 내용을 업데이트합니다."""
-        current_sort_column = self.tree_widget.sortColumn()
-        current_sort_order = self.tree_widget.header().sortIndicatorOrder()
-        
-        # 현재 선택된 아이템 저장
-        selected_items = []
-        for item in self.tree_widget.selectedItems():
-            path = []
-            current = item
-            while current:
-                path.insert(0, current.text(0))
-                current = current.parent()
-            selected_items.append(path)
-        
-        # 현재 확장된 아이템들 저장
-        self._expanded_items = {
-            self.tree_widget.itemFromIndex(index).text(0)
-            for index in self._iter_tree_indexes()
-            if self.tree_widget.isExpanded(index)
-        }
-        
-        self.tree_widget.setSortingEnabled(False)
-        self.tree_widget.clear()
-        
-        # 아이템 맵 초기화 (경로로 아이템을 찾기 위함)
-        self._item_map = {}
-        
-        for app_name, app_data in self.app_usage.items():
-            total_time = app_data.get('total_time', 0)
-            if total_time > 0:
-                app_item = QTreeWidgetItem(self.tree_widget)
-                app_item.setText(0, app_name)
-                app_item.setFont(0, self.app_font)
-                app_item.setFont(1, self.app_font)
-                
-                time_str = self.format_time(total_time)
-                app_item.setText(1, time_str)
-                app_item.setData(1, Qt.UserRole, total_time)
-                
-                self._item_map[app_name] = app_item
-                
-                # 이전에 확장되어 있었다면 다시 확장
-                if app_name in self._expanded_items:
-                    self.tree_widget.expandItem(app_item)
-                
-                for window_name, window_time in app_data.get('windows', {}).items():
-                    window_item = QTreeWidgetItem(app_item)
-                    window_item.setText(0, window_name)
-                    window_item.setFont(0, self.window_font)
-                    window_item.setFont(1, self.window_font)
-                    
-                    window_time_str = self.format_time(window_time)
-                    window_item.setText(1, window_time_str)
-                    window_item.setData(1, Qt.UserRole, window_time)
-                    
-                    self._item_map[f"{app_name}/{window_name}"] = window_item
-        
-        # 이전에 선택된 아이템 복원
-        for path in selected_items:
-            item = None
-            full_path = ""
-            for i, name in enumerate(path):
-                full_path = "/".join(path[:i+1])
-                item = self._item_map.get(full_path)
-                if item:
-                    item.setSelected(True)
-                    if i < len(path) - 1:  # 마지막 아이템이 아니면 확장
-                        self.tree_widget.expandItem(item)
-        
-        self.tree_widget.setSortingEnabled(True)
-        self.tree_widget.sortItems(current_sort_column, current_sort_order)
+    def roll_over_interval_index(self, current_time):
+        """current_time이 속한 날짜의 빈 색인으로 교체합니다."""
+        self.interval_index = IntervalIndex(day_start_of(current_time))
+        if self.active_app:
+            self.interval_index.set_live(self.active_app, self.active_window, self.active_start_time)
+        self.time_graph.set_interval_index(self.interval_index)
     
-    def _iter_tree_indexes(self):
-        """트리 위젯의 모든 인덱스를 순회합니다."""
-        def recurse(parent_index):
-            if not parent_index.isValid():
-                for i in range(self.tree_widget.topLevelItemCount()):
-                    child_index = self.tree_widget.model().index(i, 0)
-                    yield child_index
-                    yield from recurse(child_index)
-            else:
-                for i in range(self.tree_widget.model().rowCount(parent_index)):
-                    child_index = self.tree_widget.model().index(i, 0, parent_index)
-                    yield child_index
-                    yield from recurse(child_index)
-        
-        yield from recurse(self.tree_widget.rootIndex())
+    def flush_usage(self):
+        """추적 데몬에 열린 구간을 기록하도록 요청합니다."""
+        self.tracker_client.send('flush')
     
-    def get_active_window_title(self):
-        """현재 활성 창의 제목을 가져옵니다."""
-        try:
-            active_app = NSWorkspace.sharedWorkspace().activeApplication()
-            if not active_app:
-                return None
-            
-            app_name = active_app['NSApplicationName']
-            app_path = active_app.get('NSApplicationPath', '')
-            
-            print(f"Debug - Active Window Check: app_name={app_name}, is_active={self.window().isActiveWindow() if hasattr(self, 'window') else False}")
-            
-            # 현재 앱이 맥 타임좌인 경우
-            if ('python' in app_name.lower() or 'python' in app_path.lower()):
-                # 현재 창이 활성화되어 있는지 확인
-                current_window = self.window() if hasattr(self, 'window') else None
-                if current_window and current_window.isActiveWindow():
-                    print("Debug - Detected Home UI is active")
-                    return 'Home'
-                
-                print(f"Debug - Window detection: has_window={hasattr(self, 'window')}, window_active={current_window.isActiveWindow() if current_window else False}")
-            
-            script = f'''
-                tell application "System Events"
-                    tell process "{app_name}"
-                        try
-                            get name of window 1
-                        on error
-                            return "{app_name}"
-                        end try
-                    end tell
-                end tell
-            '''
-            
-            p = subprocess.Popen(['osascript', '-e', script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            try:
-                out, err = p.communicate(timeout=0.3)
-                if p.returncode == 0 and out:
-                    window_title = out.decode('utf-8').strip()
-                    print(f"Debug - AppleScript window title: {window_title}")
-                    return window_title
-            except subprocess.TimeoutExpired:
-                p.kill()
-            
-            print(f"Debug - Fallback to app_name: {app_name}")
-            return app_name
-            
-        except Exception as e:
-            print(f"Debug - Error getting window title: {e}")
-            return None
+    @timed('ui.tree_update')
+    def update_tree_widget(self):
+        """마지막 갱신 이후 시간이 바뀐 행만 트리 모델에 반영합니다."""
+        if not self._dirty_rows:
+            return
+        dirty_rows, self._dirty_rows = self._dirty_rows, set()
+        self.usage_model.refresh(dirty_rows)
+    
+    @timed('ui.tree_reset')
+    def sync_tree_widget(self):
+        """선택한 범위의 사용 데이터(전체이면 app_usage) 전체를 트리 모델에 다시 읽힙니다."""
+        self._dirty_rows.clear()
+        self.usage_model.reset(self.app_usage if self.usage_range == 'all' else self.range_usage)
     
     def format_time(self, seconds):
         """초를 시:분:초 형식으로 변환합니다."""
@@ -584,38 +624,12 @@ class Home_app_tracking(QWidget):
         seconds = int(seconds % 60)
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
     
-    def update_total_time(self):
-        elapsed_time = time.time() - self.start_time
+    def update_total_time(self, tick=None):
+        elapsed_time = (tick.timestamp if tick else time.time()) - self.start_time
         hours, remainder = divmod(int(elapsed_time), 3600)
         minutes, seconds = divmod(remainder, 60)
         self.total_time_label.setText(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
 
-    def _get_or_create_item(self, app_name):
-        for i in range(self.tree_widget.topLevelItemCount()):
-            item = self.tree_widget.topLevelItem(i)
-            if item.text(0) == app_name:
-                return item
-        
-        item = QTreeWidgetItem([app_name])
-        self.tree_widget.addTopLevelItem(item)
-        item_font = QFont("Arial", 15)
-        item.setFont(0, item_font)
-        item.setFont(1, item_font)
-        return item
-
-    def _get_or_create_window_item(self, parent_item, window_name):
-        for i in range(parent_item.childCount()):
-            child = parent_item.child(i)
-            if child.text(0) == window_name:
-                return child
-        
-        child = QTreeWidgetItem([window_name])
-        parent_item.addChild(child)
-        item_font = QFont("Arial", 15)
-        child.setFont(0, item_font)
-        child.setFont(1, item_font)
-        return child
-
     def on_header_clicked(self, logical_index):
         if logical_index == self.sort_column:
             self.sort_order = Qt.AscendingOrder if self.sort_order == Qt.DescendingOrder else Qt.DescendingOrder
@@ -623,60 +637,4 @@ class Home_app_tracking(QWidget):
             self.sort_column = logical_index
             self.sort_order = Qt.AscendingOrder if logical_index == 0 else Qt.DescendingOrder
         
-        self.tree_widget.sortItems(self.sort_column, self.sort_order)
-
-    def _update_layout(self):
-        if not self._is_active:
-            return
-
-        try:
-            main_window = self.window()
-            if not hasattr(main_window, 'app_usage'):
-                return
-
-            self.tree_widget.setUpdatesEnabled(False)
-            self.tree_widget.setSortingEnabled(False)
-
-            # 가장 많이 사용된 앱 순으로 정렬
-            sorted_apps = sorted(
-                ((name, data) for name, data in main_window.app_usage.items() 
-                 if data['total_time'] > 0),
-                key=lambda x: x[1]['total_time'],
-                reverse=True
-            )[:self.MAX_ITEMS]
-
-            # 현재 표시된 항목 추적
-            current_items = set()
-
-            for app_name, app_data in sorted_apps:
-                current_items.add(app_name)
-                app_item = self._widgets_cache.get(app_name)
-                if not app_item:
-                    app_item = QTreeWidgetItem()
-                    self.tree_widget.addTopLevelItem(app_item)
-                    self._widgets_cache[app_name] = app_item
-
-                app_item.setText(0, app_name)
-                total_time = app_data['total_time']
-                hours, remainder = divmod(int(total_time), 3600)
-                minutes, seconds = divmod(remainder, 60)
-                app_item.setText(1, f"{hours:02d}:{minutes:02d}:{seconds:02d}")
-                app_item.setData(1, Qt.UserRole, total_time)
-
-            # 사용하지 않는 항목 제거
-            for app_name in list(self._widgets_cache.keys()):
-                if app_name not in current_items:
-                    item = self._widgets_cache.pop(app_name)
-                    index = self.tree_widget.indexOfTopLevelItem(item)
-                    if index >= 0:
-                        self.tree_widget.takeTopLevelItem(index)
-
-            # 정렬 활성화 및 적용
-            self.tree_widget.setSortingEnabled(True)
-            self.tree_widget.sortItems(self.sort_column, self.sort_order)
-            
-            self.tree_widget.setUpdatesEnabled(True)
-
-        except Exception as e:
-            print(f"Error in _update_layout: {e}")
-            self.tree_widget.setUpdatesEnabled(True)
\ No newline at end of file
+        self.tree_view.sortByColumn(self.sort_column, self.sort_order)
@@ -0,0 +1,419 @@
+from operator import itemgetter
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+
+# fetchMore 한 번에 만드는 창 행 수
+FETCH_BATCH_SIZE = 500
+
+
+def format_time(seconds):
+    """초를 시:분:초 형식으로 변환합니다."""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    seconds = int(seconds % 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+class _AppNode:
+    """최상위 앱 행입니다. 창 목록은 펼쳤을 때만 만듭니다."""
+    __slots__ = ('id', 'name', 'row', 'total', 'text', 'windows', 'window_rows', 'window_keys', 'pending')
+
+    def __init__(self, node_id, name):
+        self.id = node_id
+        self.name = name
+        self.row = 0
+        self.total = 0
+        self.text = ''
+        self.windows = None  # 펼치기 전에는 None, 펼친 뒤에는 지금까지 불러온 정렬된 창 이름 리스트
+        self.window_rows = None  # 불러온 창 이름 -> 행 번호
+        self.window_keys = None  # 불러온 창 이름 -> 정렬 키 (시간 또는 casefold한 이름)
+        self.pending = None  # 아직 불러오지 않은 창 이름의 정렬 순서 캐시
+
+
+class UsageTreeModel(QAbstractItemModel):
+    """app_usage 딕셔너리를 앱/창 두 단계 트리로 보여주는 모델입니다.
+
+    창 행은 앱을 펼칠 때 fetchMore로 정렬 순서 앞쪽부터 FETCH_BATCH_SIZE개씩
+    만들고(나머지는 스크롤이 끝에 닿을 때 이어서 불러옵니다) 접으면
+    release_children으로 버리므로, 창 제목이 아무리 많아도 펼치는 비용과
+    메모리는 화면에 불러온 행만큼만 듭니다. 창 행은
+    사용 데이터의 키를 그대로 참조하고 시간 문자열은 화면에 그릴 때 만듭니다.
+    정렬 키는 노드에 캐시해 두고, refresh는 바뀐 행의 시간 칸에만 dataChanged를
+    보내며 순서가 어긋난 행만 옮깁니다.
+
+    앱 데이터의 windows가 None이면 창 목록을 아직 받지 않은 것이므로 처음
+    펼칠 때 request_windows(앱 이름)로 요청하고, 받은 뒤 windows_loaded로
+    알려 주면 그때 창 행을 만듭니다. 그 전까지는 window_count로 펼칠 수
+    있는지만 판단합니다.
+
+    내부 ID가 0인 인덱스는 앱 행이고, 창 행의 내부 ID는 부모 앱 노드의 id입니다.
+    """
+
+    COLUMNS = ("Name", "Time")
+
+    def __init__(self, app_usage, app_font=None, window_font=None, parent=None):
+        super().__init__(parent)
+        self.app_font = app_font
+        self.window_font = window_font
+        self.sort_column = 1
+        self.sort_order = Qt.DescendingOrder
+
+        self._usage = {}
+        self._apps = []
+        self._app_nodes = {}  # 앱 이름 -> 노드
+        self._nodes_by_id = {}  # 노드 id -> 노드
+        self._next_id = 1
+        self.request_windows = None  # 창 목록을 아직 받지 않은 앱을 펼칠 때 호출됩니다
+        self.reset(app_usage)
+
+    # 데이터 갱신
+
+    def reset(self, app_usage):
+        """사용 데이터 전체를 다시 읽습니다."""
+        self.beginResetModel()
+        self._usage = app_usage
+        self._apps = []
+        self._app_nodes = {}
+        self._nodes_by_id = {}
+        for app_name, app_data in app_usage.items():
+            total_time = app_data.get('total_time', 0)
+            if total_time > 0:
+                node = self._new_app_node(app_name)
+                node.total = total_time
+                node.text = format_time(total_time)
+                self._apps.append(node)
+        self._apps.sort(key=self._app_key, reverse=self._descending())
+        self._renumber(self._apps, 0, len(self._apps))
+        self.endResetModel()
+
+    def refresh(self, dirty_rows):
+        """(앱, 창) 쌍으로 알려진 바뀐 행만 반영합니다."""
+        for app_name, window_name in dirty_rows:
+            app_data = self._usage.get(app_name)
+            if not app_data:
+                continue
+            node = self._app_nodes.get(app_name)
+            if node is None:
+                if app_data.get('total_time', 0) > 0:
+                    self._insert_app(app_name, app_data)
+                continue
+
+            total_time = app_data.get('total_time', 0)
+            if total_time != node.total:
+                node.total = total_time
+                text = format_time(total_time)
+                if text != node.text:
+                    node.text = text
+                    index = self.createIndex(node.row, 1, 0)
+                    self.dataChanged.emit(index, index, [Qt.DisplayRole])
+                if self.sort_column == 1:
+                    self._reposition_app(node)
+
+            if window_name is not None and node.windows is not None:
+                self._refresh_window(node, window_name)
+
+    def _new_app_node(self, app_name):
+        node = _AppNode(self._next_id, app_name)
+        self._next_id += 1
+        self._app_nodes[app_name] = node
+        self._nodes_by_id[node.id] = node
+        return node
+
+    def _insert_app(self, app_name, app_data):
+        node = self._new_app_node(app_name)
+        node.total = app_data.get('total_time', 0)
+        node.text = format_time(node.total)
+        row = self._insert_position(self._apps, self._app_key(node), self._app_key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._apps.insert(row, node)
+        self._renumber(self._apps, row, len(self._apps))
+        self.endInsertRows()
+
+    def _refresh_window(self, node, window_name):
+        windows = self._usage[node.name].get('windows') or {}
+        if window_name not in windows:
+            return
+        parent = self.createIndex(node.row, 0, 0)
+        row = node.window_rows.get(window_name)
+        value = self._window_key(windows, window_name)
+        key = node.window_keys.__getitem__
+
+        if row is None:
+            row = self._insert_position(node.windows, value, key)
+            if row == len(node.windows) and len(node.windows) < len(windows) - 1:
+                # 아직 불러오지 않은 구간에 속하므로 다음 fetchMore에서 나타납니다
+                node.pending = None
+                return
+            self.beginInsertRows(parent, row, row)
+            node.windows.insert(row, window_name)
+            node.window_keys[window_name] = value
+            self._renumber_windows(node, row, len(node.windows))
+            self.endInsertRows()
+            return
+
+        index = self.createIndex(row, 1, node.id)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+        if self.sort_column == 1:
+            node.window_keys[window_name] = value
+            self._reposition(node.windows, row, key, parent,
+                             lambda start, end: self._renumber_windows(node, start, end))
+
+    # 정렬
+
+    def _descending(self):
+        return self.sort_order == Qt.DescendingOrder
+
+    def _app_key(self, node):
+        return node.total if self.sort_column == 1 else node.name.casefold()
+
+    def _window_key(self, windows, window_name):
+        return windows[window_name] if self.sort_column == 1 else window_name.casefold()
+
+    def _insert_position(self, items, key_value, key):
+        """정렬 순서를 유지하며 key_value가 들어갈 위치를 이진 탐색으로 찾습니다."""
+        low, high = 0, len(items)
+        descending = self._descending()
+        while low < high:
+            mid = (low + high) // 2
+            mid_key = key(items[mid])
+            if (mid_key > key_value) if descending else (mid_key <= key_value):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _reposition_app(self, node):
+        self._reposition(self._apps, node.row, self._app_key, QModelIndex(),
+                         lambda start, end: self._renumber(self._apps, start, end))
+
+    def _reposition(self, items, row, key, parent, renumber):
+        """값이 바뀐 행이 이웃과 순서가 어긋났을 때만 제자리로 옮깁니다."""
+        item = items[row]
+        value = key(item)
+        descending = self._descending()
+
+        def before(a, b):
+            return a > b if descending else a < b
+
+        if not ((row > 0 and before(value, key(items[row - 1]))) or
+                (row < len(items) - 1 and before(key(items[row + 1]), value))):
+            return
+
+        del items[row]
+        target = self._insert_position(items, value, key)
+        items.insert(row, item)
+        destination = target + 1 if target >= row else target
+        if not self.beginMoveRows(parent, row, row, parent, destination):
+            return
+        del items[row]
+        items.insert(target, item)
+        renumber(min(row, target), max(row, target) + 1)
+        self.endMoveRows()
+
+    def _renumber(self, nodes, start, end):
+        for row in range(start, end):
+            nodes[row].row = row
+
+    def _renumber_windows(self, node, start, end):
+        for row in range(start, end):
+            node.window_rows[node.windows[row]] = row
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """캐시된 키로 앱과 펼쳐진 창 목록을 정렬합니다."""
+        self.sort_column = column
+        self.sort_order = order
+        self.layoutAboutToBeChanged.emit()
+
+        old_positions = {}
+        for index in self.persistentIndexList():
+            old_positions[(index.internalId(), index.row(), index.column())] = index
+
+        old_apps = list(self._apps)
+        old_windows = {node.id: node.windows for node in self._apps if node.windows is not None}
+
+        self._apps.sort(key=self._app_key, reverse=self._descending())
+        self._renumber(self._apps, 0, len(self._apps))
+        for node in self._apps:
+            if node.windows is not None:
+                # 새 순서의 앞쪽을 불러온 행 수만큼 다시 고릅니다
+                count = len(node.windows)
+                node.windows, node.window_rows, node.window_keys, node.pending = [], {}, {}, None
+                node.windows = self._next_windows(node, count)
+                self._renumber_windows(node, 0, len(node.windows))
+
+        # 선택/펼침 상태가 같은 행을 따라가도록 영구 인덱스를 옮깁니다
+        from_list, to_list = [], []
+        for (internal_id, row, column), index in old_positions.items():
+            if internal_id == 0:
+                if row < len(old_apps):
+                    from_list.append(index)
+                    to_list.append(self.createIndex(old_apps[row].row, column, 0))
+            else:
+                node = self._nodes_by_id.get(internal_id)
+                names = old_windows.get(internal_id)
+                if node is not None and node.windows is not None and names and row < len(names):
+                    new_row = node.window_rows.get(names[row])
+                    from_list.append(index)
+                    to_list.append(QModelIndex() if new_row is None else
+                                   self.createIndex(new_row, column, internal_id))
+        self.changePersistentIndexList(from_list, to_list)
+        self.layoutChanged.emit()
+
+    # 지연 로딩
+
+    def _window_count(self, app_name):
+        app_data = self._usage.get(app_name, {})
+        windows = app_data.get('windows')
+        return len(windows) if windows is not None else app_data.get('window_count', 0)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._apps)
+        if parent.internalId() == 0:
+            return self._window_count(self._apps[parent.row()].name) > 0
+        return False
+
+    def canFetchMore(self, parent):
+        if not parent.isValid() or parent.internalId() != 0 or parent.column() != 0:
+            return False
+        node = self._apps[parent.row()]
+        if not self._window_count(node.name):
+            return False
+        windows = self._usage[node.name].get('windows')
+        if windows is None:
+            return node.windows is None
+        return node.windows is None or len(node.windows) < len(windows)
+
+    def fetchMore(self, parent):
+        """정렬 순서에서 아직 불러오지 않은 창 행을 FETCH_BATCH_SIZE개 만듭니다."""
+        if not self.canFetchMore(parent):
+            return
+        node = self._apps[parent.row()]
+        if node.windows is None:
+            node.windows = []
+            node.window_rows = {}
+            node.window_keys = {}
+        if self._usage[node.name].get('windows') is None:
+            # 창 목록을 받으면 windows_loaded에서 이어서 만듭니다
+            if self.request_windows is not None:
+                self.request_windows(node.name)
+            return
+        names = self._next_windows(node, FETCH_BATCH_SIZE)
+        if not names:
+            return
+        first = len(node.windows)
+        self.beginInsertRows(parent, first, first + len(names) - 1)
+        node.windows.extend(names)
+        self._renumber_windows(node, first, len(node.windows))
+        self.endInsertRows()
+
+    def _next_windows(self, node, count):
+        """불러오지 않은 창 중 정렬 순서로 앞선 count개를 꺼냅니다.
+
+        나머지 창의 순서는 한 번 정렬해 node.pending에 두고 이어지는 호출에서
+        잘라 씁니다. 그 사이 refresh로 먼저 들어간 창은 건너뜁니다. 꺼낸 창의
+        정렬 키는 node.window_keys에 캐시해 이후 비교에서 다시 구하지 않습니다.
+        """
+        windows = self._usage[node.name].get('windows') or {}
+        if node.pending is None:
+            loaded = node.window_rows
+            if self.sort_column == 1:
+                # 시간순은 (이름, 시간) 쌍으로 정렬해 창마다 값을 다시 찾지 않습니다
+                ordered = sorted(windows.items(), key=itemgetter(1), reverse=self._descending())
+                node.pending = [name for name, _ in ordered if name not in loaded]
+            else:
+                node.pending = sorted((name for name in windows if name not in loaded),
+                                      key=str.casefold, reverse=self._descending())
+        names = []
+        while node.pending and len(names) < count:
+            batch = node.pending[:count - len(names)]
+            del node.pending[:len(batch)]
+            names.extend(name for name in batch if name not in node.window_rows)
+        for name in names:
+            node.window_keys[name] = self._window_key(windows, name)
+        return names
+
+    def windows_loaded(self, app_name):
+        """app_name의 창 목록이 채워졌음을 알립니다. 펼쳐져 있으면 창 행을 만듭니다."""
+        node = self._app_nodes.get(app_name)
+        if node is None or node.windows is None:
+            return
+        node.pending = None
+        self.fetchMore(self.createIndex(node.row, 0, 0))
+
+    def release_children(self, parent):
+        """접힌 앱의 창 행을 버려 메모리를 돌려받습니다."""
+        if not parent.isValid() or parent.internalId() != 0:
+            return
+        node = self._apps[parent.row()]
+        if not node.windows:
+            node.windows = node.window_rows = node.window_keys = node.pending = None
+            return
+        self.beginRemoveRows(parent, 0, len(node.windows) - 1)
+        node.windows = node.window_rows = node.window_keys = node.pending = None
+        self.endRemoveRows()
+
+    # QAbstractItemModel 구현
+
+    def index(self, row, column, parent=QModelIndex()):
+        if column < 0 or column >= len(self.COLUMNS) or row < 0:
+            return QModelIndex()
+        if not parent.isValid():
+            if row < len(self._apps):
+                return self.createIndex(row, column, 0)
+            return QModelIndex()
+        if parent.internalId() != 0:
+            return QModelIndex()
+        node = self._apps[parent.row()]
+        if node.windows is not None and row < len(node.windows):
+            return self.createIndex(row, column, node.id)
+        return QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        node = self._nodes_by_id.get(index.internalId())
+        if node is None:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._apps)
+        if parent.internalId() == 0 and parent.column() == 0:
+            windows = self._apps[parent.row()].windows
+            return len(windows) if windows is not None else 0
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if index.internalId() == 0:
+            node = self._apps[index.row()]
+            if role == Qt.DisplayRole:
+                return node.name if index.column() == 0 else node.text
+            if role == Qt.FontRole:
+                return self.app_font
+            if role == Qt.UserRole and index.column() == 1:
+                return node.total
+            return None
+
+        node = self._nodes_by_id[index.internalId()]
+        window_name = node.windows[index.row()]
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                return window_name
+            return format_time(self._usage[node.name]['windows'][window_name])
+        if role == Qt.FontRole:
+            return self.window_font
+        if role == Qt.UserRole and index.column() == 1:
+            return self._usage[node.name]['windows'][window_name]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# 설정의 데이터 경로가 실제 홈을 가리키지 않도록 core를 가져오기 전에 HOME을 바꿉니다
+os.environ['HOME'] = tempfile.mkdtemp(prefix='mactimeja-test-')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,140 @@
+import glob
+import os
+from core.columnar_store import ColumnarUsageStore
+from core.time_ranges import day_start_of
+
+
+def test_reopen_truncates_torn_tail(tmp_path):
+    today = day_start_of()
+    store = ColumnarUsageStore(str(tmp_path))
+    store.append('Safari', 'Docs', today + 60, today + 120)
+    store.append('Terminal', None, today + 120, today + 150)
+    store.close()
+
+    # 값 하나가 못 되는 꼬리가 모든 열에 남으면 열마다의 행 수는 그대로입니다
+    for path in glob.glob(os.path.join(str(tmp_path), 'days', '*', '*.col')):
+        with open(path, 'ab') as f:
+            f.write(b'\x01\x02')
+
+    store = ColumnarUsageStore(str(tmp_path))
+    usage = store.load()
+    assert usage['Safari']['total_time'] == 60
+    assert usage['Safari']['windows'] == {'Docs': 60}
+    assert usage['Terminal']['total_time'] == 30
+
+    # 잘라낸 뒤에 덧붙인 행이 올바른 위치에 들어가야 합니다
+    store.append('Safari', 'Docs', today + 200, today + 210)
+    store.close()
+    store = ColumnarUsageStore(str(tmp_path))
+    assert store.load()['Safari']['windows'] == {'Docs': 70}
+    assert [interval[2] for interval in store.query_intervals(today, today + 300)] == [
+        today + 60, today + 120, today + 200]
+    store.close()
+
+
+def test_late_interval_on_closed_day_updates_every_level(tmp_path):
+    today = day_start_of()
+    yesterday = day_start_of(today - 1)
+    store = ColumnarUsageStore(str(tmp_path))
+    store.append('Safari', 'Docs', yesterday + 3600, yesterday + 3700)
+    store.roll_over(today)
+
+    # 닫힌 날에 늦게 온 구간
+    store.append('Safari', 'Mail', yesterday + 3800, yesterday + 3850)
+    store.flush()
+
+    def check(store):
+        expected = {'Docs': 100, 'Mail': 50}
+        assert store.load_day(yesterday)['Safari']['windows'] == expected
+        for granularity in ('hour', 'day', 'week', 'month'):
+            summary = store.range_summary(granularity, yesterday + 3600)
+            assert summary['Safari']['total_time'] == 150, granularity
+            assert summary['Safari']['windows'] == expected, granularity
+        assert store.load()['Safari']['windows'] == expected
+        assert len(store.query_intervals(yesterday, today)) == 2
+
+    check(store)
+    store.close()
+    store = ColumnarUsageStore(str(tmp_path))
+    check(store)
+    store.rebuild_rollups()
+    check(store)
+    store.close()
+
+
+def test_replace_keeps_window_totals_of_deferred_apps(tmp_path):
+    today = day_start_of()
+    yesterday = day_start_of(today - 1)
+    store = ColumnarUsageStore(str(tmp_path))
+    store.append('Safari', 'Docs', yesterday + 60, yesterday + 160)
+    store.roll_over(today)
+    store.append('Safari', 'Mail', today + 60, today + 90)
+    store.append('Safari', None, today + 90, today + 100)
+
+    usage = store.load(with_windows=False)
+    assert usage['Safari']['windows'] is None
+    usage['Safari']['total_time'] += 5
+    store.replace(usage)
+
+    expected = {'Docs': 100, 'Mail': 30}
+    assert store.load()['Safari'] == {'total_time': 145, 'last_update': today + 100, 'windows': expected}
+    assert store.load_windows('Safari') == expected
+    store.close()
+    store = ColumnarUsageStore(str(tmp_path))
+    assert store.load()['Safari']['total_time'] == 145
+    assert store.load()['Safari']['windows'] == expected
+    store.close()
+
+
+def test_rollover_and_reopen_round_trip(tmp_path):
+    today = day_start_of()
+    yesterday = day_start_of(today - 1)
+    store = ColumnarUsageStore(str(tmp_path))
+    store.append('Safari', 'Docs', yesterday + 3600, yesterday + 3660)
+    store.append('Terminal', None, yesterday + 3660, yesterday + 3700)
+    store.roll_over(today)
+    store.append('Safari', 'Mail', today + 60, today + 80)
+    store.close()
+
+    store = ColumnarUsageStore(str(tmp_path))
+    expected = {
+        'Safari': {'total_time': 80, 'last_update': today + 80, 'windows': {'Docs': 60, 'Mail': 20}},
+        'Terminal': {'total_time': 40, 'last_update': yesterday + 3700, 'windows': {}},
+    }
+    assert store.load() == expected
+    assert store.load(with_windows=False)['Safari'] == {
+        'total_time': 80, 'last_update': today + 80, 'windows': None, 'window_count': 2}
+    assert store.load_windows('Safari') == {'Docs': 60, 'Mail': 20}
+    assert store.days() == [yesterday, today]
+    assert store.load_day(yesterday)['Safari']['windows'] == {'Docs': 60}
+    assert store.load_day(today)['Safari']['windows'] == {'Mail': 20}
+    assert store.range_summary('hour', yesterday + 3600)['Terminal']['total_time'] == 40
+    assert [interval[:2] for interval in store.query_intervals(yesterday, today + 3600)] == [
+        ('Safari', 'Docs'), ('Terminal', None), ('Safari', 'Mail')]
+    store.close()
+
+
+def test_replace_round_trip(tmp_path):
+    today = day_start_of()
+    yesterday = day_start_of(today - 1)
+    store = ColumnarUsageStore(str(tmp_path))
+    store.append('Safari', 'Docs', yesterday + 60, yesterday + 160)
+    store.roll_over(today)
+    store.append('Safari', 'Docs', today + 60, today + 90)
+
+    store.replace({
+        'Safari': {'total_time': 200, 'last_update': today + 90, 'windows': {'Docs': 120, 'Mail': 50}},
+        'Notes': {'total_time': 15, 'last_update': 15.0, 'windows': {}},
+    })
+    store.append('Safari', 'Mail', today + 90, today + 100)
+    store.close()
+
+    # 날짜별 기록은 그대로 두고 누적 합계만 바뀝니다
+    store = ColumnarUsageStore(str(tmp_path))
+    assert store.load() == {
+        'Safari': {'total_time': 210, 'last_update': today + 100, 'windows': {'Docs': 120, 'Mail': 60}},
+        'Notes': {'total_time': 15, 'last_update': 15.0, 'windows': {}},
+    }
+    assert store.load_day(yesterday)['Safari']['total_time'] == 100
+    assert store.load_day(today)['Safari']['total_time'] == 40
+    store.close()
@@ -0,0 +1,32 @@
+from core.compact_usage import CompactUsage, StringTable
+
+
+def test_string_table_interns_once():
+    strings = StringTable()
+    assert strings.intern('Docs') == 0
+    assert strings.intern('Mail') == 1
+    assert strings.intern('Docs') == 0
+    assert strings.find('Mail') == 1
+    assert strings.find('Missing') == -1
+    assert strings.get_many([1, 0]) == ['Mail', 'Docs']
+    assert len(strings) == 2
+
+
+def test_round_trip_and_add_interval():
+    usage = {
+        'Safari': {'total_time': 30.0, 'last_update': 100.0, 'windows': {'Docs': 20.0, 'Mail': 10.0}},
+        'Terminal': {'total_time': 5.0, 'last_update': 90.0, 'windows': None, 'window_count': 3},
+    }
+    compact = CompactUsage.from_usage(usage)
+    assert compact.to_dict() == usage
+
+    compact.add_interval('Safari', 'Docs', 100.0, 105.0)
+    compact.add_interval('Safari', 'News', 105.0, 106.0)
+    compact.add_interval('Terminal', 'zsh', 110.0, 112.0)
+    assert compact['Safari']['total_time'] == 36.0
+    assert dict(compact['Safari']['windows'].items()) == {'Docs': 25.0, 'Mail': 10.0, 'News': 1.0}
+    assert compact['Safari']['windows']['News'] == 1.0
+    assert 'Missing' not in compact['Safari']['windows']
+    assert compact['Terminal']['windows'] is None
+    assert compact.window_count('Terminal') == 3
+    assert compact['Terminal']['last_update'] == 112.0
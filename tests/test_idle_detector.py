@@ -0,0 +1,40 @@
+from core.idle_detector import IdleDetector, ScriptedActivitySource
+
+
+def test_idle_since_is_last_input_plus_threshold():
+    activity = ScriptedActivitySource(100.0)
+    detector = IdleDetector(activity, threshold=60)
+    assert detector.sample(130.0) is None
+    assert detector.last_input == 100.0
+
+    # 자리 비움이 이어지는 동안 시작 시각은 바뀌지 않습니다
+    assert detector.sample(200.0) == 160.0
+    assert detector.sample(500.0) == 160.0
+    assert detector.idle_periods == 1
+
+    activity.touch(490.0)
+    assert detector.sample(500.0) is None
+    assert detector.last_input == 490.0
+
+
+def test_note_activity_ends_idle_and_counts_as_input():
+    activity = ScriptedActivitySource(100.0)
+    detector = IdleDetector(activity, threshold=60)
+    assert detector.sample(200.0) == 160.0
+
+    detector.note_activity(250.0)
+    assert detector.idle_since is None
+    assert detector.sample(260.0) is None
+    assert detector.last_input == 250.0
+    assert detector.sample(320.0) == 310.0
+    assert detector.idle_periods == 2
+
+
+def test_unknown_input_time_is_never_idle():
+    class NoInput(ScriptedActivitySource):
+        def seconds_since_input(self, now):
+            return None
+
+    detector = IdleDetector(NoInput(), threshold=60)
+    assert detector.sample(1000.0) is None
+    assert detector.last_input is None
@@ -0,0 +1,44 @@
+from core.data_manager import PersistenceWorker
+
+
+def test_notifications_for_same_key_are_coalesced():
+    worker = PersistenceWorker(interval=60)
+    writes = []
+    worker.start()
+    try:
+        worker.mark_dirty('usage', lambda: writes.append('first'))
+        worker.flush()
+
+        # 마지막 기록 후 interval이 지나기 전의 알림은 key마다 마지막 것 하나만 남습니다
+        for n in range(5):
+            worker.mark_dirty('usage', lambda n=n: writes.append(('usage', n)))
+        worker.mark_dirty('timer', lambda: writes.append('timer'))
+        assert writes == ['first']
+        assert worker.stats()['queue_depth'] == 2
+        worker.flush()
+    finally:
+        worker.stop()
+
+    assert writes == ['first', ('usage', 4), 'timer']
+    stats = worker.stats()
+    assert stats['notifications'] == 7
+    assert stats['writes'] == 3
+    assert stats['coalesced'] == 4
+    assert stats['queue_depth'] == 0
+
+
+def test_flush_without_thread_writes_immediately():
+    worker = PersistenceWorker()
+    writes = []
+    worker.mark_dirty('usage', lambda: writes.append(1))
+    assert writes == [1]
+
+
+def test_failed_write_is_counted():
+    worker = PersistenceWorker()
+
+    def fail():
+        raise OSError('disk full')
+
+    worker.mark_dirty('usage', fail)
+    assert worker.stats()['errors'] == 1
@@ -0,0 +1,84 @@
+import os
+from core.sqlite_store import SQLiteUsageStore
+from core.time_ranges import day_start_of
+
+LEGACY = {
+    'Safari': {'total_time': 300, 'last_update': 1000.0, 'windows': {'Docs': 200, 'Mail': 50}},
+    'Terminal': {'total_time': 40, 'last_update': 900.0, 'windows': {}},
+}
+
+
+def open_store(tmp_path, legacy=None):
+    return SQLiteUsageStore(os.path.join(str(tmp_path), 'usage.db'),
+                            legacy_loader=(lambda: legacy) if legacy is not None else None)
+
+
+def test_replace_keeps_window_history_of_deferred_apps(tmp_path):
+    today = day_start_of()
+    store = open_store(tmp_path, LEGACY)
+    store.append('Safari', 'Docs', today + 60, today + 90)
+
+    # 창 목록을 읽지 않은 채 합계만 바꾼 데이터로 교체합니다
+    usage = store.load(with_windows=False)
+    assert usage['Safari']['windows'] is None
+    usage['Safari']['total_time'] += 10
+    store.replace(usage)
+
+    store.close()
+    store = open_store(tmp_path)
+    loaded = store.load()
+    assert loaded['Safari']['total_time'] == 340
+    assert loaded['Safari']['windows'] == {'Docs': 230, 'Mail': 50}
+    assert store.load_windows('Safari') == {'Docs': 230, 'Mail': 50}
+    assert loaded['Terminal']['total_time'] == 40
+    store.close()
+
+
+def test_reopen_round_trip(tmp_path):
+    today = day_start_of()
+    store = open_store(tmp_path, LEGACY)
+    store.append('Safari', 'Docs', today + 60, today + 90)
+    store.append('Terminal', None, today + 90, today + 100)
+    store.close()
+
+    # 이미 만든 데이터베이스는 기존 누적 데이터를 다시 가져오지 않습니다
+    store = open_store(tmp_path, LEGACY)
+    loaded = store.load()
+    assert loaded['Safari']['total_time'] == 330
+    assert loaded['Safari']['windows'] == {'Docs': 230, 'Mail': 50}
+    assert loaded['Safari']['last_update'] == today + 90
+    assert loaded['Terminal']['total_time'] == 50
+    totals = store.load(with_windows=False)
+    assert totals['Safari'] == {'total_time': 330, 'windows': None, 'window_count': 2,
+                                'last_update': today + 90}
+    assert [interval[:2] for interval in store.query_intervals(today, today + 200)] == [
+        ('Safari', 'Docs'), ('Terminal', None)]
+    assert store.load_day(today)['Safari'] == {'total_time': 30, 'last_update': today + 90,
+                                               'windows': {'Docs': 30}}
+    store.close()
+
+
+def test_replace_round_trip(tmp_path):
+    today = day_start_of()
+    store = open_store(tmp_path, LEGACY)
+    store.append('Safari', 'Docs', today + 60, today + 90)
+    store.append('Notes', 'Todo', today + 90, today + 100)
+
+    # 창과 앱을 지운 데이터로 교체해도 기록된 구간은 그대로입니다
+    store.replace({
+        'Safari': {'total_time': 100, 'windows': {'Docs': 70}},
+        'Terminal': {'total_time': 40, 'windows': {}},
+    })
+    store.append('Safari', 'Docs', today + 100, today + 110)
+
+    store.close()
+    store = open_store(tmp_path)
+    loaded = store.load()
+    # 지운 앱의 구간은 음수 기준값으로 상쇄됩니다
+    assert loaded['Notes']['total_time'] == 0
+    assert loaded['Safari']['total_time'] == 110
+    assert loaded['Safari']['windows'] == {'Docs': 80}
+    assert loaded['Terminal']['total_time'] == 40
+    assert store.load_windows('Safari') == {'Docs': 80}
+    assert len(store.query_intervals(today, today + 200)) == 3
+    store.close()
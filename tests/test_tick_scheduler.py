@@ -0,0 +1,34 @@
+import pytest
+from core.config import TICK_ALIGN_SLACK
+from core.idle_detector import IdleDetector, ScriptedActivitySource
+from core.tick_scheduler import TickScheduler
+
+
+def test_next_delay_aligns_to_interval_boundary():
+    scheduler = TickScheduler(interval=1.0, background_interval=5.0, idle_interval=30.0)
+    assert scheduler.next_delay(100.25) == pytest.approx(4.75 + TICK_ALIGN_SLACK)
+
+    scheduler.request_fast('window')
+    assert scheduler.next_delay(100.25) == pytest.approx(0.75 + TICK_ALIGN_SLACK)
+    scheduler.request_fast('window', False)
+    assert scheduler.current_interval() == 5.0
+
+
+def test_idle_backs_off_until_activity():
+    activity = ScriptedActivitySource(0.0)
+    scheduler = TickScheduler(interval=1.0, background_interval=5.0, idle_interval=30.0,
+                              idle_detector=IdleDetector(activity, threshold=60), sample_focus=False)
+    scheduler.request_fast('window')
+
+    scheduler.tick(10.0)
+    assert scheduler.current_interval() == 1.0
+    intervals = []
+    for now in (60.0, 62.0, 66.0, 74.0, 90.0, 120.0):
+        tick = scheduler.tick(now)
+        assert tick.idle_since == 60.0 and tick.last_input == 0.0
+        intervals.append(scheduler.current_interval())
+    assert intervals == [2.0, 4.0, 8.0, 16.0, 30.0, 30.0]
+
+    scheduler.note_activity(125.0)
+    assert scheduler.current_interval() == 1.0
+    assert scheduler.tick(126.0).idle_since is None
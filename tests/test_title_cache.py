@@ -0,0 +1,34 @@
+from core.title_cache import TitleCache
+
+
+def test_entries_expire_after_ttl():
+    cache = TitleCache(ttl=5, max_size=10)
+    cache.put('Safari', 1, 'com.apple.Safari', 'Docs', now=100.0)
+    assert cache.get('Safari', 1, 'com.apple.Safari', now=104.9) == 'Docs'
+    assert cache.get('Safari', 1, 'com.apple.Safari', now=105.0) is None
+
+    # 만료된 제목도 같은 프로세스라면 peek으로 볼 수 있습니다
+    assert cache.peek('Safari', 1, 'com.apple.Safari') == 'Docs'
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_other_process_invalidates_entry():
+    cache = TitleCache(ttl=5, max_size=10)
+    cache.put('Safari', 1, 'com.apple.Safari', 'Docs', now=100.0)
+    assert cache.get('Safari', 2, 'com.apple.Safari', now=101.0) is None
+    assert cache.peek('Safari', 1, 'com.apple.Safari') is None
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TitleCache(ttl=60, max_size=2)
+    cache.put('Safari', 1, '', 'Docs', now=100.0)
+    cache.put('Terminal', 2, '', 'Shell', now=100.0)
+    assert cache.get('Safari', 1, '', now=101.0) == 'Docs'
+
+    cache.put('Notes', 3, '', 'Todo', now=102.0)
+    assert cache.get('Terminal', 2, '', now=103.0) is None
+    assert cache.get('Safari', 1, '', now=103.0) == 'Docs'
+    assert cache.get('Notes', 3, '', now=103.0) == 'Todo'
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 2
@@ -0,0 +1,136 @@
+import pytest
+from core.columnar_store import ColumnarUsageStore
+from core.data_manager import DataManager, PersistenceWorker
+from core.focus_source import ScriptedFocusSource
+from core.idle_detector import IdleDetector, ScriptedActivitySource
+from core.tick_scheduler import TickScheduler
+from core.time_ranges import day_start_of
+from core.tracker import UsageTracker
+from core.tracker_ipc import dispatch_command
+
+SAFARI_PID = 101
+TERMINAL_PID = 202
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ColumnarUsageStore(str(tmp_path))
+    monkeypatch.setattr(DataManager, '_usage_store', store)
+    # 시작하지 않은 기록 스레드는 알림마다 바로 기록합니다
+    monkeypatch.setattr(DataManager, '_persistence', PersistenceWorker())
+    yield store
+    store.close()
+
+
+def make_tracker(start, threshold):
+    """start 시각의 날을 기록 중인 추적기와 입력 소스, 스케줄러, 전환 소스를 만듭니다."""
+    focus = ScriptedFocusSource()
+    activity = ScriptedActivitySource(start)
+    scheduler = TickScheduler(focus_source=focus, idle_detector=IdleDetector(activity, threshold))
+    tracker = UsageTracker(focus, scheduler)
+    tracker._day_start = day_start_of(start)
+    # 창 제목 조회 도우미를 띄우지 않도록 제목을 고정합니다
+    tracker.set_title_override(SAFARI_PID, 'Docs')
+    tracker.set_title_override(TERMINAL_PID, 'Shell')
+    tracker.start()
+    return tracker, focus, activity, scheduler
+
+
+def intervals(store, start, end):
+    return [tuple(interval[:4]) for interval in store.query_intervals(start, end)]
+
+
+def test_idle_stops_at_idle_since_and_resumes_at_last_input(store):
+    base = day_start_of(day_start_of() - 1) + 12 * 3600
+    tracker, focus, activity, scheduler = make_tracker(base, threshold=60)
+
+    focus.push('Safari', 'com.apple.Safari', SAFARI_PID, timestamp=base)
+    scheduler.tick(base + 30)
+    # 마지막 입력 후 60초가 지난 시각부터 자리 비움입니다
+    scheduler.tick(base + 120)
+    assert tracker.app_usage['Safari']['total_time'] == 60
+    scheduler.tick(base + 400)
+    assert tracker.app_usage['Safari']['total_time'] == 60
+
+    # 늘어난 틱 간격과 상관없이 마지막 입력 시각부터 다시 셉니다
+    activity.touch(base + 490)
+    scheduler.tick(base + 520)
+    assert tracker.app_usage['Safari']['total_time'] == 90
+
+    focus.push('Terminal', 'com.apple.Terminal', TERMINAL_PID, timestamp=base + 540)
+    assert tracker.app_usage['Safari']['total_time'] == 110
+    assert tracker.app_usage['Safari']['windows'] == {'Docs': 110}
+    assert intervals(store, base, base + 600) == [
+        ('Safari', 'Docs', base, base + 60),
+        ('Safari', 'Docs', base + 490, base + 540),
+    ]
+
+
+def test_rollover_splits_open_interval_at_midnight(store):
+    midnight = day_start_of(day_start_of() - 1)
+    previous_day = day_start_of(midnight - 1)
+    tracker, focus, activity, scheduler = make_tracker(midnight - 100, threshold=3600)
+    messages = []
+    tracker.subscribe(messages.append)
+
+    # 구간 나눔 주기(60초)보다 짧게 틱을 보내 자정에서만 나뉘게 합니다
+    focus.push('Safari', 'com.apple.Safari', SAFARI_PID, timestamp=midnight - 100)
+    scheduler.tick(midnight - 50)
+    scheduler.tick(midnight + 30)
+    focus.push('Terminal', 'com.apple.Terminal', TERMINAL_PID, timestamp=midnight + 50)
+
+    assert tracker.app_usage['Safari']['total_time'] == 150
+    assert [(m['start'], m['end']) for m in messages if m['event'] == 'interval'] == [
+        (midnight - 100, midnight), (midnight, midnight + 50)]
+
+    def check(store):
+        assert store.load_day(previous_day)['Safari']['total_time'] == 100
+        assert store.load_day(midnight)['Safari']['total_time'] == 50
+        assert store.range_summary('day', previous_day + 1)['Safari']['total_time'] == 100
+        assert store.load()['Safari']['windows'] == {'Docs': 150}
+
+    DataManager.flush()
+    check(store)
+    store.close()
+    check(ColumnarUsageStore(store.directory))
+
+
+def test_resume_after_midnight_starts_at_new_day(store):
+    midnight = day_start_of(day_start_of() - 1)
+    tracker, focus, activity, scheduler = make_tracker(midnight - 300, threshold=60)
+
+    focus.push('Safari', 'com.apple.Safari', SAFARI_PID, timestamp=midnight - 300)
+    scheduler.tick(midnight - 200)
+    assert tracker.app_usage['Safari']['total_time'] == 60
+
+    # 자정 전의 입력이 자정 뒤의 틱에서 보이면 새 날의 자정부터 다시 셉니다
+    scheduler.tick(midnight + 100)
+    activity.touch(midnight - 10)
+    scheduler.tick(midnight + 20)
+    focus.push('Terminal', 'com.apple.Terminal', TERMINAL_PID, timestamp=midnight + 30)
+
+    assert tracker.app_usage['Safari']['total_time'] == 90
+    assert intervals(store, midnight - 300, midnight + 60) == [
+        ('Safari', 'Docs', midnight - 300, midnight - 240),
+        ('Safari', 'Docs', midnight, midnight + 30),
+    ]
+
+
+def test_dispatch_command(store):
+    base = day_start_of(day_start_of() - 1) + 12 * 3600
+    tracker, focus, activity, scheduler = make_tracker(base, threshold=3600)
+
+    assert dispatch_command(tracker, {'cmd': 'title', 'pid': SAFARI_PID, 'title': 'Timer'}) is None
+    focus.push('Safari', 'com.apple.Safari', SAFARI_PID, timestamp=base)
+    scheduler.tick(base + 10)
+    focus.push('Terminal', 'com.apple.Terminal', TERMINAL_PID, timestamp=base + 15)
+
+    assert dispatch_command(tracker, {'cmd': 'windows', 'app': 'Safari'}) == {
+        'event': 'windows', 'app': 'Safari', 'windows': {'Timer': 15}}
+    assert dispatch_command(tracker, {'cmd': 'flush'}) == {'event': 'flushed'}
+    assert intervals(store, base, base + 60)[0] == ('Safari', 'Timer', base, base + 15)
+    snapshot = dispatch_command(tracker, {'cmd': 'snapshot'})
+    assert snapshot['app_usage']['Safari']['total_time'] == 15
+    assert snapshot['app_usage']['Safari']['window_count'] == 1
+    assert dispatch_command(tracker, {'cmd': 'range', 'range': 'fortnight'}) is None
+    assert dispatch_command(tracker, {'cmd': 'unknown'}) is None
@@ -0,0 +1,85 @@
+import glob
+import json
+import os
+from core.data_manager import UsageLog
+from core.time_ranges import day_start_of
+
+
+def open_log(tmp_path):
+    return UsageLog(os.path.join(str(tmp_path), 'usage_log'),
+                    legacy_file=os.path.join(str(tmp_path), 'app_usage.json'))
+
+
+def test_replace_keeps_windows_of_deferred_apps(tmp_path):
+    usage_log = open_log(tmp_path)
+    usage_log.append('Safari', 'Docs', 100.0, 200.0)
+    usage_log.append('Safari', 'Mail', 200.0, 230.0)
+    usage_log.compact()
+    usage_log.append('Safari', 'Docs', 300.0, 310.0)
+
+    usage = usage_log.load(with_windows=False)
+    assert usage['Safari']['windows'] is None
+    usage['Safari']['total_time'] += 5
+    usage_log.replace(usage)
+
+    assert usage_log.load()['Safari']['total_time'] == 145
+    assert usage_log.load()['Safari']['windows'] == {'Docs': 110, 'Mail': 30}
+    assert usage_log.load_windows('Safari') == {'Docs': 110, 'Mail': 30}
+    usage_log.close()
+
+
+def test_reopen_replays_segments_over_legacy_snapshot(tmp_path):
+    with open(os.path.join(str(tmp_path), 'app_usage.json'), 'w', encoding='utf-8') as f:
+        json.dump({'Safari': {'total_time': 50, 'last_update': 50.0, 'windows': {'Docs': 50}}}, f)
+    usage_log = open_log(tmp_path)
+    usage_log.append('Safari', 'Docs', 100.0, 130.0)
+    usage_log.append('Terminal', None, 130.0, 140.0)
+    usage_log.close()
+
+    # 비정상 종료로 잘린 마지막 줄은 건너뜁니다
+    segment = glob.glob(os.path.join(str(tmp_path), 'usage_log', 'segment-*.log'))[-1]
+    with open(segment, 'a', encoding='utf-8') as f:
+        f.write('["Safari", "Docs", 140.0')
+
+    usage_log = open_log(tmp_path)
+    expected = {
+        'Safari': {'total_time': 80, 'last_update': 130.0, 'windows': {'Docs': 80}},
+        'Terminal': {'total_time': 10, 'last_update': 140.0, 'windows': {}},
+    }
+    assert usage_log.load() == expected
+    assert [interval[2] for interval in usage_log.query_intervals(0, 200)] == [100.0, 130.0]
+    assert usage_log.load_day(day_start_of(100.0))['Safari']['total_time'] == 30
+
+    # 새 기록은 새 세그먼트에 이어지고 압축 뒤에도 결과는 같습니다
+    usage_log.append('Safari', 'Mail', 200.0, 220.0)
+    expected['Safari'] = {'total_time': 100, 'last_update': 220.0, 'windows': {'Docs': 80, 'Mail': 20}}
+    assert usage_log.load() == expected
+    usage_log.compact()
+    assert usage_log.load() == expected
+    assert usage_log.query_intervals(0, 300) == []
+    usage_log.close()
+
+    usage_log = open_log(tmp_path)
+    assert usage_log.load() == expected
+    assert usage_log.load(with_windows=False)['Safari']['window_count'] == 2
+    assert usage_log.load_windows('Safari') == {'Docs': 80, 'Mail': 20}
+    usage_log.close()
+
+
+def test_replace_round_trip(tmp_path):
+    usage_log = open_log(tmp_path)
+    usage_log.append('Safari', 'Docs', 100.0, 200.0)
+    usage = usage_log.load()
+    usage['Safari']['windows'] = {'Docs': 60, 'Mail': 40}
+    del usage['Safari']['last_update']
+    usage['Notes'] = {'total_time': 5, 'last_update': 5.0, 'windows': {}}
+    usage_log.replace(usage)
+
+    # 교체 전의 세그먼트는 다시 재생되지 않습니다
+    usage_log.append('Safari', 'Mail', 300.0, 310.0)
+    usage_log.close()
+    usage_log = open_log(tmp_path)
+    loaded = usage_log.load()
+    assert loaded['Safari'] == {'total_time': 110, 'last_update': 310.0, 'windows': {'Docs': 60, 'Mail': 50}}
+    assert loaded['Notes'] == {'total_time': 5, 'last_update': 5.0, 'windows': {}}
+    usage_log.close()
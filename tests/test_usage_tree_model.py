@@ -0,0 +1,27 @@
+from PyQt5.QtCore import Qt
+from ui.widgets.usage_tree_model import UsageTreeModel
+
+
+def window_names(model, app_row=0):
+    parent = model.index(app_row, 0)
+    return [model.index(row, 0, parent).data() for row in range(model.rowCount(parent))]
+
+
+def test_refresh_reorders_windows_by_cached_time():
+    usage = {'Safari': {'total_time': 60, 'windows': {'A': 30, 'B': 20, 'C': 10}}}
+    model = UsageTreeModel(usage)
+    model.fetchMore(model.index(0, 0))
+    assert window_names(model) == ['A', 'B', 'C']
+
+    usage['Safari']['windows']['C'] = 40
+    usage['Safari']['windows']['D'] = 25
+    usage['Safari']['total_time'] = 115
+    model.refresh([('Safari', 'C'), ('Safari', 'D')])
+    assert window_names(model) == ['C', 'A', 'D', 'B']
+    assert model.index(0, 1, model.index(0, 0)).data(Qt.UserRole) == 40
+
+    model.sort(0, Qt.AscendingOrder)
+    assert window_names(model) == ['A', 'B', 'C', 'D']
+    usage['Safari']['windows']['a'] = 1
+    model.refresh([('Safari', 'a')])
+    assert window_names(model)[:2] in (['A', 'a'], ['a', 'A'])